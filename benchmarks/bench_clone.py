@@ -0,0 +1,187 @@
+"""Clone engine benchmarks against the local mock Discord API
+
+    python -m benchmarks.bench_clone
+    python -m benchmarks.bench_clone --scenario large --repeat 3 --output after.json --baseline before.json
+    python -m benchmarks.bench_clone --scenario small --jobs 3
+
+Every scenario clones a synthetic source guild into a destination that
+already holds some roles and channels, and reports wall time, requests
+sent, 429 and 5xx answers. Rate limit windows are scaled down by
+--time-scale so a run takes seconds instead of minutes; use the same value
+when comparing runs. With --jobs N the source is cloned into N
+destinations at once through the job queue.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.mock_discord import MockDiscord  # noqa: E402
+from src.operation_file.serverclone import Clone  # noqa: E402
+from src.operation_file.job_queue import CloneJobQueue, DONE  # noqa: E402
+from src.operation_file.guild_cache import GuildCache  # noqa: E402
+from src.utils.http_session import auth_headers, create_connector  # noqa: E402
+
+# name: (roles, channels, messages per text channel, destination roles, destination channels)
+SCENARIOS = {
+    "small": (50, 100, 0, 10, 20),
+    "small-messages": (50, 100, 20, 10, 20),
+    "large": (250, 500, 0, 10, 20),
+    "large-messages": (250, 500, 20, 10, 20),
+    "full-destination": (50, 100, 0, 200, 400),
+    "fresh-destination": (50, 100, 0, 0, 4),
+}
+
+CLONE_OPTIONS = {
+    "clone_roles": True,
+    "clone_categories": True,
+    "clone_text_channels": True,
+    "clone_voice_channels": True,
+    "clone_name_icon": True,
+}
+
+
+async def run_scenario(name, args) -> dict:
+    # Every run starts with a cold attachment cache
+    with tempfile.TemporaryDirectory() as cache_dir:
+        return await _run_scenario(name, args, cache_dir)
+
+
+async def _run_scenario(name, args, cache_dir) -> dict:
+    roles, channels, messages, dest_roles, dest_channels = SCENARIOS[name]
+    mock = MockDiscord(latency=args.latency, jitter=args.jitter, time_scale=args.time_scale,
+                       error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    await mock.start()
+    try:
+        source_id = mock.add_guild("Source", roles, channels, messages)
+        dest_ids = [mock.add_guild(f"Destination {i}", dest_roles, dest_channels, 0) for i in range(args.jobs)]
+        source = mock.guilds[source_id]["guild"]
+        mock.reset_counters()
+
+        options = dict(CLONE_OPTIONS)
+        options.update({
+            "clone_messages": messages > 0,
+            "messages_limit": messages,
+            "journal_dir": args.journal_dir,
+            "attachment_cache_dir": cache_dir,
+            "coalesce_messages": args.coalesce,
+        })
+        output = io.StringIO()
+        cache = GuildCache()  # cold guild cache too: every run reads both guilds
+        async with aiohttp.ClientSession(connector=create_connector()) as session:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                if args.jobs == 1:
+                    cloner = Clone(api_url=mock.api_url, cdn_url=mock.cdn_url, cache=cache)
+                    success = await cloner.start_clone(source, mock.guilds[dest_ids[0]]["guild"], session, options,
+                                                       headers=auth_headers("mock-token"))
+                    clone_errors = cloner.errors
+                else:
+                    queue = CloneJobQueue(session, max_running=args.jobs, global_window=args.time_scale,
+                                          api_url=mock.api_url, cdn_url=mock.cdn_url, cache=cache)
+                    jobs = [queue.submit(source, mock.guilds[dest_id]["guild"], options, headers=auth_headers("mock-token"))
+                            for dest_id in dest_ids]
+                    await queue.join()
+                    success = all(job.state == DONE for job in jobs)
+                    clone_errors = sum(job.clone.errors for job in jobs)
+            wall = time.perf_counter() - started
+
+        source_data = mock.guilds[source_id]
+        dest_data = [mock.guilds[dest_id] for dest_id in dest_ids]
+        complete = all(len(d["roles"]) == len(source_data["roles"]) and
+                       len(d["channels"]) == len(source_data["channels"]) for d in dest_data)
+        return {
+            "scenario": name,
+            "success": bool(success) and complete,
+            "wall_time": wall,
+            "requests": mock.request_count,
+            "rate_limited": mock.rate_limited_count,
+            "server_errors": mock.server_error_count,
+            "clone_errors": clone_errors,
+            "roles": sum(len(d["roles"]) - 1 for d in dest_data),
+            "channels": sum(len(d["channels"]) for d in dest_data),
+            "messages": sum(len(mock.messages.get(c["id"], [])) for d in dest_data for c in d["channels"]),
+        }
+    finally:
+        await mock.stop()
+
+
+def _median(results, key):
+    return statistics.median(r[key] for r in results)
+
+
+def _summarise(runs) -> dict:
+    summary = dict(runs[-1])
+    for key in ("wall_time", "requests", "rate_limited", "server_errors", "clone_errors"):
+        summary[key] = _median(runs, key)
+    summary["success"] = all(r["success"] for r in runs)
+    summary["runs"] = len(runs)
+    return summary
+
+
+def _print_table(results, baseline):
+    header = f"{'scenario':<16}{'ok':>4}{'wall s':>10}{'requests':>10}{'429':>7}{'5xx':>7}{'errors':>8}" \
+             f"{'roles':>7}{'channels':>10}{'messages':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        line = f"{r['scenario']:<16}{'yes' if r['success'] else 'NO':>4}{r['wall_time']:>10.2f}{r['requests']:>10}" \
+               f"{r['rate_limited']:>7}{r['server_errors']:>7}{r['clone_errors']:>8}{r['roles']:>7}" \
+               f"{r['channels']:>10}{r['messages']:>10}"
+        before = baseline.get(r["scenario"])
+        if before:
+            line += f"   wall {r['wall_time'] - before['wall_time']:+.2f}s" \
+                    f", requests {r['requests'] - before['requests']:+}" \
+                    f", 429 {r['rate_limited'] - before['rate_limited']:+}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the clone engine against a mock Discord API")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario, medians are reported")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--time-scale", type=float, default=0.05, help="rate limit window multiplier")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of injected 502 answers")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="probability of injected 429 answers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--coalesce", action="store_true", help="merge consecutive messages of the same author")
+    parser.add_argument("--jobs", type=int, default=1, help="destinations cloned at once through the job queue")
+    parser.add_argument("--journal-dir", default=str(Path(__file__).resolve().parent / ".journals"))
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the clone log")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+
+    results = []
+    for name in args.scenario or list(SCENARIOS):
+        runs = [asyncio.run(run_scenario(name, args)) for _ in range(args.repeat)]
+        results.append(_summarise(runs))
+
+    _print_table(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+                       "results": results}, f, indent=4)
+    return 0 if all(r["success"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Import time budget of the application entry points
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --repeat 5 --top 15 --output imports.json
+
+Every target is imported in a fresh interpreter with -X importtime. The
+script reports the cumulative import time of the target (median over
+--repeat runs) and fails when it is over budget or when it pulls in a
+module that must only load on first use (discord.py, requests, the
+explorer and message viewer, Tk in the engine...). Targets whose
+dependencies are not installed here are reported as skipped.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name: (module, budget in ms, modules that must not be imported)
+TARGETS = {
+    "headless": ("src.headless", 30, ("asyncio", "aiohttp", "tkinter", "customtkinter", "PIL", "discord", "requests")),
+    "engine": ("src.operation_file.serverclone", 500, ("tkinter", "customtkinter", "PIL", "discord", "requests")),
+    "gui": ("src.interface.main_window", 1500, ("discord", "requests", "src.interface.components.advanced_explorer",
+                                                "src.interface.components.message_viewer")),
+}
+
+
+def measure(module: str):
+    """(cumulative ms of module, {imported module: self ms}) of one cold import"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    total = 0.0
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            own, cumulative = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2].strip()
+        modules[name] = own / 1000
+        if name == module:
+            total = cumulative / 1000
+    return total, modules
+
+
+def forbidden_found(modules, forbidden):
+    return sorted(name for name in modules if any(name == f or name.startswith(f + ".") for f in forbidden))
+
+
+def check(name: str, repeat: int, budget=None) -> dict:
+    module, default_budget, forbidden = TARGETS[name]
+    budget = budget or default_budget
+    try:
+        runs = [measure(module) for _ in range(repeat)]
+    except ImportError as e:
+        return {"target": name, "module": module, "status": "skipped", "reason": str(e)}
+    modules = runs[-1][1]
+    found = forbidden_found(modules, forbidden)
+    ms = statistics.median(total for total, _ in runs)
+    return {
+        "target": name,
+        "module": module,
+        "status": "ok" if ms <= budget and not found else "fail",
+        "ms": round(ms, 1),
+        "budget_ms": budget,
+        "modules": len(modules),
+        "forbidden": found,
+        "slowest": sorted(modules.items(), key=lambda item: item[1], reverse=True),
+    }
+
+
+def print_results(results, top: int):
+    header = f"{'target':<10} {'status':<8} {'ms':>8} {'budget':>8} {'modules':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        if result["status"] == "skipped":
+            print(f"{result['target']:<10} {'skipped':<8} ({result['reason']})")
+            continue
+        print(f"{result['target']:<10} {result['status']:<8} {result['ms']:>8.1f} {result['budget_ms']:>8} "
+              f"{result['modules']:>8}")
+        if result["forbidden"]:
+            print(f"    imported too early: {', '.join(result['forbidden'])}")
+        for module, ms in result["slowest"][:top]:
+            print(f"    {ms:>8.1f} ms  {module}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import time of the entry points against their budget")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="default: every target")
+    parser.add_argument("--repeat", type=int, default=3, help="cold imports per target, the median is reported")
+    parser.add_argument("--budget", type=float, help="override the budget (ms) of the selected targets")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules listed per target (self time)")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [check(name, max(1, args.repeat), args.budget) for name in args.target or TARGETS]
+    print_results(results, args.top)
+    if args.output:
+        for result in results:
+            result["slowest"] = result.get("slowest", [])[:args.top]
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 1 if any(result["status"] == "fail" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
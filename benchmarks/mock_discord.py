@@ -0,0 +1,535 @@
+"""Local stand-in for the parts of the Discord REST API used by the cloner
+
+Run it standalone to point the app at it by hand:
+
+    python -m benchmarks.mock_discord --port 8765 --guild 50,100,20
+
+or start it from a script with MockDiscord.start(), as bench_clone does.
+"""
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# (limit, window seconds) per route, roughly what Discord answers in practice.
+# Windows are multiplied by MockDiscord.time_scale.
+DEFAULT_LIMITS = {
+    "GET": (50, 1.0),
+    "POST /guilds/{guild}/roles": (10, 10.0),
+    "POST /guilds/{guild}/channels": (5, 5.0),
+    "PATCH /channels/{channel}": (5, 5.0),
+    "DELETE /channels/{channel}": (5, 5.0),
+    "DELETE /guilds/{guild}/roles/{role}": (10, 10.0),
+    "PATCH /guilds/{guild}/roles/{role}": (10, 10.0),
+    "POST /channels/{channel}/messages": (5, 5.0),
+    "default": (5, 5.0),
+}
+GLOBAL_LIMIT = (50, 1.0)
+
+# 1x1 transparent PNG served for every icon and image attachment
+PNG_PIXEL = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class _Window:
+    """Fixed window counter of one bucket"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.count = 0
+        self.reset_at = 0.0
+
+    def hit(self, now: float) -> Tuple[bool, int, float]:
+        """Count a request, return (allowed, remaining, reset_after)"""
+        if now >= self.reset_at:
+            self.count = 0
+            self.reset_at = now + self.window
+        if self.count >= self.limit:
+            return False, 0, self.reset_at - now
+        self.count += 1
+        return True, self.limit - self.count, self.reset_at - now
+
+
+class MockDiscord:
+    """In-memory Discord REST API with latency, rate limits and injected faults
+
+    Guilds, roles, channels and messages live in plain dicts; every request is
+    counted so benchmarks can compare request and 429 counts between runs.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, time_scale: float = 1.0,
+                 limits: Optional[Dict[str, Tuple[int, float]]] = None, global_limit: Tuple[int, float] = GLOBAL_LIMIT,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = 0):
+        """
+        :param latency: seconds added to every response
+        :param jitter: random extra latency, up to this many seconds
+        :param time_scale: multiplier for every rate limit window (0.1 = ten times faster)
+        :param limits: per route (limit, window) overriding DEFAULT_LIMITS
+        :param global_limit: (limit, window) shared by all routes
+        :param error_rate: probability of answering 502 instead of handling a request
+        :param rate_limit_rate: probability of a spurious 429 on an otherwise allowed request
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.time_scale = time_scale
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.global_limit = global_limit
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+
+        self.guilds: Dict[str, dict] = {}
+        self.messages: Dict[str, List[dict]] = {}
+        self.files: Dict[str, bytes] = {}  # attachment ID -> uploaded content
+        self.channel_guild: Dict[str, str] = {}
+        self.user = {"id": "1", "username": "mock", "discriminator": "0", "avatar": None}
+
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.server_error_count = 0
+        self.route_counts: Dict[str, int] = {}
+
+        self._ids = itertools.count(int(time.time() * 1000 - 1420070400000) << 22)
+        self._windows: Dict[str, _Window] = {}
+        self._global = None
+        self._runner = None
+        self.api_url = None
+        self.cdn_url = None
+
+    # Data
+
+    def next_id(self) -> str:
+        return str(next(self._ids))
+
+    def add_guild(self, name: str = "Mock Guild", roles: int = 0, channels: int = 0, messages: int = 0,
+                  icon: bool = True, overwrites: bool = True) -> str:
+        """Create a synthetic guild
+
+        Channels are split into categories of up to 10 children, alternating
+        text and voice channels; text channels get `messages` messages each.
+
+        :return: the guild ID
+        """
+        guild_id = self.next_id()
+        guild = {"id": guild_id, "name": name, "icon": f"icon{guild_id}" if icon else None, "owner_id": self.user["id"]}
+        role_list = [{"id": guild_id, "name": "@everyone", "permissions": "1071698660929", "position": 0,
+                      "color": 0, "hoist": False, "mentionable": False, "managed": False}]
+        for i in range(roles):
+            role_list.append({"id": self.next_id(), "name": f"role-{i}", "permissions": str(1 << (i % 40)),
+                              "position": i + 1, "color": (i * 2654435761) % 0xFFFFFF, "hoist": i % 5 == 0,
+                              "mentionable": i % 3 == 0, "managed": False})
+        self.guilds[guild_id] = {"guild": guild, "roles": role_list, "channels": []}
+
+        category_count = (channels + 10) // 11 if channels else 0
+        category_ids = []
+        for c in range(category_count):
+            category = self._new_channel(guild_id, {"name": f"category-{c}", "type": 4, "position": c})
+            if overwrites and roles:
+                category["permission_overwrites"] = [
+                    {"id": role_list[1 + c % roles]["id"], "type": 0, "allow": "1024", "deny": "0"},
+                    {"id": guild_id, "type": 0, "allow": "0", "deny": "1024"},
+                ]
+            category_ids.append(category["id"])
+
+        for i in range(channels - category_count):
+            channel_type = 2 if i % 4 == 3 else 0
+            channel = self._new_channel(guild_id, {
+                "name": f"channel-{i}", "type": channel_type, "position": i // max(category_count, 1),
+                "parent_id": category_ids[i % category_count] if category_ids else None,
+                "topic": f"Topic {i}" if channel_type == 0 else None,
+            })
+            if channel_type == 0:
+                for m in range(messages):
+                    self._new_message(channel["id"], {"content": f"message {m} in channel-{i}"},
+                                      attachment=m % 10 == 9)
+        return guild_id
+
+    def _new_channel(self, guild_id: str, data: dict) -> dict:
+        channel_type = data.get("type", 0)
+        channel = {
+            "id": self.next_id(), "guild_id": guild_id, "type": channel_type, "name": data.get("name", "channel"),
+            "position": data.get("position", 0), "parent_id": data.get("parent_id"),
+            "permission_overwrites": data.get("permission_overwrites") or [],
+        }
+        if channel_type == 0:
+            channel.update({"topic": data.get("topic"), "nsfw": data.get("nsfw", False),
+                            "rate_limit_per_user": data.get("rate_limit_per_user", 0), "last_message_id": None})
+        elif channel_type == 2:
+            channel.update({"bitrate": data.get("bitrate", 64000), "user_limit": data.get("user_limit", 0)})
+        self.guilds[guild_id]["channels"].append(channel)
+        self.channel_guild[channel["id"]] = guild_id
+        self.messages[channel["id"]] = []
+        return channel
+
+    def _new_message(self, channel_id: str, data: dict, author: Optional[dict] = None, attachment: bool = False,
+                     files: Optional[List[Tuple[str, bytes]]] = None) -> dict:
+        message_id = self.next_id()
+        message = {
+            "id": message_id, "channel_id": channel_id, "type": 0,
+            "content": data.get("content") or "",
+            "author": author or {"id": "2", "username": "author", "global_name": "Author", "avatar": None},
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime()),
+            "embeds": data.get("embeds") or [], "attachments": [],
+        }
+        if attachment:
+            files = [("image.png", PNG_PIXEL)]
+        for filename, content in files or []:
+            attachment_id = self.next_id()
+            self.files[attachment_id] = content
+            message["attachments"].append({
+                "id": attachment_id, "filename": filename, "size": len(content),
+                "path": f"attachments/{channel_id}/{attachment_id}/{filename}",
+                "content_type": "image/png" if filename.endswith(".png") else "application/octet-stream",
+            })
+        self.messages[channel_id].append(message)
+        guild_id = self.channel_guild.get(channel_id)
+        if guild_id:
+            for channel in self.guilds[guild_id]["channels"]:
+                if channel["id"] == channel_id:
+                    channel["last_message_id"] = message_id
+        return message
+
+    def _channel(self, channel_id: str) -> Optional[dict]:
+        guild_id = self.channel_guild.get(channel_id)
+        if guild_id is None:
+            return None
+        return next((c for c in self.guilds[guild_id]["channels"] if c["id"] == channel_id), None)
+
+    # Server
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware], client_max_size=64 * 1024 * 1024)
+        app.add_routes([
+            web.get("/api/v10/users/@me", self._get_me),
+            web.get("/api/v10/users/@me/guilds", self._get_my_guilds),
+            web.post("/api/v10/guilds", self._create_guild),
+            web.get("/api/v10/guilds/{guild}", self._get_guild),
+            web.patch("/api/v10/guilds/{guild}", self._edit_guild),
+            web.get("/api/v10/guilds/{guild}/roles", self._list),
+            web.post("/api/v10/guilds/{guild}/roles", self._create_role),
+            web.patch("/api/v10/guilds/{guild}/roles", self._bulk_positions),
+            web.patch("/api/v10/guilds/{guild}/roles/{role}", self._edit_role),
+            web.delete("/api/v10/guilds/{guild}/roles/{role}", self._delete_role),
+            web.get("/api/v10/guilds/{guild}/channels", self._list),
+            web.post("/api/v10/guilds/{guild}/channels", self._create_channel),
+            web.patch("/api/v10/guilds/{guild}/channels", self._bulk_positions),
+            web.get("/api/v10/channels/{channel}", self._get_channel),
+            web.patch("/api/v10/channels/{channel}", self._edit_channel),
+            web.delete("/api/v10/channels/{channel}", self._delete_channel),
+            web.get("/api/v10/channels/{channel}/messages", self._get_messages),
+            web.post("/api/v10/channels/{channel}/messages", self._create_message),
+            web.get("/cdn/icons/{guild}/{file}", self._cdn_file),
+            web.get("/cdn/avatars/{user}/{file}", self._cdn_file),
+            web.get("/cdn/attachments/{channel}/{attachment}/{file}", self._cdn_file),
+        ])
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving, return the API base URL (port 0 picks a free port)"""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.api_url = f"http://{host}:{port}/api/v10"
+        self.cdn_url = f"http://{host}:{port}/cdn"
+        return self.api_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_counters(self):
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.server_error_count = 0
+        self.route_counts.clear()
+        self._windows.clear()
+        self._global = None
+
+    def _limit_for(self, route: str, method: str) -> Tuple[int, float]:
+        limit, window = self.limits.get(route) or self.limits.get(method) or self.limits["default"]
+        return limit, window * self.time_scale
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.request_count += 1
+        delay = self.latency + (self.random.random() * self.jitter if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if request.path.startswith("/cdn/"):
+            return await handler(request)
+        if not request.headers.get("Authorization"):
+            return web.json_response({"message": "401: Unauthorized", "code": 0}, status=401)
+
+        resource = request.match_info.route.resource
+        template = resource.canonical[len("/api/v10"):] if resource else request.path
+        route = f"{request.method} {template}"
+        self.route_counts[route] = self.route_counts.get(route, 0) + 1
+        major = request.match_info.get("guild") or request.match_info.get("channel") or ""
+        now = time.monotonic()
+
+        if self._global is None:
+            self._global = _Window(self.global_limit[0], self.global_limit[1] * self.time_scale)
+        allowed, _, reset_after = self._global.hit(now)
+        if not allowed:
+            self.rate_limited_count += 1
+            return web.json_response({"message": "You are being rate limited.", "retry_after": reset_after,
+                                      "global": True},
+                                     status=429, headers={"X-RateLimit-Global": "true", "X-RateLimit-Scope": "global",
+                                                          "Retry-After": f"{reset_after:.3f}"})
+
+        limit, window = self._limit_for(route, request.method)
+        key = f"{route}:{major}"
+        bucket = self._windows.get(key)
+        if bucket is None:
+            bucket = self._windows[key] = _Window(limit, window)
+        allowed, remaining, reset_after = bucket.hit(now)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": format(abs(hash(route)) & 0xFFFFFFFF, "08x"),
+        }
+        if not allowed or (self.rate_limit_rate and self.random.random() < self.rate_limit_rate):
+            self.rate_limited_count += 1
+            retry_after = reset_after if not allowed else min(reset_after, 0.1 * self.time_scale)
+            headers.update({"X-RateLimit-Scope": "user", "Retry-After": f"{retry_after:.3f}"})
+            return web.json_response({"message": "You are being rate limited.", "retry_after": retry_after,
+                                      "global": False}, status=429, headers=headers)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.server_error_count += 1
+            return web.Response(status=502, text="Bad Gateway", headers=headers)
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    # Handlers
+
+    def _guild(self, request) -> dict:
+        guild = self.guilds.get(request.match_info["guild"])
+        if guild is None:
+            raise web.HTTPNotFound(text=json.dumps({"message": "Unknown Guild", "code": 10004}),
+                                   content_type="application/json")
+        return guild
+
+    async def _get_me(self, request):
+        return web.json_response(self.user)
+
+    async def _get_my_guilds(self, request):
+        limit = min(int(request.query.get("limit", 200)), 200)
+        after = int(request.query.get("after", 0))
+        guilds = sorted((g["guild"] for g in self.guilds.values()), key=lambda g: int(g["id"]))
+        guilds = [g for g in guilds if int(g["id"]) > after][:limit]
+        return web.json_response([{"id": g["id"], "name": g["name"], "icon": g["icon"],
+                                   "owner": g.get("owner_id") == self.user["id"]} for g in guilds])
+
+    async def _create_guild(self, request):
+        data = await request.json()
+        guild_id = self.add_guild(data.get("name", "New Guild"), icon=False)
+        return web.json_response(self.guilds[guild_id]["guild"], status=201)
+
+    async def _get_guild(self, request):
+        return web.json_response(self._guild(request)["guild"])
+
+    async def _edit_guild(self, request):
+        guild = self._guild(request)
+        data = await request.json()
+        if "name" in data:
+            guild["guild"]["name"] = data["name"]
+        if data.get("icon"):
+            guild["guild"]["icon"] = f"icon{self.next_id()}"
+        return web.json_response(guild["guild"])
+
+    async def _list(self, request):
+        resource = "roles" if request.path.endswith("/roles") else "channels"
+        return web.json_response(self._guild(request)[resource])
+
+    async def _create_role(self, request):
+        guild = self._guild(request)
+        data = await request.json()
+        role = {"id": self.next_id(), "name": data.get("name") or "new role",
+                "permissions": str(data.get("permissions") or "0"), "color": data.get("color") or 0,
+                "hoist": bool(data.get("hoist")), "mentionable": bool(data.get("mentionable")),
+                "position": 1, "managed": False}
+        for other in guild["roles"]:
+            if other["position"] >= 1 and other["name"] != "@everyone":
+                other["position"] += 1
+        guild["roles"].append(role)
+        return web.json_response(role)
+
+    async def _edit_role(self, request):
+        guild = self._guild(request)
+        role = next((r for r in guild["roles"] if r["id"] == request.match_info["role"]), None)
+        if role is None:
+            return web.json_response({"message": "Unknown Role", "code": 10011}, status=404)
+        data = await request.json()
+        role.update({k: v for k, v in data.items() if k in ("name", "permissions", "color", "hoist", "mentionable")})
+        if "permissions" in data:
+            role["permissions"] = str(data["permissions"])
+        return web.json_response(role)
+
+    async def _delete_role(self, request):
+        guild = self._guild(request)
+        role_id = request.match_info["role"]
+        if role_id == guild["guild"]["id"]:
+            return web.json_response({"message": "Invalid Role", "code": 50028}, status=400)
+        before = len(guild["roles"])
+        guild["roles"] = [r for r in guild["roles"] if r["id"] != role_id]
+        if len(guild["roles"]) == before:
+            return web.json_response({"message": "Unknown Role", "code": 10011}, status=404)
+        return web.Response(status=204)
+
+    async def _bulk_positions(self, request):
+        guild = self._guild(request)
+        resource = "roles" if request.path.endswith("/roles") else "channels"
+        items = {item["id"]: item for item in await request.json()}
+        for entity in guild[resource]:
+            update = items.get(entity["id"])
+            if update:
+                for field in ("position", "parent_id"):
+                    if field in update:
+                        entity[field] = update[field]
+        if resource == "roles":
+            return web.json_response(guild["roles"])
+        return web.Response(status=204)
+
+    async def _create_channel(self, request):
+        guild = self._guild(request)
+        data = await request.json()
+        parent_id = data.get("parent_id")
+        if parent_id and not any(c["id"] == str(parent_id) for c in guild["channels"]):
+            return web.json_response({"message": "Invalid Form Body", "code": 50035}, status=400)
+        if len(guild["channels"]) >= 500:
+            return web.json_response({"message": "Maximum number of guild channels reached (500)", "code": 30013},
+                                     status=400)
+        channel = self._new_channel(guild["guild"]["id"], data)
+        return web.json_response(channel, status=201)
+
+    async def _get_channel(self, request):
+        channel = self._channel(request.match_info["channel"])
+        if channel is None:
+            return web.json_response({"message": "Unknown Channel", "code": 10003}, status=404)
+        return web.json_response(channel)
+
+    async def _edit_channel(self, request):
+        channel = self._channel(request.match_info["channel"])
+        if channel is None:
+            return web.json_response({"message": "Unknown Channel", "code": 10003}, status=404)
+        data = await request.json()
+        channel.update({k: v for k, v in data.items() if k != "id"})
+        return web.json_response(channel)
+
+    async def _delete_channel(self, request):
+        channel_id = request.match_info["channel"]
+        channel = self._channel(channel_id)
+        if channel is None:
+            return web.json_response({"message": "Unknown Channel", "code": 10003}, status=404)
+        guild = self.guilds[self.channel_guild.pop(channel_id)]
+        guild["channels"] = [c for c in guild["channels"] if c["id"] != channel_id]
+        for child in guild["channels"]:
+            if child.get("parent_id") == channel_id:
+                child["parent_id"] = None
+        self.messages.pop(channel_id, None)
+        return web.json_response(channel)
+
+    async def _get_messages(self, request):
+        channel_id = request.match_info["channel"]
+        if channel_id not in self.messages:
+            return web.json_response({"message": "Unknown Channel", "code": 10003}, status=404)
+        limit = max(1, min(int(request.query.get("limit", 50)), 100))
+        messages = self.messages[channel_id]  # oldest first
+        if "after" in request.query:
+            after = int(request.query["after"])
+            page = [m for m in messages if int(m["id"]) > after][:limit]
+        else:
+            before = int(request.query["before"]) if "before" in request.query else None
+            older = [m for m in messages if before is None or int(m["id"]) < before]
+            page = older[-limit:]
+        # Discord always answers newest first
+        return web.json_response([self._render_message(m) for m in reversed(page)])
+
+    async def _create_message(self, request):
+        channel_id = request.match_info["channel"]
+        if channel_id not in self.messages:
+            return web.json_response({"message": "Unknown Channel", "code": 10003}, status=404)
+        files = []
+        if request.content_type.startswith("multipart/"):
+            data = {}
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == "payload_json":
+                    data = json.loads(await part.text())
+                else:
+                    files.append((part.filename or "file", await part.read()))
+        else:
+            data = await request.json()
+        if not data.get("content") and not data.get("embeds") and not files:
+            return web.json_response({"message": "Cannot send an empty message", "code": 50006}, status=400)
+        if len(data.get("content") or "") > 2000:
+            return web.json_response({"message": "Invalid Form Body", "code": 50035}, status=400)
+        message = self._new_message(channel_id, data, author=self.user, files=files)
+        return web.json_response(self._render_message(message))
+
+    def _render_message(self, message: dict) -> dict:
+        # Attachment URLs depend on the port picked at start()
+        attachments = [{**{k: v for k, v in a.items() if k != "path"}, "url": f"{self.cdn_url}/{a['path']}"}
+                       for a in message["attachments"]]
+        return {**message, "attachments": attachments}
+
+    async def _cdn_file(self, request):
+        attachment_id = request.match_info.get("attachment")
+        if attachment_id is None:
+            return web.Response(body=PNG_PIXEL, content_type="image/png")  # icons and avatars
+        content = self.files.get(attachment_id)
+        if content is None:
+            return web.json_response({"message": "404: Not Found", "code": 0}, status=404)
+        return web.Response(body=content, content_type="application/octet-stream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the Discord REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--time-scale", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--guild", action="append", default=[],
+                        help="synthetic guild as roles,channels,messages (repeatable)")
+    args = parser.parse_args()
+
+    async def serve():
+        mock = MockDiscord(latency=args.latency, time_scale=args.time_scale, error_rate=args.error_rate)
+        url = await mock.start(args.host, args.port)
+        for index, spec in enumerate(args.guild or ["20,40,0"]):
+            roles, channels, messages = (int(x) for x in spec.split(","))
+            guild_id = mock.add_guild(f"Mock Guild {index}", roles, channels, messages)
+            print(f"Guild {guild_id}: {roles} roles, {channels} channels, {messages} messages per text channel")
+        print(f"Mock Discord API on {url} (CDN {mock.cdn_url}), any Authorization header is accepted")
+        try:
+            while True:
+                await asyncio.sleep(3600)
+        finally:
+            await mock.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
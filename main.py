@@ -1,10 +1,19 @@
-import customtkinter as ctk
-from src.interface.main_window import MainWindow
+import sys
 
 
 def main():
+    # Modalità senza interfaccia: niente Tk né Pillow da importare
+    if "--headless" in sys.argv[1:]:
+        from src.headless import main as headless_main
+        sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+    from src.interface.main_window import MainWindow
+    from src.utils.http_session import get_http_service
+
     app = MainWindow()
     app.mainloop()
+    # Chiude la sessione HTTP condivisa e il suo loop
+    get_http_service().close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
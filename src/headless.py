@@ -0,0 +1,231 @@
+"""Headless clone: runs the clone engine without the GUI
+
+    python main.py --headless --source 123 --dest 456
+    python main.py --headless --source 123 --dest 456 --options options.json --resume
+    python main.py --headless --source 123 --dest 456 --plan
+    python -m src.headless --dest 456 --snapshot guild.json.gz
+
+The token is read from the DISCORD_TOKEN environment variable or from
+--token-file, never from the command line. The options file is a JSON
+object with the keys of Clone.start_clone (the flags override it).
+
+Progress goes to stdout as JSON lines, one event per line (the to_dict()
+of src.operation_file.events, plus a final "result" line); the readable
+log goes to stderr. asyncio, aiohttp and the engine are only imported
+once the arguments are valid, and nothing from Tk or Pillow at all.
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+
+TOKEN_ENV = "DISCORD_TOKEN"
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1  # the clone failed or finished with errors
+EXIT_USAGE = 2  # bad arguments, missing token, unreadable options file
+EXIT_AUTH = 3  # token refused or no access to a guild
+EXIT_NOT_FOUND = 4  # a guild does not exist
+EXIT_NETWORK = 5  # Discord could not be reached
+EXIT_INTERRUPTED = 130  # SIGINT/SIGTERM, continue later with --resume
+
+# Emitted for every operation of the graph, only printed with --all-events
+OPERATION_EVENTS = ("op_started", "op_finished")
+
+
+class UsageError(Exception):
+    pass
+
+
+class GuildAccessError(Exception):
+    def __init__(self, message: str, exit_code: int):
+        super().__init__(message)
+        self.exit_code = exit_code
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="main.py --headless",
+        description="Clone a Discord server without the graphical interface.",
+        epilog=f"The token is read from ${TOKEN_ENV} or from --token-file. Exit codes: 0 done, 1 failed or "
+               "finished with errors, 2 bad usage, 3 access denied, 4 guild not found, 5 network error, "
+               "130 interrupted."
+    )
+    parser.add_argument("--source", help="ID of the source server (not needed with --snapshot)")
+    parser.add_argument("--dest", help="ID of the destination server")
+    parser.add_argument("--token-file", help=f"file holding the token (default: ${TOKEN_ENV})")
+    parser.add_argument("--options", help="JSON file with the clone options")
+    parser.add_argument("--snapshot", help="clone from a snapshot file instead of the live source")
+    parser.add_argument("--sync", action="store_true", help="only send the changes since the last clone")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted clone from its journal")
+    parser.add_argument("--journal-dir", help="where clone journals are kept")
+    parser.add_argument("--plan", action="store_true", help="print the planned requests and duration, change nothing")
+    parser.add_argument("--export", metavar="PATH", help="save a snapshot of the source instead of cloning")
+    parser.add_argument("--all-events", action="store_true", help="also print the start/end of every operation")
+    parser.add_argument("--quiet", action="store_true", help="no readable log on stderr")
+    parser.add_argument("--api-url", help="Discord API base URL (e.g. a local mock)")
+    parser.add_argument("--cdn-url", help="Discord CDN base URL")
+    return parser
+
+
+def read_token(path=None) -> str:
+    if path:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                token = f.read().strip()
+        except OSError as e:
+            raise UsageError(f"Cannot read the token file: {e}")
+    else:
+        token = os.environ.get(TOKEN_ENV, "").strip()
+    if not token:
+        raise UsageError(f"No token: set {TOKEN_ENV} or pass --token-file")
+    return token
+
+
+def read_options(args) -> dict:
+    options = {}
+    if args.options:
+        try:
+            with open(args.options, "r", encoding="utf-8") as f:
+                options = json.load(f)
+        except (OSError, ValueError) as e:
+            raise UsageError(f"Cannot read the options file: {e}")
+        if not isinstance(options, dict):
+            raise UsageError("The options file must hold a JSON object")
+    if args.snapshot:
+        options["snapshot_path"] = args.snapshot
+    if args.sync:
+        options["sync_mode"] = True
+    if args.resume:
+        options["resume"] = True
+    if args.journal_dir:
+        options["journal_dir"] = args.journal_dir
+    return options
+
+
+class JsonLines:
+    """Writes events as JSON lines (a listener of the clone event bus)"""
+
+    def __init__(self, stream, all_events: bool = False):
+        self.stream = stream
+        self.all_events = all_events
+
+    def write(self, data: dict):
+        self.stream.write(json.dumps(data, default=str) + "\n")
+        self.stream.flush()
+
+    def __call__(self, batch):
+        lines = [json.dumps(event.to_dict(), default=str) for event in batch
+                 if self.all_events or event.kind not in OPERATION_EVENTS]
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+
+async def fetch_guild(session, api_url: str, guild_id: str, headers: dict) -> dict:
+    """GET /guilds/{id}, raises GuildAccessError with the exit code matching the answer"""
+    async with session.get(f"{api_url}/guilds/{guild_id}", headers=headers) as resp:
+        if resp.status == 200:
+            return await resp.json()
+        if resp.status in (401, 403):
+            raise GuildAccessError(f"Access denied to server {guild_id} ({resp.status})", EXIT_AUTH)
+        if resp.status == 404:
+            raise GuildAccessError(f"Server {guild_id} not found", EXIT_NOT_FOUND)
+        raise GuildAccessError(f"Error reading server {guild_id}: {resp.status}", EXIT_FAILED)
+
+
+async def run(args, token: str, options: dict, output: JsonLines) -> int:
+    # The engine (and aiohttp) are only imported once the arguments are valid
+    import asyncio
+    import aiohttp
+    from src.operation_file.rest_client import API_BASE, CDN_BASE
+    from src.operation_file.serverclone import Clone
+    from src.utils.http_session import auth_headers, create_connector
+
+    api_url = (args.api_url or API_BASE).rstrip("/")
+    cdn_url = (args.cdn_url or CDN_BASE).rstrip("/")
+    headers = auth_headers(token)
+
+    # SIGTERM (cron, systemd, docker stop) stops the clone like Ctrl+C
+    task = asyncio.current_task()
+    with contextlib.suppress(NotImplementedError, RuntimeError):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+
+    clone = Clone(api_url=api_url, cdn_url=cdn_url)
+    clone.events.listen(output)
+    try:
+        async with aiohttp.ClientSession(connector=create_connector()) as session:
+            try:
+                guild_from = None
+                if args.source:
+                    guild_from = await fetch_guild(session, api_url, args.source, headers)
+                guild_to = await fetch_guild(session, api_url, args.dest, headers) if args.dest else None
+            except GuildAccessError as e:
+                output.write({"kind": "result", "status": "failed", "error": str(e), "exit_code": e.exit_code})
+                return e.exit_code
+
+            if args.export:
+                success = await clone.export_snapshot(guild_from, session, args.export, headers=headers)
+                output.write({"kind": "result", "status": "done" if success else "failed", "path": args.export})
+                return EXIT_OK if success else EXIT_FAILED
+
+            if args.plan:
+                plan = await clone.plan(guild_from, guild_to, session, options, headers=headers)
+                if plan is None:
+                    output.write({"kind": "result", "status": "failed"})
+                    return EXIT_FAILED
+                output.write({"kind": "plan", **plan.summary()})
+                return EXIT_OK
+
+            success = await clone.start_clone(guild_from, guild_to, session, options, headers=headers)
+            stats = clone.get_stats()
+            code = EXIT_OK if success and not stats["errors"] else EXIT_FAILED
+            output.write({"kind": "result", "status": "done" if success else "failed", "exit_code": code,
+                          "stats": stats})
+            return code
+    except aiohttp.ClientError as e:
+        output.write({"kind": "result", "status": "failed", "error": str(e), "exit_code": EXIT_NETWORK})
+        return EXIT_NETWORK
+    except asyncio.CancelledError:
+        clone.events.flush()
+        output.write({"kind": "result", "status": "interrupted", "exit_code": EXIT_INTERRUPTED,
+                      "stats": clone.get_stats()})
+        return EXIT_INTERRUPTED
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.export:
+        if not args.source:
+            parser.error("--export needs --source")
+    elif not args.dest or not (args.source or args.snapshot):
+        parser.error("--dest and one of --source or --snapshot are required")
+
+    try:
+        token = read_token(args.token_file)
+        options = read_options(args)
+    except UsageError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    # stdout is reserved to the JSON lines: the engine log goes to stderr (or nowhere)
+    output = JsonLines(sys.stdout, args.all_events)
+    log_stream = open(os.devnull, "w") if args.quiet else sys.stderr
+    import asyncio
+    try:
+        with contextlib.redirect_stdout(log_stream):
+            return asyncio.run(run(args, token, options, output))
+    except KeyboardInterrupt:
+        output.write({"kind": "result", "status": "interrupted", "exit_code": EXIT_INTERRUPTED})
+        return EXIT_INTERRUPTED
+    finally:
+        if args.quiet:
+            log_stream.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,22 @@
 import customtkinter as ctk
-import asyncio
-import aiohttp
 from typing import Callable, Dict, Any
 import tkinter as tk
 import threading
-from concurrent.futures import ThreadPoolExecutor
 
 from src.interface.styles.colors import Colors
 from src.interface.styles.discord_colors import DiscordColors
-from src.interface.components.message_viewer import MessageViewer
+from src.interface.utils.tk_async import run_async
+from src.operation_file.guild_cache import read_guild
+from src.utils.http_session import get_http_service
+
+
+async def fetch_guild_channels(token: str, guild_id: str):
+    """(channels, error) of a guild through the guild cache, runs on the shared HTTP loop"""
+    session = await get_http_service().session()
+    channels, status = await read_guild(session, token, guild_id, "channels")
+    if channels is None:
+        return None, f"HTTP {status}"
+    return channels, None
 
 
 def open_advanced_explorer_threaded(parent: ctk.CTkBaseClass,
@@ -441,14 +449,15 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
                 # Create message viewer
                 main_window = parent.winfo_toplevel()
                 token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
+                from src.interface.components.message_viewer import MessageViewer  # first opened channel
                 message_viewer = MessageViewer(right, lang, token, fg_color="transparent")
                 message_viewer.pack(fill="both", expand=True, padx=5, pady=5)
             
             # Load messages for current channel
-            asyncio.create_task(message_viewer.load_channel_messages(
+            message_viewer.load_channel_messages(
                 current_selected_channel['id'],
                 current_selected_channel['name']
-            ))
+            )
             
             messages_panel_visible = True
             
@@ -523,57 +532,6 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
             if messages_panel_visible:
                 toggle_messages_panel()  # Hide if currently visible
         
-        # Update members panel when channel is selected
-            try:
-                # Use asyncio.run in thread to handle async operations
-                async def async_fetch():
-                    async with aiohttp.ClientSession(headers=headers) as session:
-                        async with session.get(url) as resp:
-                            if resp.status != 200:
-                                return None, f"HTTP {resp.status}"
-                            return await resp.json(), None
-                
-                channels, error = asyncio.run(async_fetch())
-                
-                # Update UI in main thread
-                def update_ui():
-                    if error:
-                        status_lbl.configure(text=error)
-                        render_channels([])
-                    else:
-                        render_channels(channels or [])
-                
-                top.after(0, update_ui)
-                
-            except Exception as e:
-                # Update UI in main thread
-                def update_error():
-                    status_lbl.configure(text=str(e))
-                    render_channels([])
-                
-                top.after(0, update_error)
-        
-        # Run fetch in background thread
-        thread = threading.Thread(target=fetch_channels_sync, daemon=True)
-        thread.start()
-    
-    async def fetch_channels():
-        """Legacy async function for compatibility"""
-        main_window = parent.winfo_toplevel()
-        token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
-        headers = {"Authorization": token, "Content-Type": "application/json"}
-        url = f"https://discord.com/api/v10/guilds/{gid}/channels"
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(url) as resp:
-                    if resp.status != 200:
-                        status_lbl.configure(text=f"HTTP {resp.status}")
-                        return []
-                    return await resp.json()
-        except Exception as e:
-            status_lbl.configure(text=str(e))
-            return []
-
     def render_channels(channels):
         # Clear sidebar (preserve header and separator)
         for w in left.winfo_children():
@@ -668,8 +626,20 @@ def open_advanced_explorer(parent: ctk.CTkBaseClass,
             ready_text = "Pronto"
         status_lbl.configure(text=ready_text)
 
-    # Run fetch in background thread to avoid blocking UI
-    fetch_channels_threaded()
+    def channels_loaded(result):
+        channels, error = result
+        if error:
+            status_lbl.configure(text=error)
+        render_channels(channels or [])
+
+    def channels_failed(error):
+        status_lbl.configure(text=str(error))
+        render_channels([])
+
+    # Fetch channels on the shared HTTP loop, the result comes back on the Tk thread
+    main_window = parent.winfo_toplevel()
+    token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
+    run_async(top, fetch_guild_channels(token, gid), on_done=channels_loaded, on_error=channels_failed)
 
 
 def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
@@ -860,11 +830,12 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
                               font=ctk.CTkFont(size=14)).pack(side="right")
                 main_window = root.winfo_toplevel()
                 token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
+                from src.interface.components.message_viewer import MessageViewer  # first opened channel
                 message_viewer = MessageViewer(right, lang, token, fg_color="transparent")
                 message_viewer.pack(fill="both", expand=True, padx=5, pady=5)
-            asyncio.create_task(message_viewer.load_channel_messages(
+            message_viewer.load_channel_messages(
                 current_selected_channel['id'], current_selected_channel.get('name', 'channel')
-            ))
+            )
             messages_panel_visible = True
             try:
                 view_messages_btn.configure(text=f"📄 {lang.get_text('advanced.hide_messages')} da #{current_selected_channel.get('name','channel')}")
@@ -975,36 +946,27 @@ def create_advanced_explorer_frame(parent: ctk.CTkBaseClass,
             ready_text = "Pronto"
         status_lbl.configure(text=ready_text)
 
-    def fetch_channels_thread():
-        try:
-            main_window = root.winfo_toplevel()
-            token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
-            headers = {"Authorization": token, "Content-Type": "application/json"}
-            url = f"https://discord.com/api/v10/guilds/{gid}/channels"
-            async def async_fetch():
-                async with aiohttp.ClientSession(headers=headers) as session:
-                    async with session.get(url) as resp:
-                        if resp.status != 200:
-                            return None, f"HTTP {resp.status}"
-                        return await resp.json(), None
-            channels, error = asyncio.run(async_fetch())
-            def update_ui():
-                if error:
-                    status_lbl.configure(text=error)
-                    render_channels([])
-                else:
-                    nonlocal channels_cache
-                    channels_cache = channels or []
-                    render_channels(channels_cache)
-            root.after(0, update_ui)
-        except Exception as e:
-            root.after(0, lambda: (status_lbl.configure(text=str(e)), render_channels([])))
+    def channels_loaded(result):
+        nonlocal channels_cache
+        channels, error = result
+        if error:
+            status_lbl.configure(text=error)
+            render_channels([])
+        else:
+            channels_cache = channels or []
+            render_channels(channels_cache)
+
+    def channels_failed(error):
+        status_lbl.configure(text=str(error))
+        render_channels([])
 
     # Wire buttons
     view_messages_btn.configure(command=toggle_messages_panel)
     select_btn.configure(command=finalize_selection)
 
-    # Fetch channels in background
-    threading.Thread(target=fetch_channels_thread, daemon=True).start()
+    # Fetch channels on the shared HTTP loop, the result comes back on the Tk thread
+    main_window = root.winfo_toplevel()
+    token = getattr(main_window, 'verified_token', None) or getattr(getattr(main_window, 'token_input', None), 'entry', None).get()
+    run_async(root, fetch_guild_channels(token, gid), on_done=channels_loaded, on_error=channels_failed)
 
     return root
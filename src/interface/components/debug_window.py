@@ -166,6 +166,16 @@ class DebugWindow(ctk.CTkToplevel):
             self.log_file.write(formatted_message)
             self.log_file.flush()
         
+    def log_many(self, entries):
+        """Append a batch of (message, level) lines with a single insert"""
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        text = "".join(f"[{timestamp}] [{level}] {message}\n" for message, level in entries)
+        self.log_text.insert("end", text)
+        self.log_text.see("end")
+        if self.file_logging_enabled and self.log_file:
+            self.log_file.write(text)
+            self.log_file.flush()
+        
     def update_stats(self, **kwargs):
         for key, value in kwargs.items():
             if key in self.stats_labels:
@@ -1,22 +1,30 @@
 import customtkinter as ctk
-import discord
 import asyncio
 import time
 import sys
 import os
-import aiohttp
 import webbrowser
 import tkinter as tk
-import threading
 from tkinter import simpledialog, messagebox
 import re
-from PIL import Image, ImageTk
 
 # Import Colors directly
 from src.interface.styles.colors import Colors
 from src.operation_file.serverclone import Clone
+from src.operation_file.events import Counters
+from src.operation_file.job_queue import CloneJobQueue, CANCELLED, DONE
+from src.operation_file.guild_cache import read_guild
+from src.interface.components.job_list import JobList
+from src.interface.components.virtual_list import VirtualList
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.utils.settings_manager import SettingsManager
+from src.interface.utils.tk_async import run_async, call_on_tk
+from src.utils.http_session import get_http_service, auth_headers
+
+# Secondi senza richieste completate dopo i quali il clone è considerato bloccato
+STALL_SECONDS = 30
+# Ogni quanto (ms) la UI legge gli eventi del clone, in un unico batch
+EVENT_POLL_MS = 100
 
 
 # Define a custom exception for request errors
@@ -24,6 +32,20 @@ class RequestsError(Exception):
     """Custom exception for Discord API request errors"""
     pass
 
+
+def _format_duration(seconds: float) -> str:
+    """Secondi come mm:ss, oppure h:mm:ss oltre l'ora"""
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60:02d}:{rest % 60:02d}"
+
+
+def _format_size(size: int) -> str:
+    """Dimensione in byte in forma leggibile (es. 12.3 MB)"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
 class GuildInput(ctk.CTkFrame):
     def __init__(self, master):
         super().__init__(master, fg_color="transparent")
@@ -158,6 +180,8 @@ class GuildInput(ctk.CTkFrame):
         # Memorizziamo i server recuperati
         self.guilds_dict = {}  # Dizionario id -> details
         self.guild_display_names = []  # Lista dei nomi visualizzati (name (id))
+        self._selector_refresh = None  # Aggiorna il selettore aperto quando arrivano nuovi server
+        self._guilds_version = 0  # Cresce a ogni modifica dell'elenco dei server
         
         # Controlli avanzati
         self.controls_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
@@ -181,6 +205,21 @@ class GuildInput(ctk.CTkFrame):
         # Spazio vuoto espandibile
         spacer = ctk.CTkFrame(self.controls_frame, fg_color="transparent", height=30)
         spacer.pack(side="left", fill="x", expand=True)
+
+        # Pulsante stima: pianifica la clonazione senza modificare nulla
+        self.estimate_button = ctk.CTkButton(
+            self.controls_frame,
+            text=self.lang.get_text("input.guild.estimate_button"),
+            command=self.estimate_clone,
+            height=30,
+            width=100,
+            fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, ctk.get_appearance_mode().lower()),
+            text_color=Colors.get_color(Colors.TEXT_MUTED, ctk.get_appearance_mode().lower()),
+            hover_color=Colors.get_color(Colors.BACKGROUND, ctk.get_appearance_mode().lower()),
+            border_width=1,
+            border_color=Colors.get_color(Colors.TEXT_MUTED)
+        )
+        self.estimate_button.pack(side="right")
         
         # Sezione delle opzioni di clonazione
         self.options_frame = ctk.CTkFrame(self.main_frame)
@@ -211,6 +250,39 @@ class GuildInput(ctk.CTkFrame):
         )
         self.clone_name_icon_checkbox.grid(row=3, column=0, sticky="w", pady=5)
 
+        # Opzione ripresa: continua una clonazione interrotta dal suo journal
+        self.resume_var = ctk.BooleanVar(value=False)
+        self.resume_checkbox = ctk.CTkCheckBox(
+            self.checkboxes_frame,
+            text=self.lang.get_text("input.guild.option_resume"),
+            variable=self.resume_var,
+            onvalue=True,
+            offvalue=False
+        )
+        self.resume_checkbox.grid(row=3, column=1, sticky="w", pady=5)
+
+        # Opzione sync: invia solo le differenze invece di ricreare tutto
+        self.sync_mode_var = ctk.BooleanVar(value=False)
+        self.sync_mode_checkbox = ctk.CTkCheckBox(
+            self.checkboxes_frame,
+            text=self.lang.get_text("input.guild.option_sync"),
+            variable=self.sync_mode_var,
+            onvalue=True,
+            offvalue=False
+        )
+        self.sync_mode_checkbox.grid(row=4, column=0, sticky="w", pady=5)
+
+        # Opzione raggruppamento: unisce i messaggi consecutivi dello stesso autore
+        self.coalesce_messages_var = ctk.BooleanVar(value=False)
+        self.coalesce_messages_checkbox = ctk.CTkCheckBox(
+            self.checkboxes_frame,
+            text=self.lang.get_text("input.guild.option_coalesce"),
+            variable=self.coalesce_messages_var,
+            onvalue=True,
+            offvalue=False
+        )
+        self.coalesce_messages_checkbox.grid(row=4, column=1, sticky="w", pady=5)
+
         # Opzione ruoli
         self.clone_roles_var = ctk.BooleanVar(value=True)
         self.clone_roles_checkbox = ctk.CTkCheckBox(
@@ -372,6 +444,32 @@ class GuildInput(ctk.CTkFrame):
             text="00:00"
         )
         self.time_value.grid(row=4, column=1, sticky="e", pady=2)
+
+        # Statistiche: tempo rimanente (dalla velocità media delle richieste)
+        self.eta_label = ctk.CTkLabel(
+            self.stats_container,
+            text=self.lang.get_text("input.guild.stats_eta")
+        )
+        self.eta_label.grid(row=5, column=0, sticky="w", pady=2)
+
+        self.eta_value = ctk.CTkLabel(
+            self.stats_container,
+            text="-"
+        )
+        self.eta_value.grid(row=5, column=1, sticky="e", pady=2)
+
+        # Stima (pianificazione a secco)
+        self.estimate_label = ctk.CTkLabel(
+            self.stats_container,
+            text=self.lang.get_text("input.guild.stats_estimate")
+        )
+        self.estimate_label.grid(row=6, column=0, sticky="w", pady=2)
+
+        self.estimate_value = ctk.CTkLabel(
+            self.stats_container,
+            text="-"
+        )
+        self.estimate_value.grid(row=6, column=1, sticky="e", pady=2)
         
         # Clone Button
         self.clone_button = ctk.CTkButton(
@@ -399,14 +497,16 @@ class GuildInput(ctk.CTkFrame):
         )
         # Do not pack yet; shown when cloning starts
 
+        # Lista dei job in coda (mostrata dal primo clone)
+        self.job_list = JobList(self.main_frame)
+
         # Discord client
         self.client = None
 
-        # Clone task threading state
-        self._clone_thread = None
-        self._clone_loop = None
-        self._clone_task = None
-        self._cancel_requested = False
+        # Coda dei clone: più job condividono loop, connessioni e rate limit
+        self.job_queue = None  # creata sul loop HTTP al primo clone
+        self._current_job = None  # ultimo job avviato, seguito da statistiche e pulsante Cancel
+        self._event_consumer = None  # lettore degli eventi del job corrente
         
         # Update colors when theme changes
         self._update_colors()
@@ -440,11 +540,7 @@ class GuildInput(ctk.CTkFrame):
             elif not show and self.progress.winfo_ismapped():
                 self.progress.pack_forget()
             self.progress.set(value)
-        try:
-            # Marshal to main thread
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        call_on_tk(self, _apply)
     
     def update_advanced_explorer_visibility(self, enabled):
         """Update the visibility of advanced explorer buttons based on settings"""
@@ -511,15 +607,19 @@ class GuildInput(ctk.CTkFrame):
                 "black"
             )
     
-    def update_guilds_dropdowns(self, guilds_list):
-        """Aggiorna i dropdown con l'elenco dei server disponibili"""
+    def update_guilds_dropdowns(self, guilds_list, append=False):
+        """Aggiorna i dropdown con l'elenco dei server disponibili
+
+        Con append=True aggiunge una pagina all'elenco già caricato.
+        """
         if not guilds_list:
             return
             
         # Resettiamo i dizionari e le liste
-        self.guilds_dict = {}
-        server_names = [self.lang.get_text("input.guild.dropdown_placeholder")]
-        self.guild_display_names = []
+        if not append:
+            self.guilds_dict = {}
+            self.guild_display_names = []
+        placeholder = self.lang.get_text("input.guild.dropdown_placeholder")
         
         # Popoliamo il dizionario e la lista dei nomi
         for guild in guilds_list:
@@ -527,21 +627,25 @@ class GuildInput(ctk.CTkFrame):
             guild_name = guild['name']
             display_name = f"{guild_name} ({guild_id})"
             
+            if display_name not in self.guilds_dict:
+                self.guild_display_names.append(display_name)
             self.guilds_dict[display_name] = guild
-            server_names.append(display_name)
-            self.guild_display_names.append(display_name)
+        self._guilds_version += 1
         
         # Reset testo dei selettori se non è già stata fatta una scelta
-        placeholder = server_names[0]
         if not self.selected_source_display:
             self.source_select_btn.configure(text=placeholder)
         if not self.selected_dest_display:
             self.dest_select_btn.configure(text=placeholder)
+
+        # Un selettore aperto mostra anche i server appena arrivati
+        if self._selector_refresh is not None:
+            self._selector_refresh()
             
         # Aggiorniamo lo stato
         main_window = self.winfo_toplevel()
         main_window.status_bar.update_status(
-            self.lang.get_text("status.guilds_loaded").format(count=len(guilds_list)), 
+            self.lang.get_text("status.guilds_loaded").format(count=len(self.guild_display_names)), 
             "green"
         )
 
@@ -601,9 +705,9 @@ class GuildInput(ctk.CTkFrame):
         )
         clear_btn.pack(side="left", padx=(8, 0))
         
-        # Contenitore scrollabile per l'elenco
-        list_frame = ctk.CTkScrollableFrame(top, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
-        list_frame.pack(fill="both", expand=True, padx=12, pady=(0, 8))
+        # Elenco virtualizzato: solo le righe visibili esistono come widget
+        guild_list = VirtualList(top, on_activate=lambda name: select_and_close(name), mode=mode)
+        guild_list.pack(fill="both", expand=True, padx=12, pady=(0, 8))
 
         # Footer con conteggio risultati e tasto Explorer avanzato (se abilitato)
         footer = ctk.CTkFrame(top, fg_color="transparent")
@@ -631,43 +735,18 @@ class GuildInput(ctk.CTkFrame):
         
         # Stato per debounce
         self._search_after_id = None
-        selected_index = tk.IntVar(value=0)
-        current_items = []
-        item_buttons = []
-
-        def highlight_selection():
-            for idx, btn in enumerate(item_buttons):
-                if idx == selected_index.get():
-                    btn.configure(fg_color=Colors.get_color(Colors.TEXT, mode), text_color=Colors.get_color(Colors.BACKGROUND, mode))
-                else:
-                    btn.configure(fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode), text_color=Colors.get_color(Colors.TEXT, mode))
-        
+        # Nomi in minuscolo calcolati una volta per versione dell'elenco, non a ogni tasto
+        search_index = []
+        search_version = [None]
+
+        def refresh_search_index():
+            if search_version[0] != self._guilds_version:
+                search_index[:] = [n.lower() for n in self.guild_display_names]
+                search_version[0] = self._guilds_version
+
         def populate(items):
-            # Pulisci
-            for w in list_frame.winfo_children():
-                w.destroy()
-            item_buttons.clear()
-            current_items.clear()
-            # Aggiungi voci
-            for name in items:
-                btn = ctk.CTkButton(
-                    list_frame,
-                    text=name,
-                    anchor="w",
-                    height=36,
-                    fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode),
-                    text_color=Colors.get_color(Colors.TEXT, mode),
-                    hover_color=Colors.get_color(Colors.SETTINGS_BG, mode),
-                    command=lambda n=name: select_and_close(n)
-                )
-                btn.pack(fill="x", padx=6, pady=4)
-                item_buttons.append(btn)
-                current_items.append(name)
-            # Aggiorna conteggio e selezione
+            guild_list.set_items(items)
             count_lbl.configure(text=f"{len(items)}")
-            if items:
-                selected_index.set(0)
-                highlight_selection()
         
         def select_and_close(name):
             # Imposta il valore sul selettore corretto e invoca callback
@@ -680,9 +759,7 @@ class GuildInput(ctk.CTkFrame):
 
         def open_advanced_for_current():
             # Apre l'explorer per l'elemento correntemente selezionato
-            if not current_items:
-                return
-            display = current_items[selected_index.get()]
+            display = guild_list.selected_item()
             if display in self.guilds_dict:
                 guild_obj = self.guilds_dict[display]
                 # Chiudi il selettore prima di aprire l'explorer per evitare doppi modali
@@ -714,36 +791,39 @@ class GuildInput(ctk.CTkFrame):
                 except Exception:
                     pass
             def do_filter():
+                refresh_search_index()
                 q = search_var.get().strip().lower()
                 if not q:
                     items = self.guild_display_names
                 else:
-                    items = [n for n in self.guild_display_names if q in n.lower()]
+                    names = self.guild_display_names
+                    items = [names[i] for i, n in enumerate(search_index) if q in n]
                 populate(items)
             self._search_after_id = search_entry.after(150, do_filter)
         
         def on_key_nav(event):
-            if not current_items:
-                return
             key = event.keysym
-            idx = selected_index.get()
             if key in ("Down", "KP_Down"):
-                idx = (idx + 1) % len(current_items)
-                selected_index.set(idx)
-                highlight_selection()
+                guild_list.move(1)
             elif key in ("Up", "KP_Up"):
-                idx = (idx - 1) % len(current_items)
-                selected_index.set(idx)
-                highlight_selection()
+                guild_list.move(-1)
+            elif key in ("Next", "KP_Next"):
+                guild_list.page(1)
+            elif key in ("Prior", "KP_Prior"):
+                guild_list.page(-1)
             elif key in ("Return", "KP_Enter"):
-                select_and_close(current_items[selected_index.get()])
+                if guild_list.selected_item() is not None:
+                    select_and_close(guild_list.selected_item())
             elif key == "Escape":
                 top.destroy()
 
         search_entry.bind("<KeyRelease>", on_key_release)
         top.bind("<Key>", on_key_nav)
+        self._selector_refresh = on_key_release
+        top.bind("<Destroy>", lambda e: setattr(self, "_selector_refresh", None) if e.widget is top else None)
         
         # Popola inizialmente
+        refresh_search_index()
         populate(self.guild_display_names)
         search_entry.focus_set()
 
@@ -768,6 +848,9 @@ class GuildInput(ctk.CTkFrame):
         self.clone_voice_channels_var.set(True)
         self.clone_messages_var.set(True)
         self.messages_limit_var.set("100")
+        self.resume_var.set(False)
+        self.sync_mode_var.set(False)
+        self.coalesce_messages_var.set(False)
         self.toggle_messages_options()
         
         # Nascondiamo eventuali elementi visibili
@@ -798,8 +881,8 @@ class GuildInput(ctk.CTkFrame):
                 return str(self.guilds_dict[selected]['id'])
             return ""
 
-    def start_clone(self):
-        """Start the cloning process"""
+    def _validate_clone_inputs(self):
+        """Token and guild IDs of the form, None (with the error in the status bar) if invalid"""
         # Get token from token input
         main_window = self.winfo_toplevel()
         token = main_window.verified_token if hasattr(main_window, 'verified_token') else main_window.token_input.entry.get()
@@ -838,59 +921,58 @@ class GuildInput(ctk.CTkFrame):
         # Mostra errore se presente
         if error_message:
             main_window.status_bar.update_status(error_message, "red")
+            return None
+        return token, source_id, dest_id
+
+    def _clone_options(self) -> dict:
+        """Clone options selected in the form"""
+        return {
+            "clone_roles": self.clone_roles_var.get(),
+            "clone_categories": self.clone_categories_var.get(),
+            "clone_text_channels": self.clone_text_channels_var.get(),
+            "clone_voice_channels": self.clone_voice_channels_var.get(),
+            "clone_messages": self.clone_messages_var.get(),
+            "clone_name_icon": self.clone_name_icon_var.get(),
+            "resume": self.resume_var.get(),
+            "sync_mode": self.sync_mode_var.get(),
+            "coalesce_messages": self.coalesce_messages_var.get(),
+            "messages_limit": int(self.messages_limit_var.get()) if self.clone_messages_var.get()
+            else 0
+        }
+
+    def start_clone(self):
+        """Start the cloning process"""
+        main_window = self.winfo_toplevel()
+        inputs = self._validate_clone_inputs()
+        if inputs is None:
             return
-            
-        # Disable clone button during process
-        self.clone_button.configure(state="disabled")
+        # Le variabili Tk si leggono qui, sul thread di Tk: la coroutine riceve solo valori
+        options = self._clone_options()
+
         main_window.status_bar.update_status(
             self.lang.get_text("status.cloning"), 
             "blue"
         )
         
-        # Mostra la progress bar
+        # Mostra la progress bar e nasconde le statistiche del clone precedente
         self.update_progress(0, True)
+        self.hide_stats()
         
-        # Prepare cancellation and show cancel button
-        self._cancel_requested = False
+        # Show cancel button
         if not self.cancel_button.winfo_ismapped():
             self.cancel_button.pack(pady=(0, 10))
-            self.cancel_button.configure(state="normal")
-        
-        # Run cloning in background thread with its own event loop
-        def worker():
-            try:
-                loop = asyncio.new_event_loop()
-                self._clone_loop = loop
-                asyncio.set_event_loop(loop)
-                self._clone_task = loop.create_task(self._clone_guild(token, source_id, dest_id))
-                try:
-                    loop.run_until_complete(self._clone_task)
-                except asyncio.CancelledError:
-                    # Task was cancelled
-                    pass
-            finally:
-                try:
-                    loop.close()
-                except Exception:
-                    pass
-                self._clone_loop = None
-                self._clone_task = None
-                self._clone_thread = None
+        self.cancel_button.configure(state="normal")
         
-        self._clone_thread = threading.Thread(target=worker, daemon=True)
-        self._clone_thread.start()
+        # Il clone diventa un job della coda sul loop HTTP condiviso: altri clone possono partire intanto
+        run_async(self, self._clone_guild(*inputs, options), on_done=self._clone_finished,
+                  on_error=lambda e: self._clone_finished(None, str(e)))
 
     def cancel_clone(self):
-        """Request cancellation of the running clone task."""
-        if self._clone_loop and self._clone_task:
-            self._cancel_requested = True
-            def _cancel():
-                if not self._clone_task.done():
-                    self._clone_task.cancel()
-            try:
-                self._clone_loop.call_soon_threadsafe(_cancel)
-            except Exception:
-                pass
+        """Request cancellation of the current clone job."""
+        job = self._current_job
+        if job is not None and not job.finished:
+            # La coda vive sul loop HTTP: l'annullamento va eseguito lì
+            get_http_service().call_soon(self.job_queue.cancel, job.id)
             # Update UI indication
             self._debug_log(self.lang.get_text("status.cancelling") if hasattr(self.lang, 'get_text') else "Cancelling...", "INFO")
             try:
@@ -898,160 +980,164 @@ class GuildInput(ctk.CTkFrame):
             except Exception:
                 pass
     
-    async def _clone_guild(self, token, source_id, dest_id):
-        """Execute server cloning process using REST API"""
-        main_window = self.winfo_toplevel()
-        connector = None
-        try:
-            # Creiamo un connector sicuro per evitare memory leak
-            import ssl
-            import certifi
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            connector = aiohttp.TCPConnector(ssl=ssl_context, force_close=True)
-            
-            # Prepariamo l'header per le richieste API - assicuriamoci che il token sia nel formato corretto
-            if not token.startswith("Bot ") and not token.startswith("Bearer "):
-                # Se non è specificato il tipo di token, assumiamo che sia un user token
-                auth_token = token
-            else:
-                auth_token = token
-                
-            headers = {
-                "Authorization": auth_token,
-                "Content-Type": "application/json"
-            }
-            
-            # Mostra la barra di progresso e impostiamo a 0
-            self.update_progress(0, show=True)
-            
-            # Nascondiamo le statistiche all'inizio
-            self.hide_stats()
-            
-            # Creiamo il cloner
-            cloner = Clone(self._debug_log)
-            
-            # Timer per aggiornare le statistiche
-            stats_timer = None
-            
-            # Configuriamo una funzione per aggiornare la barra di progresso
-            def progress_callback(progress_percentage):
-                # Convertiamo il progresso in un valore tra 0.1 e 0.9
-                progress_value = 0.1 + (progress_percentage * 0.8)
-                self.update_progress(progress_value)
+    def estimate_clone(self):
+        """Plan the clone with the current options and show its cost, without changing anything"""
+        inputs = self._validate_clone_inputs()
+        if inputs is None:
+            return
+        self.estimate_button.configure(state="disabled")
+        self.winfo_toplevel().status_bar.update_status(self.lang.get_text("status.estimating"), "blue")
+        run_async(self, self._estimate_clone(*inputs, self._clone_options()), on_done=self._estimate_done,
+                  on_error=lambda e: self._estimate_done(None, str(e)))
+
+    async def _estimate_clone(self, token, source_id, dest_id, options):
+        """Riepilogo del piano (ClonePlan.summary) o None, sul loop HTTP condiviso"""
+        headers = auth_headers(token)
+        session = await get_http_service().session()
+        guilds = []
+        for guild_id in (source_id, dest_id):
+            guild, status = await read_guild(session, token, guild_id)
+            if guild is None:
+                self._debug_log(f"Errore nell'accesso al server {guild_id}: {status}", "ERROR")
+                return None
+            guilds.append(guild)
+
+        plan = await Clone(self._debug_log).plan(guilds[0], guilds[1], session, options, headers=headers)
+        return plan.summary() if plan is not None else None
+
+    def _estimate_done(self, summary, error=None):
+        if error:
+            self._debug_log(f"Errore durante la stima: {error}", "ERROR")
+        if summary is not None:
+            self.show_estimate(summary)
+        self.estimate_button.configure(state="normal")
+        self.winfo_toplevel().status_bar.update_status(self.lang.get_text("status.ready"), "black")
+
+    def show_estimate(self, summary: dict):
+        """Mostra la stima nel pannello statistiche (thread-safe)"""
+        def _apply():
+            if not self.info_panel.winfo_ismapped():
+                self.info_panel.pack(fill="x", pady=10, before=self.clone_button)
+            self.estimate_value.configure(text=self.lang.get_text("input.guild.estimate_result").format(
+                requests=summary.get("requests", 0),
+                time=_format_duration(summary.get("seconds", 0)),
+                messages=summary.get("messages", 0),
+                size=_format_size(summary.get("attachment_bytes", 0))
+            ))
+        call_on_tk(self, _apply)
+
+    async def _clone_guild(self, token, source_id, dest_id, options):
+        """Verifica l'accesso ai server, accoda il clone e ne attende la fine (loop HTTP condiviso)
+
+        Non tocca i widget: log e barra passano da call_on_tk, l'esito da _clone_finished.
+        :return: il job concluso, None se un server non è accessibile
+        """
+        headers = auth_headers(token)
+
+        # Verifichiamo l'accesso ai server source e destination (sessione condivisa, pool keep-alive)
+        session = await get_http_service().session()
+        # Verifichiamo il server source (dalla cache dei server se letto da poco, es. nell'explorer)
+        self._debug_log(f"Verifico accesso al server source (ID: {source_id})")
+        source_data, status = await read_guild(session, token, source_id)
+        if source_data is None:
+            self._debug_log(f"Errore nell'accesso al server source: {status}", "ERROR")
+            return None
+        source_name = source_data.get("name", "Unknown")
+        self._debug_log(f"Accesso al server source verificato: {source_name}")
             
-            # Passiamo la callback al cloner
-            cloner.set_progress_callback(progress_callback)
+        # Verifichiamo il server destination
+        self._debug_log(f"Verifico accesso al server destination (ID: {dest_id})")
+        dest_data, status = await read_guild(session, token, dest_id)
+        if dest_data is None:
+            self._debug_log(f"Errore nell'accesso al server destination: {status}", "ERROR")
+            return None
+        dest_name = dest_data.get("name", "Unknown")
+        self._debug_log(f"Accesso al server destination verificato: {dest_name}")
             
-            # Verifichiamo l'accesso ai server source e destination
-            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-                # Verifichiamo il server source
-                self._debug_log(f"Verifico accesso al server source (ID: {source_id})")
-                source_url = f"https://discord.com/api/v10/guilds/{source_id}"
-                async with session.get(source_url) as source_response:
-                    if source_response.status != 200:
-                        self._debug_log(f"Errore nell'accesso al server source: {source_response.status}", "ERROR")
-                        self.update_progress(0, show=False)  # Nascondiamo la barra di progresso
-                        return
-                    
-                    source_data = await source_response.json()
-                    source_name = source_data.get("name", "Unknown")
-                    self._debug_log(f"Accesso al server source verificato: {source_name}")
-                
-                # Verifichiamo il server destination
-                self._debug_log(f"Verifico accesso al server destination (ID: {dest_id})")
-                dest_url = f"https://discord.com/api/v10/guilds/{dest_id}"
-                async with session.get(dest_url) as dest_response:
-                    if dest_response.status != 200:
-                        self._debug_log(f"Errore nell'accesso al server destination: {dest_response.status}", "ERROR")
-                        self.update_progress(0, show=False)  # Nascondiamo la barra di progresso
-                        return
-                    
-                    dest_data = await dest_response.json()
-                    dest_name = dest_data.get("name", "Unknown")
-                    self._debug_log(f"Accesso al server destination verificato: {dest_name}")
-                
-                # Aggiorniamo la barra di progresso al 10%
-                self.update_progress(0.1)
-                
-                # Configuriamo un timer per aggiornare le statistiche ogni secondo
-                async def update_stats_timer():
-                    try:
-                        while True:
-                            self.update_stats(cloner.get_stats())
-                            await asyncio.sleep(1)
-                    except asyncio.CancelledError:
-                        # Gestiamo la cancellazione pulita del task
-                        pass
-                
-                # Avviamo il timer in un task separato
-                stats_timer = asyncio.create_task(update_stats_timer())
-                
-                # Avviamo la clonazione con le opzioni
-                try:
-                    self._debug_log(f"Avvio clonazione da {source_name} a {dest_name}")
-                    success = await cloner.start_clone(
-                        guild_from=source_data,
-                        guild_to=dest_data,
-                        session=session,
-                        options={
-                            "clone_roles": self.clone_roles_var.get(),
-                            "clone_categories": self.clone_categories_var.get(),
-                            "clone_text_channels": self.clone_text_channels_var.get(),
-                            "clone_voice_channels": self.clone_voice_channels_var.get(),
-                            "clone_messages": self.clone_messages_var.get(),
-                            "clone_name_icon": self.clone_name_icon_var.get(),
-                            "messages_limit": int(self.messages_limit_var.get()) if self.clone_messages_var.get()
-                            else 0
-                        }
-                    )
-                    
-                    if self._cancel_requested:
-                        self._debug_log(self.lang.get_text("status.cancelled") if hasattr(self.lang, 'get_text') else "Cloning cancelled", "INFO")
-                        self.update_progress(0, show=False)
-                        return
-                    if success:
-                        # Impostiamo la barra al 100% al completamento
-                        self.update_progress(1.0)
-                        self._debug_log(self.lang.get_text("logs.clone.completed"), "SUCCESS")
-                        # Aggiorniamo un'ultima volta le statistiche
-                        self.update_stats(cloner.get_stats())
-                    else:
-                        self.update_progress(0, show=False)  # Nascondiamo la barra in caso di errore
-                except Exception as clone_error:
-                    self._debug_log(
-                        self.lang.get_text("logs.clone.error").format(error=str(clone_error)), 
-                        "ERROR"
-                    )
-                    self.update_progress(0, show=False)  # Nascondiamo la barra in caso di errore
-        except Exception as e:
-            self._debug_log(
-                self.lang.get_text("logs.clone.connection_error").format(error=str(e)), 
-                "ERROR"
-            )
+        # Aggiorniamo la barra di progresso al 10%
+        self.update_progress(0.1)
+
+        # Accodiamo il clone: parte appena c'è uno slot libero
+        if self.job_queue is None:
+            self.job_queue = CloneJobQueue(session)
+            call_on_tk(self, self.job_list.attach, self.job_queue)
+        self._debug_log(f"Avvio clonazione da {source_name} a {dest_name}")
+        job = self.job_queue.submit(source_data, dest_data, options, headers=headers)
+        # La UI segue il job dal thread di Tk (prima che arrivi l'esito: i callback sono in ordine)
+        call_on_tk(self, self._follow_job, job)
+
+        await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    def _follow_job(self, job):
+        """Il pannello mostra gli eventi di job, letti a intervalli dal thread di Tk"""
+        self._current_job = job
+        consumer = job.clone.events.consumer()
+        self._event_consumer = consumer
+        self._pump_events(consumer)
+
+    def _clone_finished(self, job, error=None):
+        """Esito del clone (thread di Tk): barra, log, statistiche finali e pulsante Cancel"""
+        if job is not None and self._current_job is not job:
+            # Un clone più recente ha preso statistiche e barra: questo resta nella lista dei job
+            return
+        if error:
+            self._debug_log(self.lang.get_text("logs.clone.connection_error").format(error=error), "ERROR")
+            self.update_progress(0, show=False)
+        elif job is None:
+            # Server non accessibile, l'errore è già nel log; la barra resta se un altro clone la usa
+            if self._event_consumer is None:
+                self.update_progress(0, show=False)
+        elif job.state == CANCELLED:
+            self._debug_log(self.lang.get_text("status.cancelled") if hasattr(self.lang, 'get_text') else "Cloning cancelled", "INFO")
+            self.update_progress(0, show=False)
+        elif job.state == DONE:
+            # Impostiamo la barra al 100% al completamento
+            self.update_progress(1.0)
+            self._debug_log(self.lang.get_text("logs.clone.completed"), "SUCCESS")
+            # Aggiorniamo un'ultima volta le statistiche
+            self.update_stats(job.clone.get_stats())
+        else:
             self.update_progress(0, show=False)  # Nascondiamo la barra in caso di errore
-        finally:
-            # Cancelliamo il timer se esistente
-            if 'stats_timer' in locals() and stats_timer and not stats_timer.done():
-                stats_timer.cancel()
-                await asyncio.sleep(0.1)  # Piccola pausa per assicurarsi che il task venga cancellato
-            
-            # Ripristiniamo il pulsante
-            def _restore_ui():
-                self.clone_button.configure(state="normal")
-                if self.cancel_button.winfo_ismapped():
-                    self.cancel_button.pack_forget()
-            try:
-                self.after(0, _restore_ui)
-            except Exception:
-                _restore_ui()
-            
-            # Chiudiamo il connector anche in caso di errore
-            if connector:
+
+        if job is not None and self._event_consumer is not None:
+            # Ultima lettura degli eventi, poi il polling si ferma
+            consumer, self._event_consumer = self._event_consumer, None
+            self._pump_events(consumer, True)
+        # Solo se nessun altro clone è seguito dal pannello si toglie il pulsante Cancel
+        if self._event_consumer is None and self.cancel_button.winfo_ismapped():
+            self.cancel_button.pack_forget()
+
+    def _pump_events(self, consumer, final=False):
+        """Legge in un colpo solo gli eventi arrivati dall'ultima lettura (thread di Tk)"""
+        batch = consumer.poll()
+        if batch:
+            self._show_events(batch, final)
+        if not final and self._event_consumer is consumer:
+            self.after(EVENT_POLL_MS, self._pump_events, consumer)
+
+    def _show_events(self, batch, final=False):
+        """Un batch di eventi: un solo inserimento nel debug, stato e statistiche all'ultimo valore
+
+        Nell'ultimo batch la barra resta a quanto impostato dall'esito del clone.
+        """
+        lines = [(event.message(), event.level) for event in batch if event.level != "DEBUG"]
+        counters = next((event for event in reversed(batch) if isinstance(event, Counters)), None)
+        main_window = self.winfo_toplevel()
+        if lines:
+            if getattr(main_window, 'debug_mode', False) and hasattr(main_window, 'debug_window'):
                 try:
-                    await connector.close()
-                except Exception as connector_error:
-                    print(f"Error closing connector: {connector_error}")
-    
+                    if main_window.debug_window.winfo_exists():
+                        main_window.debug_window.log_many(lines)
+                except Exception as e:
+                    print(f"Debug window error: {e}")
+            message, level = lines[-1]
+            color = "red" if level == "ERROR" else "blue" if level == "INFO" else "green"
+            main_window.status_bar.update_status(message, color)
+        if counters is not None:
+            self.update_stats(counters.stats)
+            if not final:
+                self.update_progress(0.1 + counters.stats.get("progress", 0.0) * 0.8)
 
     def _debug_log(self, message, level="INFO"):
         """Send log to debug window if active (thread-safe)"""
@@ -1068,10 +1154,7 @@ class GuildInput(ctk.CTkFrame):
             # Always update status bar
             color = "red" if level == "ERROR" else "blue" if level == "INFO" else "green"
             main_window.status_bar.update_status(message, color)
-        try:
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        call_on_tk(self, _apply)
     
 
     def update_texts(self):
@@ -1098,6 +1181,9 @@ class GuildInput(ctk.CTkFrame):
         self.clone_voice_channels_checkbox.configure(text=self.lang.get_text("input.guild.option_voice_channels"))
         self.clone_messages_checkbox.configure(text=self.lang.get_text("input.guild.option_messages"))
         self.messages_limit_label.configure(text=self.lang.get_text("input.guild.option_messages_limit"))
+        self.resume_checkbox.configure(text=self.lang.get_text("input.guild.option_resume"))
+        self.sync_mode_checkbox.configure(text=self.lang.get_text("input.guild.option_sync"))
+        self.coalesce_messages_checkbox.configure(text=self.lang.get_text("input.guild.option_coalesce"))
         
         # Aggiorniamo anche i testi del pannello statistiche
         self.stats_title.configure(text=self.lang.get_text("input.guild.stats_title"))
@@ -1106,6 +1192,9 @@ class GuildInput(ctk.CTkFrame):
         self.messages_label.configure(text=self.lang.get_text("input.guild.stats_messages"))
         self.errors_label.configure(text=self.lang.get_text("input.guild.stats_errors"))
         self.time_label.configure(text=self.lang.get_text("input.guild.stats_time"))
+        self.eta_label.configure(text=self.lang.get_text("input.guild.stats_eta"))
+        self.estimate_label.configure(text=self.lang.get_text("input.guild.stats_estimate"))
+        self.estimate_button.configure(text=self.lang.get_text("input.guild.estimate_button"))
 
     def update_stats(self, stats: dict):
         """Aggiorna il pannello delle statistiche con i dati forniti (thread-safe)"""
@@ -1125,20 +1214,23 @@ class GuildInput(ctk.CTkFrame):
             minutes = int(elapsed_time // 60)
             seconds = int(elapsed_time % 60)
             self.time_value.configure(text=f"{minutes:02d}:{seconds:02d}")
-        try:
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+            # Tempo rimanente: senza richieste completate da un po' il clone è bloccato, non lento
+            operations = f"{stats.get('completed_operations', 0)}/{stats.get('total_operations', 0)}"
+            if stats.get('idle', 0) >= STALL_SECONDS:
+                eta = self.lang.get_text("input.guild.eta_stalled").format(seconds=int(stats['idle']))
+            elif stats.get('eta') is not None:
+                eta = _format_duration(stats['eta'])
+            else:
+                eta = "-"
+            self.eta_value.configure(text=f"{eta} ({operations})")
+        call_on_tk(self, _apply)
         
     def hide_stats(self):
         """Nasconde il pannello delle statistiche (thread-safe)"""
         def _apply():
             if self.info_panel.winfo_ismapped():
                 self.info_panel.pack_forget()
-        try:
-            self.after(0, _apply)
-        except Exception:
-            _apply()
+        call_on_tk(self, _apply)
     
 
     def toggle_messages_options(self):
@@ -1146,9 +1238,11 @@ class GuildInput(ctk.CTkFrame):
         if self.clone_messages_var.get():
             self.messages_limit_entry.configure(state="normal")
             self.messages_limit_label.configure(text_color=Colors.get_color(Colors.TEXT))
+            self.coalesce_messages_checkbox.configure(state="normal")
         else:
             self.messages_limit_entry.configure(state="disabled")
             self.messages_limit_label.configure(text_color=Colors.get_color(Colors.TEXT_MUTED))
+            self.coalesce_messages_checkbox.configure(state="disabled")
 
     def _setup_context_menu(self, widget, is_source=True):
         """Configura il menu contestuale (tasto destro) per i dropdown dei server"""
@@ -1205,12 +1299,6 @@ class GuildInput(ctk.CTkFrame):
         self._debug_log(f"Creazione nuovo server: {guild_name}", "INFO")
         
         try:
-            import ssl
-            import certifi
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            connector = aiohttp.TCPConnector(ssl=ssl_context, force_close=True)
-            
-
             api_url = "https://discord.com/api/v9/guilds"
             
             if not token.startswith("Bot ") and not token.startswith("Bearer "):
@@ -1233,49 +1321,49 @@ class GuildInput(ctk.CTkFrame):
             
             max_retries = 3
             attempt = 0
-            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-                while attempt <= max_retries:
-                    if attempt > 0:
-                        self._debug_log(f"Retry creazione server, tentativo {attempt}/{max_retries}", "WARN")
-                    async with session.post(api_url, json=guild_data) as response:
-                        if response.status == 201:
-                            result = await response.json()
-                            guild_id = result.get("id")
-                            guild_name = result.get("name")
-                            self._debug_log(f"Server creato: {guild_name} (ID: {guild_id})", "SUCCESS")
-                            return {"success": True, "id": guild_id, "name": guild_name}
+            session = await get_http_service().session()
+            while attempt <= max_retries:
+                if attempt > 0:
+                    self._debug_log(f"Retry creazione server, tentativo {attempt}/{max_retries}", "WARN")
+                async with session.post(api_url, json=guild_data, headers=headers) as response:
+                    if response.status == 201:
+                        result = await response.json()
+                        guild_id = result.get("id")
+                        guild_name = result.get("name")
+                        self._debug_log(f"Server creato: {guild_name} (ID: {guild_id})", "SUCCESS")
+                        return {"success": True, "id": guild_id, "name": guild_name}
                         
-                        if response.status == 429:
-                            retry_after = None
-                            header_val = response.headers.get("Retry-After")
-                            if header_val:
-                                try:
-                                    retry_after = float(header_val)
-                                except Exception:
-                                    retry_after = None
-                            if retry_after is None:
-                                try:
-                                    err = await response.json()
-                                    retry_after = float(err.get("retry_after", 1))
-                                except Exception:
-                                    retry_after = 1.0
-                            retry_after = max(0.5, min(retry_after, 15.0))
-                            self._debug_log(f"Rate limited (429). Attendo {retry_after}s prima del retry.", "WARN")
-                            attempt += 1
-                            if attempt > max_retries:
-                                return {"success": False, "error": f"Errore API (429): Le tue azioni sono limitate. Riprova tra {retry_after:.0f}s."}
-                            await asyncio.sleep(retry_after)
-                            continue
+                    if response.status == 429:
+                        retry_after = None
+                        header_val = response.headers.get("Retry-After")
+                        if header_val:
+                            try:
+                                retry_after = float(header_val)
+                            except Exception:
+                                retry_after = None
+                        if retry_after is None:
+                            try:
+                                err = await response.json()
+                                retry_after = float(err.get("retry_after", 1))
+                            except Exception:
+                                retry_after = 1.0
+                        retry_after = max(0.5, min(retry_after, 15.0))
+                        self._debug_log(f"Rate limited (429). Attendo {retry_after}s prima del retry.", "WARN")
+                        attempt += 1
+                        if attempt > max_retries:
+                            return {"success": False, "error": f"Errore API (429): Le tue azioni sono limitate. Riprova tra {retry_after:.0f}s."}
+                        await asyncio.sleep(retry_after)
+                        continue
 
-                        try:
-                            error_json = await response.json()
-                            msg = error_json.get("message") or str(error_json)
-                            code = error_json.get("code")
-                            details = f"{msg} (code={code})" if code is not None else msg
-                        except Exception:
-                            details = await response.text()
-                        self._debug_log(f"Errore nella creazione del server: {response.status} - {details}", "ERROR")
-                        return {"success": False, "error": f"Errore API ({response.status}): {details}"}
+                    try:
+                        error_json = await response.json()
+                        msg = error_json.get("message") or str(error_json)
+                        code = error_json.get("code")
+                        details = f"{msg} (code={code})" if code is not None else msg
+                    except Exception:
+                        details = await response.text()
+                    self._debug_log(f"Errore nella creazione del server: {response.status} - {details}", "ERROR")
+                    return {"success": False, "error": f"Errore API ({response.status}): {details}"}
         except Exception as e:
             self._debug_log(f"Errore imprevisto: {str(e)}", "ERROR")
             return {"success": False, "error": str(e)}
@@ -1309,33 +1397,15 @@ class GuildInput(ctk.CTkFrame):
             "blue"
         )
         
-        # Esegui la richiesta in un thread separato
-        threading.Thread(target=self._create_server_thread, args=(token, server_name), daemon=True).start()
-    
-    def _create_server_thread(self, token, server_name):
-        """Thread per la creazione di un nuovo server"""
-        main_window = self.winfo_toplevel()
-        
-        try:
-            # Creiamo un loop asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Eseguiamo la richiesta API
-            result = loop.run_until_complete(self.create_guild_request(token, server_name))
-            
-            # Gestiamo il risultato nel thread principale
-            if result["success"]:
-                self.after(0, lambda: self._handle_server_creation_success(result))
-            else:
-                self.after(0, lambda: self._handle_server_creation_error(result["error"]))
-            
-        except Exception as e:
-            # Gestiamo eventuali errori
-            self.after(0, lambda: self._handle_server_creation_error(str(e)))
-        finally:
-            # Chiudiamo l'event loop
-            loop.close()
+        # Richiesta sul loop HTTP condiviso, il risultato torna sul thread di Tk
+        run_async(self, self.create_guild_request(token, server_name), on_done=self._handle_server_creation_result,
+                  on_error=lambda e: self._handle_server_creation_error(str(e)))
+
+    def _handle_server_creation_result(self, result):
+        if result["success"]:
+            self._handle_server_creation_success(result)
+        else:
+            self._handle_server_creation_error(result["error"])
     
     def _handle_server_creation_success(self, result):
         """Gestisce la creazione riuscita di un server"""
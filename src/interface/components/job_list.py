@@ -0,0 +1,115 @@
+import customtkinter as ctk
+from src.interface.styles.colors import Colors
+from src.interface.utils.language_manager import LanguageManager
+from src.operation_file.job_queue import FINISHED_STATES
+from src.utils.http_session import get_http_service
+
+# Ogni quanto (ms) la lista rilegge lo stato dei job
+REFRESH_MS = 500
+
+
+class JobList(ctk.CTkFrame):
+    """Lista dei clone in coda: stato, progresso, pausa/ripresa e annullamento di ogni job"""
+
+    def __init__(self, master):
+        super().__init__(master, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT))
+
+        # Get the language manager
+        self.lang = LanguageManager()
+        self.queue = None  # CloneJobQueue, vive sul loop HTTP condiviso
+        self.rows = {}  # job ID -> widget della riga
+
+        self.header = ctk.CTkFrame(self, fg_color="transparent")
+        self.header.pack(fill="x", padx=10, pady=(10, 5))
+
+        self.title = ctk.CTkLabel(
+            self.header,
+            text=self.lang.get_text("input.guild.jobs_title"),
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        self.title.pack(side="left")
+
+        self.clear_button = ctk.CTkButton(
+            self.header,
+            text=self.lang.get_text("input.guild.jobs_clear"),
+            command=self.clear_finished,
+            width=110,
+            height=26
+        )
+        self.clear_button.pack(side="right")
+
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.pack(fill="x", padx=10, pady=(0, 10))
+        self.rows_frame.grid_columnconfigure(0, weight=1)
+
+        self.lang.add_observer(self.update_texts)
+
+    def attach(self, queue):
+        """Mostra i job di una coda e inizia ad aggiornarli"""
+        first = self.queue is None
+        self.queue = queue
+        if first:
+            self._refresh()
+
+    def _call(self, method, job_id):
+        # Le operazioni sulla coda vanno eseguite sul suo loop
+        get_http_service().call_soon(method, job_id)
+
+    def clear_finished(self):
+        if self.queue is not None:
+            get_http_service().call_soon(self.queue.remove_finished)
+
+    def _refresh(self):
+        jobs = self.queue.snapshot() if self.queue is not None else []
+        for job_id in [job_id for job_id in self.rows if job_id not in {job["id"] for job in jobs}]:
+            for widget in self.rows.pop(job_id).values():
+                widget.destroy()
+
+        for index, job in enumerate(jobs):
+            row = self.rows.get(job["id"])
+            if row is None:
+                row = self.rows[job["id"]] = self._create_row(job["id"])
+            for column, name in enumerate(("label", "progress", "pause", "cancel")):
+                row[name].grid(row=index, column=column, sticky="ew" if name != "label" else "w", padx=(0, 5), pady=2)
+            self._update_row(row, job)
+
+        if jobs and not self.winfo_ismapped():
+            self.pack(fill="x", pady=(0, 10))
+        elif not jobs and self.winfo_ismapped():
+            self.pack_forget()
+        self.after(REFRESH_MS, self._refresh)
+
+    def _create_row(self, job_id):
+        return {
+            "label": ctk.CTkLabel(self.rows_frame, text="", anchor="w"),
+            "progress": ctk.CTkProgressBar(self.rows_frame, width=120),
+            "pause": ctk.CTkButton(self.rows_frame, text="", width=80, height=26,
+                                   command=lambda: self._toggle_pause(job_id)),
+            "cancel": ctk.CTkButton(self.rows_frame, text=self.lang.get_text("input.guild.job_cancel"), width=80,
+                                    height=26, command=lambda: self._call(self.queue.cancel, job_id)),
+        }
+
+    def _update_row(self, row, job):
+        state = self.lang.get_text(f"input.guild.job_states.{job['state']}")
+        row["label"].configure(text=f"#{job['id']} {job['source']} → {job['destination']} ({state})")
+        row["progress"].set(job["progress"])
+        finished = job["state"] in FINISHED_STATES
+        paused = job["paused"]
+        row["pause"].configure(
+            text=self.lang.get_text("input.guild.job_resume" if paused else "input.guild.job_pause"),
+            state="disabled" if finished else "normal"
+        )
+        row["cancel"].configure(state="disabled" if finished else "normal")
+
+    def _toggle_pause(self, job_id):
+        job = self.queue.jobs.get(job_id) if self.queue is not None else None
+        if job is None:
+            return
+        self._call(self.queue.resume if job.clone.paused else self.queue.pause, job_id)
+
+    def update_texts(self):
+        """Update texts when the language changes"""
+        self.title.configure(text=self.lang.get_text("input.guild.jobs_title"))
+        self.clear_button.configure(text=self.lang.get_text("input.guild.jobs_clear"))
+        for row in self.rows.values():
+            row["cancel"].configure(text=self.lang.get_text("input.guild.job_cancel"))
@@ -1,18 +1,14 @@
 import customtkinter as ctk
-import asyncio
-import aiohttp
 import tkinter as tk
 from tkinter import messagebox
 from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime
 import webbrowser
 import os
-import tempfile
-from PIL import Image, ImageTk
-import io
-import requests
 
 from src.interface.styles.colors import Colors
+from src.interface.utils.tk_async import run_async
+from src.utils.http_session import get_http_service
 
 
 class MessageViewer(ctk.CTkScrollableFrame):
@@ -76,14 +72,15 @@ class MessageViewer(ctk.CTkScrollableFrame):
         )
         self.load_more_btn.pack(side="right", padx=5)
         
-    async def load_channel_messages(self, channel_id: str, channel_name: str, limit: int = 50):
-        """Load messages from a Discord channel."""
+    def load_channel_messages(self, channel_id: str, channel_name: str, limit: int = 50):
+        """Load messages from a Discord channel (call from the Tk thread)."""
         self.current_channel = {"id": channel_id, "name": channel_name}
         self.channel_label.configure(text=f"# {channel_name}")
         
         # Clear existing messages
         for widget in self.message_container.winfo_children():
             widget.destroy()
+        self.messages = []
         
         # Show loading
         loading_label = ctk.CTkLabel(
@@ -92,13 +89,14 @@ class MessageViewer(ctk.CTkScrollableFrame):
             text_color=Colors.get_color(Colors.TEXT_MUTED, self.mode)
         )
         loading_label.pack(pady=20)
-        
-        try:
-            messages = await self.fetch_messages(channel_id, limit)
+
+        def loaded(messages):
             loading_label.destroy()
             self.display_messages(messages)
-        except Exception as e:
-            loading_label.configure(text=f"Errore: {str(e)}")
+
+        # Fetched on the shared HTTP loop, displayed back on the Tk thread
+        run_async(self, self.fetch_messages(channel_id, limit), on_done=loaded,
+                  on_error=lambda e: loading_label.configure(text=f"Errore: {str(e)}"))
             
     async def fetch_messages(self, channel_id: str, limit: int = 50, before: str = None) -> List[Dict[str, Any]]:
         """Fetch messages from Discord API."""
@@ -112,11 +110,11 @@ class MessageViewer(ctk.CTkScrollableFrame):
         if before:
             params["before"] = before
             
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url, params=params) as resp:
-                if resp.status != 200:
-                    raise Exception(f"HTTP {resp.status}: {await resp.text()}")
-                return await resp.json()
+        session = await get_http_service().session()
+        async with session.get(url, params=params, headers=headers) as resp:
+            if resp.status != 200:
+                raise Exception(f"HTTP {resp.status}: {await resp.text()}")
+            return await resp.json()
                 
     def display_messages(self, messages: List[Dict[str, Any]]):
         """Display messages in the viewer."""
@@ -399,50 +397,44 @@ class MessageViewer(ctk.CTkScrollableFrame):
             
     def download_file(self, url: str, filename: str):
         """Download file to user's system."""
-        try:
-            response = requests.get(url, stream=True)
+        # Ask user where to save
+        from tkinter import filedialog
+        save_path = filedialog.asksaveasfilename(
+            defaultextension=os.path.splitext(filename)[1],
+            initialfile=filename,
+            title="Salva file"
+        )
+        if not save_path:
+            return
+        run_async(self, self._download(url, save_path),
+                  on_done=lambda path: messagebox.showinfo("Successo", f"File salvato: {path}"),
+                  on_error=lambda e: messagebox.showerror("Errore", f"Impossibile scaricare il file: {str(e)}"))
+
+    async def _download(self, url: str, save_path: str) -> str:
+        """Stream a file to disk, on the shared HTTP loop."""
+        session = await get_http_service().session()
+        async with session.get(url) as response:
             response.raise_for_status()
-            
-            # Ask user where to save
-            from tkinter import filedialog
-            save_path = filedialog.asksaveasfilename(
-                defaultextension=os.path.splitext(filename)[1],
-                initialvalue=filename,
-                title="Salva file"
-            )
-            
-            if save_path:
-                with open(save_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                messagebox.showinfo("Successo", f"File salvato: {save_path}")
-                
-        except Exception as e:
-            messagebox.showerror("Errore", f"Impossibile scaricare il file: {str(e)}")
+            with open(save_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(65536):
+                    f.write(chunk)
+        return save_path
             
     def refresh_messages(self):
         """Refresh current channel messages."""
         if self.current_channel:
-            asyncio.create_task(self.load_channel_messages(
+            self.load_channel_messages(
                 self.current_channel["id"],
                 self.current_channel["name"]
-            ))
+            )
             
     def load_more_messages(self):
         """Load more messages from current channel."""
         if self.current_channel and self.messages:
             oldest_message_id = self.messages[-1].get("id")
-            asyncio.create_task(self.load_more_messages_async(oldest_message_id))
-            
-    async def load_more_messages_async(self, before_id: str):
-        """Load more messages asynchronously."""
-        try:
-            more_messages = await self.fetch_messages(
-                self.current_channel["id"],
-                limit=25,
-                before=before_id
+            run_async(
+                self,
+                self.fetch_messages(self.current_channel["id"], limit=25, before=oldest_message_id),
+                on_done=lambda messages: messages and self.display_messages(messages),
+                on_error=lambda e: messagebox.showerror("Errore", f"Impossibile caricare altri messaggi: {str(e)}")
             )
-            if more_messages:
-                self.display_messages(more_messages)
-        except Exception as e:
-            messagebox.showerror("Errore", f"Impossibile caricare altri messaggi: {str(e)}")
\ No newline at end of file
@@ -1,15 +1,15 @@
 import customtkinter as ctk
-from PIL import Image, ImageTk
 import os
+import asyncio
+import aiohttp
 from src.interface.components.debug_window import DebugWindow
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.utils.settings_manager import SettingsManager
 from src.interface.styles.colors import Colors
-from src.interface.utils.version import CURRENT_VERSION, get_latest_version_sync, is_newer
-import threading
+from src.interface.utils.tk_async import run_async
+from src.interface.utils.version import CURRENT_VERSION, get_latest_version, is_newer
+from src.utils.http_session import get_http_service
 from tkinter import messagebox
-import requests
-import io
 import json
 
 class SettingsPanel(ctk.CTkFrame):
@@ -580,56 +580,65 @@ class SettingsPanel(ctk.CTkFrame):
                 pass
 
         # Start background fetch (will refresh UI and cache if newer)
-        threading.Thread(target=self._load_contributors_thread, daemon=True).start()
+        run_async(self, self._fetch_contributors(), on_done=self._contributors_loaded,
+                  on_error=lambda e: self._contributors_loaded((None, {}, str(e))))
 
-    def _load_contributors_thread(self):
+    async def _fetch_contributors(self):
+        """(contributors, {avatar url: image bytes}, error), runs on the shared HTTP loop"""
         url = "https://api.github.com/repos/seregonwar/DiscordServerCloner/contributors?per_page=100&anon=false"
-        contributors = []
-        error = None
-        try:
-            resp = requests.get(url, timeout=8)
-            if resp.status_code == 200:
-                data = resp.json()
-                # Filter and sort by contributions desc
-                contributors = [
-                    {
-                        "login": c.get("login"),
-                        "html_url": c.get("html_url"),
-                        "avatar_url": c.get("avatar_url"),
-                        "contributions": int(c.get("contributions", 0))
-                    }
-                    for c in data if c.get("type") == "User"
-                ]
-                contributors.sort(key=lambda x: x["contributions"], reverse=True)
-            else:
-                error = f"GitHub API returned {resp.status_code}"
-        except Exception as e:
-            error = str(e)
-
-        def finish():
-            # Modal might have been closed
-            if not hasattr(self, "_contributors_modal") or not self._contributors_modal.winfo_exists():
-                return
-            if error:
-                # If there was an error but cache was shown, keep the cache; else show error
-                if not self._contributors_container.winfo_children():
-                    ctk.CTkLabel(self._contributors_container, text=f"Unable to load contributors: {error}").pack(pady=10)
-                return
+        session = await get_http_service().session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=8)) as resp:
+            if resp.status != 200:
+                return None, {}, f"GitHub API returned {resp.status}"
+            data = await resp.json()
+        # Filter and sort by contributions desc
+        contributors = [
+            {
+                "login": c.get("login"),
+                "html_url": c.get("html_url"),
+                "avatar_url": c.get("avatar_url"),
+                "contributions": int(c.get("contributions", 0))
+            }
+            for c in data if c.get("type") == "User"
+        ]
+        contributors.sort(key=lambda x: x["contributions"], reverse=True)
 
-            # Save new list to cache and render
+        # Avatars are downloaded together, on the same pooled connection
+        async def avatar(avatar_url):
             try:
-                self._save_cached_contributors(contributors)
+                async with session.get(avatar_url, timeout=aiohttp.ClientTimeout(total=6)) as resp:
+                    return avatar_url, await resp.read() if resp.status == 200 else None
             except Exception:
-                pass
+                return avatar_url, None
+        avatars = await asyncio.gather(*(avatar(c["avatar_url"]) for c in contributors if c.get("avatar_url")))
+        return contributors, {u: content for u, content in avatars if content}, None
 
-            # Clear then render updated list
-            for child in list(self._contributors_container.winfo_children()):
-                child.destroy()
-            self._render_contributors_list(contributors)
+    def _contributors_loaded(self, result):
+        contributors, avatars, error = result
+        # Modal might have been closed
+        if not hasattr(self, "_contributors_modal") or not self._contributors_modal.winfo_exists():
+            return
+        if error:
+            # If there was an error but cache was shown, keep the cache; else show error
+            if not self._contributors_container.winfo_children():
+                ctk.CTkLabel(self._contributors_container, text=f"Unable to load contributors: {error}").pack(pady=10)
+            return
 
-        self.after(0, finish)
+        # Save new list to cache and render
+        try:
+            self._save_cached_contributors(contributors)
+        except Exception:
+            pass
 
-    def _render_contributors_list(self, contributors):
+        # Clear then render updated list
+        for child in list(self._contributors_container.winfo_children()):
+            child.destroy()
+        self._render_contributors_list(contributors, avatars)
+
+    def _render_contributors_list(self, contributors, avatars=None):
+        import io
+        from PIL import Image
+        avatars = avatars or {}
         mode = ctk.get_appearance_mode().lower()
         list_frame = ctk.CTkScrollableFrame(self._contributors_container, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode))
         list_frame.pack(fill="both", expand=True)
@@ -640,13 +649,11 @@ class SettingsPanel(ctk.CTkFrame):
             # Avatar
             photo = None
             try:
-                if c.get("avatar_url"):
-                    img_resp = requests.get(c["avatar_url"], timeout=6)
-                    if img_resp.status_code == 200:
-                        image = Image.open(io.BytesIO(img_resp.content)).convert("RGBA")
-                        # Use CTkImage for proper HighDPI scaling
-                        photo = ctk.CTkImage(light_image=image, dark_image=image, size=(32, 32))
-                        self._contributors_photo_refs.append(photo)
+                if avatars.get(c.get("avatar_url")):
+                    image = Image.open(io.BytesIO(avatars[c["avatar_url"]])).convert("RGBA")
+                    # Use CTkImage for proper HighDPI scaling
+                    photo = ctk.CTkImage(light_image=image, dark_image=image, size=(32, 32))
+                    self._contributors_photo_refs.append(photo)
             except Exception:
                 photo = None
 
@@ -717,41 +724,33 @@ class SettingsPanel(ctk.CTkFrame):
                 self.check_updates_button.configure(state="disabled", text="Checking…")
             except Exception:
                 pass
-        threading.Thread(target=self._check_updates_thread, daemon=True).start()
-
-    def _check_updates_thread(self):
-        """Worker to check the latest GitHub release without blocking UI."""
-        try:
-            latest = get_latest_version_sync(timeout=6.0)
-        except Exception:
-            latest = None
+        run_async(self, get_latest_version(timeout=6.0), on_done=self._check_updates_done,
+                  on_error=lambda e: self._check_updates_done(None))
 
-        def finish():
-            # Restore button
-            if hasattr(self, 'check_updates_button'):
-                try:
-                    self.check_updates_button.configure(state="normal", text="🔄 Check updates")
-                except Exception:
-                    pass
+    def _check_updates_done(self, latest):
+        """Show the result of the release check (Tk thread)."""
+        # Restore button
+        if hasattr(self, 'check_updates_button'):
+            try:
+                self.check_updates_button.configure(state="normal", text="🔄 Check updates")
+            except Exception:
+                pass
 
-            if not latest:
-                messagebox.showinfo("Updates", "Could not check for updates right now. Please try again later.")
-                return
+        if not latest:
+            messagebox.showinfo("Updates", "Could not check for updates right now. Please try again later.")
+            return
 
-            if is_newer(latest, CURRENT_VERSION):
-                res = messagebox.askyesno(
-                    "Update available",
-                    f"A new version {latest} is available. You are on {CURRENT_VERSION}.\n\nOpen releases page?"
-                )
-                if res:
-                    import webbrowser
-                    webbrowser.open("https://github.com/seregonwar/DiscordServerCloner/releases")
-            else:
-                messagebox.showinfo("Up to date", f"You are on the latest version ({CURRENT_VERSION}).")
+        if is_newer(latest, CURRENT_VERSION):
+            res = messagebox.askyesno(
+                "Update available",
+                f"A new version {latest} is available. You are on {CURRENT_VERSION}.\n\nOpen releases page?"
+            )
+            if res:
+                import webbrowser
+                webbrowser.open("https://github.com/seregonwar/DiscordServerCloner/releases")
+        else:
+            messagebox.showinfo("Up to date", f"You are on the latest version ({CURRENT_VERSION}).")
 
-        # Switch back to UI thread
-        self.after(0, finish)
-        
     def toggle_advanced_explorer(self):
         """Toggle advanced explorer feature"""
         state = self.advanced_explorer_switch.get()
@@ -1,12 +1,20 @@
 import customtkinter as ctk
-from PIL import Image
 import os
-import threading
+import json
 import asyncio
 import aiohttp
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.styles.colors import Colors
 from src.interface.utils.validators import is_token_valid
+from src.interface.utils.tk_async import run_async, tk_caller
+from src.operation_file.rest_client import API_BASE
+from src.utils.http_session import get_http_service, auth_headers
+
+# Massimo di server restituito da GET /users/@me/guilds per richiesta
+GUILDS_PAGE_SIZE = 200
+# Oltre questi tentativi (o secondi di attesa in tutto) un 429 diventa un errore mostrato all'utente
+RATE_LIMIT_RETRIES = 3
+RATE_LIMIT_MAX_WAIT = 30.0
 
 class TokenInput(ctk.CTkFrame):
     def __init__(self, master):
@@ -221,87 +229,65 @@ class TokenInput(ctk.CTkFrame):
             "blue"
         )
         
-        # Esegui la verifica in un thread separato
-        threading.Thread(target=self._verify_token_thread, args=(token,), daemon=True).start()
-    
-    def _verify_token_thread(self, token):
-        """Thread per verificare il token e recuperare i server"""
-        try:
-            # Creiamo un evento asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            # Eseguiamo la verifica
-            result = loop.run_until_complete(self._verify_token_async(token))
-            
-            # Aggiorniamo l'UI nel thread principale
-            self.after(0, lambda: self._handle_verification_result(result, token))
-            
-        except Exception as e:
-            # Gestiamo eventuali errori
-            self.after(0, lambda: self._handle_verification_error(str(e)))
-        finally:
-            # Chiudiamo l'event loop
-            loop.close()
+        # Verifica sul loop HTTP condiviso (connessioni riutilizzate), il risultato torna sul thread di Tk
+        run_async(
+            self,
+            self._verify_token_async(token, on_page=tk_caller(
+                self, lambda guilds, first: self._handle_guilds_page(guilds, first, token))),
+            on_done=lambda result: self._handle_verification_result(result, token),
+            on_error=lambda e: self._handle_verification_error(str(e))
+        )
+
+    async def _verify_token_async(self, token, on_page=None, api_url=API_BASE):
+        """Verifica il token in modo asincrono usando solo HTTP
 
-    async def _verify_token_async(self, token):
-        """Verifica il token in modo asincrono usando solo HTTP"""
+        Utente e prima pagina di server partono insieme; le pagine successive
+        (after=<ultimo id>) arrivano a on_page(guilds, first) man mano.
+        """
         try:
-            import ssl
-            import certifi
-            
-            # Create SSL context using certifi's CA bundle
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
+            headers = auth_headers(token)
             
-            # Creiamo un connector sicuro per evitare memory leak e usando il bundle CA corretto
-            connector = aiohttp.TCPConnector(ssl=ssl_context, force_close=True)
-            
-            # URL delle API Discord per ottenere i server dell'utente
-            api_url = "https://discord.com/api/v10/users/@me/guilds"
-            user_url = "https://discord.com/api/v10/users/@me"
-            
-            headers = {
-                "Authorization": token,
-                "Content-Type": "application/json"
+            # Sessione condivisa: SSL context, DNS e connessioni keep-alive riutilizzati
+            session = await get_http_service().session()
+            user_task = asyncio.ensure_future(self._get_json(session, f"{api_url}/users/@me", headers))
+            page_task = asyncio.ensure_future(self._get_json(session, f"{api_url}/users/@me/guilds",
+                                                             headers, {"limit": GUILDS_PAGE_SIZE}))
+            try:
+                user_status, user_data = await user_task
+            except BaseException:
+                page_task.cancel()
+                raise
+            if user_status != 200:
+                page_task.cancel()
+                if user_status == 401:
+                    # Token non valido
+                    return {"success": False, "error": "Token Discord non valido o scaduto"}
+                return {"success": False, "error": f"Errore API ({user_status}): {user_data}"}
+            username = user_data.get("username", "Utente")
+
+            guilds = []
+            status, page = await page_task
+            while True:
+                if status != 200:
+                    # I server già arrivati restano selezionabili
+                    return {"success": False, "error": f"Errore API ({status}): {page}", "guilds": guilds,
+                            "username": username}
+                # Convertiamo i dati nel formato atteso
+                page_guilds = [{'id': guild.get('id'), 'name': guild.get('name'), 'icon': guild.get('icon')}
+                               for guild in page]
+                if on_page is not None and (page_guilds or not guilds):
+                    on_page(page_guilds, not guilds)
+                guilds.extend(page_guilds)
+                if len(page) < GUILDS_PAGE_SIZE:
+                    break
+                status, page = await self._get_json(session, f"{api_url}/users/@me/guilds", headers,
+                                                    {"limit": GUILDS_PAGE_SIZE, "after": page[-1]["id"]})
+
+            return {
+                "success": True, 
+                "guilds": guilds, 
+                "username": username
             }
-            
-            async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-                # Prima verifichiamo le informazioni utente
-                async with session.get(user_url) as user_response:
-                    if user_response.status == 401:
-                        # Token non valido
-                        return {"success": False, "error": "Token Discord non valido o scaduto"}
-                    elif user_response.status != 200:
-                        # Altri errori
-                        error_data = await user_response.text()
-                        return {"success": False, "error": f"Errore API ({user_response.status}): {error_data}"}
-                    
-                    # Otteniamo i dati utente
-                    user_data = await user_response.json()
-                    username = user_data.get("username", "Utente")
-                    
-                    # Ora recuperiamo i server
-                    async with session.get(api_url) as guilds_response:
-                        if guilds_response.status != 200:
-                            error_data = await guilds_response.text()
-                            return {"success": False, "error": f"Errore API ({guilds_response.status}): {error_data}"}
-                        
-                        guilds_data = await guilds_response.json()
-                        
-                        # Convertiamo i dati nel formato atteso
-                        guilds = []
-                        for guild in guilds_data:
-                            guilds.append({
-                                'id': guild.get('id'),
-                                'name': guild.get('name'),
-                                'icon': guild.get('icon')
-                            })
-                        
-                        return {
-                            "success": True, 
-                            "guilds": guilds, 
-                            "username": username
-                        }
                 
         except aiohttp.ClientError as e:
             return {"success": False, "error": f"Errore di connessione: {str(e)}"}
@@ -309,19 +295,50 @@ class TokenInput(ctk.CTkFrame):
             return {"success": False, "error": "Timeout durante la connessione alle API Discord"}
         except Exception as e:
             return {"success": False, "error": f"Errore imprevisto: {str(e)}"}
+
+    @staticmethod
+    async def _get_json(session, url, headers, params=None):
+        """(status, json o testo dell'errore) di una GET, attendendo i 429
+
+        Dopo RATE_LIMIT_RETRIES attese, o se Discord chiede di aspettare più di
+        RATE_LIMIT_MAX_WAIT secondi in tutto, restituisce il 429 come errore.
+        """
+        waited = 0.0
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            async with session.get(url, headers=headers, params=params) as response:
+                if response.status == 429:
+                    body = await response.text()
+                    try:
+                        retry_after = max(0.1, float(json.loads(body).get("retry_after", 1)))
+                    except Exception:
+                        retry_after = 1.0
+                    if attempt == RATE_LIMIT_RETRIES or waited + retry_after > RATE_LIMIT_MAX_WAIT:
+                        return response.status, body
+                    waited += retry_after
+                    await asyncio.sleep(retry_after)
+                    continue
+                if response.status != 200:
+                    return response.status, await response.text()
+                return response.status, await response.json()
+
+    def _handle_guilds_page(self, guilds, first, token):
+        """Mostra una pagina di server appena arriva (thread principale)"""
+        main_window = self.winfo_toplevel()
+        # La prima pagina sostituisce l'elenco di un'eventuale verifica precedente
+        main_window.guild_input.update_guilds_dropdowns(guilds, append=not first)
+        if first:
+            # Il token è già valido: i primi server sono subito utilizzabili
+            main_window.verified_token = token
     
     def _handle_verification_result(self, result, token):
         """Gestisce il risultato della verifica nel thread principale"""
         main_window = self.winfo_toplevel()
         
-        if result["success"]:
-            # Salviamo l'elenco dei server
+        if result.get("guilds") is not None:
+            # Salviamo l'elenco dei server (già mostrato pagina per pagina)
             self.guilds_list = result["guilds"]
-            
-            # Aggiorniamo l'interfaccia
-            guild_input = main_window.guild_input
-            guild_input.update_guilds_dropdowns(self.guilds_list)
-            
+
+        if result["success"]:
             # Aggiorniamo lo stato
             main_window.status_bar.update_status(
                 self.lang.get_text("status.connected").format(user=result["username"]), 
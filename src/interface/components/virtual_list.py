@@ -0,0 +1,174 @@
+import customtkinter as ctk
+from src.interface.styles.colors import Colors
+
+# Altezza (px) di una riga, spaziatura compresa
+ROW_HEIGHT = 40
+ROW_PADDING = 4
+
+
+class VirtualList(ctk.CTkFrame):
+    """Elenco di stringhe con selezione che crea solo le righe visibili
+
+    Le righe sono un numero fisso di pulsanti riciclati: scorrere o filtrare
+    cambia solo i testi, spostare la selezione ridisegna solo la riga vecchia
+    e quella nuova. Costo indipendente dal numero di voci.
+    """
+
+    def __init__(self, master, on_activate=None, mode=None, **kwargs):
+        mode = mode or ctk.get_appearance_mode().lower()
+        super().__init__(master, fg_color=Colors.get_color(Colors.BACKGROUND_LIGHT, mode), **kwargs)
+        self.on_activate = on_activate  # chiamata con la voce cliccata
+        self.items = []
+        self.first = 0  # indice della voce nella prima riga
+        self.selected = 0
+        self.rows = []
+        self.row_state = []  # (testo, selezionata) mostrati da ogni riga, per non riconfigurarla a vuoto
+        self.visible = 1
+        self.colors = {
+            False: dict(fg_color=Colors.get_color(Colors.SETTINGS_ITEM_BG, mode),
+                        text_color=Colors.get_color(Colors.TEXT, mode),
+                        hover_color=Colors.get_color(Colors.SETTINGS_BG, mode)),
+            True: dict(fg_color=Colors.get_color(Colors.TEXT, mode),
+                       text_color=Colors.get_color(Colors.BACKGROUND, mode),
+                       hover_color=Colors.get_color(Colors.TEXT, mode)),
+        }
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew", padx=(6, 0), pady=2)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+    def set_items(self, items):
+        """Sostituisce le voci mostrate, mantenendo la selezione se la voce è ancora presente"""
+        previous = self.selected_item()
+        self.items = items
+        try:
+            self.selected = items.index(previous) if previous is not None else 0
+        except ValueError:
+            self.selected = 0
+        self.first = 0
+        self._ensure_visible(self.selected)
+        self._render()
+
+    def selected_item(self):
+        if 0 <= self.selected < len(self.items):
+            return self.items[self.selected]
+        return None
+
+    def move(self, delta: int):
+        """Sposta la selezione di delta voci (con giro dai bordi)"""
+        if not self.items:
+            return
+        self.select((self.selected + delta) % len(self.items))
+
+    def page(self, direction: int):
+        """Sposta la selezione di una schermata, senza giro"""
+        if not self.items:
+            return
+        self.select(max(0, min(len(self.items) - 1, self.selected + direction * self.visible)))
+
+    def select(self, index: int):
+        old = self.selected
+        self.selected = index
+        if self._ensure_visible(index):
+            self._render()
+        else:
+            # Nessuno scorrimento: basta ridisegnare le due righe coinvolte
+            self._render_row(old - self.first)
+            self._render_row(index - self.first)
+
+    def scroll(self, rows: int):
+        self._scroll_to(self.first + rows)
+
+    def _scroll_to(self, first: int):
+        first = max(0, min(first, max(0, len(self.items) - self.visible)))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _ensure_visible(self, index: int) -> bool:
+        """Porta index nell'area visibile, True se è stato necessario scorrere"""
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.visible:
+            self.first = index - self.visible + 1
+        else:
+            return False
+        return True
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // ROW_HEIGHT)
+        if visible == self.visible and len(self.rows) >= visible:
+            return
+        self.visible = visible
+        # Le righe create restano: se la finestra si rimpicciolisce vengono solo nascoste
+        while len(self.rows) < visible:
+            index = len(self.rows)
+            row = ctk.CTkButton(self.body, text="", anchor="w", height=ROW_HEIGHT - ROW_PADDING,
+                                command=lambda r=index: self._activate_row(r), **self.colors[False])
+            self._bind_wheel(row)
+            self.rows.append(row)
+            self.row_state.append(None)  # non ancora posizionata
+        self._ensure_visible(self.selected)
+        self.first = max(0, min(self.first, len(self.items) - visible))
+        self._render()
+
+    def _render(self):
+        for index in range(len(self.rows)):
+            self._render_row(index)
+        total = len(self.items)
+        if total <= self.visible:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + self.visible) / total)
+
+    def _render_row(self, index: int):
+        if not 0 <= index < len(self.rows):
+            return
+        row = self.rows[index]
+        position = self.first + index
+        if index >= self.visible or position >= len(self.items):
+            if self.row_state[index] is not None:
+                row.place_forget()
+                self.row_state[index] = None
+            return
+        state = (self.items[position], position == self.selected)
+        if state == self.row_state[index]:
+            return
+        if self.row_state[index] is None:
+            row.place(x=0, y=index * ROW_HEIGHT, relwidth=1, height=ROW_HEIGHT - ROW_PADDING)
+        text, selected = state
+        if self.row_state[index] is not None and self.row_state[index][1] == selected:
+            row.configure(text=text)
+        else:
+            row.configure(text=text, **self.colors[selected])
+        self.row_state[index] = state
+
+    def _activate_row(self, index: int):
+        position = self.first + index
+        if position < len(self.items) and self.on_activate is not None:
+            self.on_activate(self.items[position])
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(round(float(value) * len(self.items)))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll(int(value) * step)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self.scroll(-3))  # Linux
+        widget.bind("<Button-5>", lambda e: self.scroll(3))
+
+    def _on_wheel(self, event):
+        # Windows: multipli di 120, macOS: piccoli interi
+        if abs(event.delta) >= 120:
+            self.scroll(-3 * (event.delta // 120))
+        else:
+            self.scroll(-event.delta)
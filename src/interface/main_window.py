@@ -1,23 +1,21 @@
 import customtkinter as ctk
-from PIL import Image
 import os
-import threading
 import webbrowser
-import requests
-import io
+import aiohttp
 
 from src.interface.components.header import Header
 from src.interface.components.token_input import TokenInput
 from src.interface.components.guild_input import GuildInput
 from src.interface.components.status_bar import StatusBar
-from src.interface.components.advanced_explorer import create_advanced_explorer_frame
 from src.interface.components.settings_panel import SettingsPanel
 from src.interface.utils.language_manager import LanguageManager
 from src.interface.utils.settings_manager import SettingsManager
 from src.interface.styles.colors import Colors
-from src.interface.utils.version import CURRENT_VERSION, get_latest_version_sync, is_newer
+from src.interface.utils.tk_async import run_async
+from src.interface.utils.version import CURRENT_VERSION, get_latest_version, is_newer
 
 from src.utils.assets import get_asset_path
+from src.utils.http_session import get_http_service, auth_headers
 
 class MainWindow(ctk.CTk):
     def __init__(self):
@@ -129,6 +127,7 @@ class MainWindow(ctk.CTk):
 
         self._profile_image_ref = None  # keep CTkImage ref
         self._profile_loaded = False
+        self._profile_future = None  # richiesta del profilo in corso
         
         # Rimozione completa del contenitore dell'icona per massimizzare lo spazio
             
@@ -398,28 +397,27 @@ class MainWindow(ctk.CTk):
         close_button.pack(pady=20)
     
     def _check_updates_start(self):
-        def worker():
-            latest = get_latest_version_sync()
-            if latest and is_newer(latest, CURRENT_VERSION):
-                def notify():
-                    try:
-                        msg = None
-                        try:
-                            msg = self.lang.get_text("status.update_available").format(version=latest)
-                        except Exception:
-                            msg = f"Update available: v{latest}"
-                        self.status_bar.update_status(msg + "  (Open Releases)", "orange")
-                        # Make status clickable to open releases page
-                        def open_releases(_event=None):
-                            webbrowser.open_new("https://github.com/seregonwar/DiscordServerCloner/releases")
-                        # Bind click on the status bar label if available
-                        if hasattr(self.status_bar, 'status_label'):
-                            self.status_bar.status_label.bind('<Button-1>', open_releases)
-                            self.status_bar.status_label.configure(cursor="hand2")
-                    except Exception:
-                        pass
-                self.after(0, notify)
-        threading.Thread(target=worker, daemon=True).start()
+        run_async(self, get_latest_version(), on_done=self._notify_update)
+
+    def _notify_update(self, latest):
+        if not latest or not is_newer(latest, CURRENT_VERSION):
+            return
+        try:
+            msg = None
+            try:
+                msg = self.lang.get_text("status.update_available").format(version=latest)
+            except Exception:
+                msg = f"Update available: v{latest}"
+            self.status_bar.update_status(msg + "  (Open Releases)", "orange")
+            # Make status clickable to open releases page
+            def open_releases(_event=None):
+                webbrowser.open_new("https://github.com/seregonwar/DiscordServerCloner/releases")
+            # Bind click on the status bar label if available
+            if hasattr(self.status_bar, 'status_label'):
+                self.status_bar.status_label.bind('<Button-1>', open_releases)
+                self.status_bar.status_label.configure(cursor="hand2")
+        except Exception:
+            pass
     
     def update_texts(self):
         """Update all interface texts when the language changes"""
@@ -713,68 +711,71 @@ class MainWindow(ctk.CTk):
     def _maybe_load_profile(self):
         """Se il token è stato verificato e il profilo non è ancora caricato, avvia il fetch."""
         try:
-            if self.verified_token and not self._profile_loaded:
-                threading.Thread(target=self._load_user_profile_thread, daemon=True).start()
+            if self.verified_token and not self._profile_loaded and self._profile_future is None:
+                self._profile_future = run_async(self, self._fetch_user_profile(self.verified_token),
+                                                 on_done=self._show_user_profile,
+                                                 on_error=lambda e: self._show_user_profile((None, None)))
         finally:
             # ricontrolla periodicamente, così se l'utente verifica il token dopo
             self.after(1000, self._maybe_load_profile)
 
-    def _load_user_profile_thread(self):
-        """Carica i dati utente Discord e aggiorna la UI (thread secondario)."""
-        token = self.verified_token
-        if not token:
-            return
-        headers = {"Authorization": token, "Content-Type": "application/json"}
+    async def _fetch_user_profile(self, token):
+        """(utente, bytes dell'avatar) da /users/@me, sul loop HTTP condiviso"""
+        session = await get_http_service().session()
         user_api = "https://discord.com/api/v10/users/@me"
-        user = None
-        try:
-            resp = requests.get(user_api, headers=headers, timeout=8)
-            if resp.status_code == 200:
-                user = resp.json()
-            else:
-                user = None
-        except Exception:
-            user = None
+        async with session.get(user_api, headers=auth_headers(token), timeout=aiohttp.ClientTimeout(total=8)) as resp:
+            if resp.status != 200:
+                return None, None
+            user = await resp.json()
 
-        def finish():
-            if not user:
-                return
-            # Ricava nome visualizzato e avatar URL
-            username = user.get("global_name") or user.get("username") or "User"
-            user_id = user.get("id")
-            avatar = user.get("avatar")
-            avatar_url = None
-            if user_id and avatar:
-                avatar_url = f"https://cdn.discordapp.com/avatars/{user_id}/{avatar}.png?size=64"
+        # Ricava l'avatar URL e scarica l'immagine sulla stessa connessione
+        avatar_bytes = None
+        user_id = user.get("id")
+        avatar = user.get("avatar")
+        if user_id and avatar:
+            avatar_url = f"https://cdn.discordapp.com/avatars/{user_id}/{avatar}.png?size=64"
+            try:
+                async with session.get(avatar_url, timeout=aiohttp.ClientTimeout(total=6)) as resp:
+                    if resp.status == 200:
+                        avatar_bytes = await resp.read()
+            except Exception:
+                avatar_bytes = None
+        return user, avatar_bytes
 
-            photo = None
-            if avatar_url:
-                try:
-                    img_resp = requests.get(avatar_url, timeout=6)
-                    if img_resp.status_code == 200:
-                        img = Image.open(io.BytesIO(img_resp.content)).convert("RGBA")
-                        # Usa CTkImage per HiDPI
-                        photo = ctk.CTkImage(light_image=img, dark_image=img, size=(40, 40))
-                except Exception:
-                    photo = None
+    def _show_user_profile(self, result):
+        """Aggiorna il profilo nella UI (thread di Tk)."""
+        self._profile_future = None
+        user, avatar_bytes = result
+        if not user:
+            return
+        username = user.get("global_name") or user.get("username") or "User"
 
-            # Aggiorna UI
+        photo = None
+        if avatar_bytes:
             try:
-                self.profile_name_label.configure(text=username)
-                # sotto-etichetta opzionale: @username
-                tag = user.get("username")
-                if tag:
-                    self.profile_sub_label.configure(text=f"@{tag}")
-                if photo:
-                    self._profile_image_ref = photo
-                    self.profile_avatar_label.configure(image=photo, text="")
-                else:
-                    self.profile_avatar_label.configure(text="🙂", image=None)
-                self._profile_loaded = True
+                import io
+                from PIL import Image
+                img = Image.open(io.BytesIO(avatar_bytes)).convert("RGBA")
+                # Usa CTkImage per HiDPI
+                photo = ctk.CTkImage(light_image=img, dark_image=img, size=(40, 40))
             except Exception:
-                pass
+                photo = None
 
-        self.after(0, finish)
+        # Aggiorna UI
+        try:
+            self.profile_name_label.configure(text=username)
+            # sotto-etichetta opzionale: @username
+            tag = user.get("username")
+            if tag:
+                self.profile_sub_label.configure(text=f"@{tag}")
+            if photo:
+                self._profile_image_ref = photo
+                self.profile_avatar_label.configure(image=photo, text="")
+            else:
+                self.profile_avatar_label.configure(text="🙂", image=None)
+            self._profile_loaded = True
+        except Exception:
+            pass
     
     def on_feature_toggle(self, feature_name, enabled):
         """Handle feature toggle changes from settings panel"""
@@ -819,7 +820,8 @@ class MainWindow(ctk.CTk):
                 finally:
                     self.restore_main_view()
 
-            # Create embedded explorer
+            # Create embedded explorer (il modulo, con il message viewer, si carica alla prima apertura)
+            from src.interface.components.advanced_explorer import create_advanced_explorer_frame
             self.embedded_explorer = create_advanced_explorer_frame(
                 self.main_container,
                 self.lang,
@@ -0,0 +1,122 @@
+import concurrent.futures
+import queue
+import threading
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+from src.utils.http_session import get_http_service
+
+T = TypeVar("T")
+
+# Ogni quanto (ms) Tk raccoglie i risultati pronti, solo mentre ce ne sono in attesa
+POLL_MS = 20
+
+
+class TkDispatcher:
+    """Porta sul thread di Tk i callback di completamento del loop HTTP condiviso
+
+    Tk non è thread-safe: il thread del loop mette i callback in una coda e
+    il mainloop la svuota con after(). Il timer gira solo finché ci sono
+    operazioni in corso, quindi a riposo non costa nulla.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._queue = queue.SimpleQueue()
+            cls._instance._pending = 0  # toccato solo dal thread di Tk
+            cls._instance._root = None
+        return cls._instance
+
+    def track(self, widget):
+        """Una nuova operazione attende il suo callback (da chiamare sul thread di Tk)"""
+        self._pending += 1
+        if self._pending == 1:
+            self._root = widget._root()
+            self._root.after(POLL_MS, self._drain)
+
+    def post(self, callback: Callable[[], None], completes: bool = True):
+        """Accoda un callback da eseguire sul thread di Tk (da qualsiasi thread)
+
+        completes=False per i risultati parziali: non chiudono l'operazione tracciata.
+        """
+        self._queue.put((callback, completes))
+
+    def _drain(self):
+        while True:
+            try:
+                callback, completes = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if completes:
+                self._pending -= 1
+            try:
+                callback()
+            except Exception:
+                pass
+        if self._pending > 0:
+            try:
+                self._root.after(POLL_MS, self._drain)
+            except Exception:
+                self._pending = 0  # finestra chiusa
+
+
+def tk_caller(widget, callback: Callable[..., None]) -> Callable[..., None]:
+    """Versione thread-safe di callback per i risultati parziali di una coroutine lanciata con run_async
+
+    La funzione restituita si chiama dal loop HTTP ed esegue callback(*args) sul
+    thread di Tk, nell'ordine di chiamata e sempre prima di on_done. Va usata solo
+    mentre la run_async è in corso: è lei a tenere vivo il polling.
+    """
+    dispatcher = TkDispatcher()
+
+    def deliver(args):
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        callback(*args)
+
+    return lambda *args: dispatcher.post(lambda: deliver(args), completes=False)
+
+
+def call_on_tk(widget, callback: Callable[..., None], *args):
+    """Esegue callback(*args) sul thread di Tk: subito se si è già lì, altrimenti come tk_caller
+
+    Per i metodi chiamati sia dalla UI sia dalle coroutine lanciate con run_async.
+    """
+    if threading.current_thread() is threading.main_thread():
+        callback(*args)
+    else:
+        tk_caller(widget, callback)(*args)
+
+
+def run_async(widget, coro: Coroutine[Any, Any, T],
+              on_done: Optional[Callable[[T], None]] = None,
+              on_error: Optional[Callable[[BaseException], None]] = None) -> "concurrent.futures.Future[T]":
+    """Esegue coro sul loop HTTP condiviso e poi on_done(result) o on_error(exc) sul thread di Tk
+
+    Va chiamata dal thread di Tk. I callback sono saltati se il widget è
+    stato distrutto nel frattempo o se la future è stata annullata.
+    """
+    dispatcher = TkDispatcher()
+
+    def deliver(future: concurrent.futures.Future):
+        if future.cancelled():
+            return
+        try:
+            if not widget.winfo_exists():
+                return
+        except Exception:
+            return
+        error = future.exception()
+        if error is not None:
+            if on_error is not None:
+                on_error(error)
+        elif on_done is not None:
+            on_done(future.result())
+
+    dispatcher.track(widget)
+    return get_http_service().submit(coro, callback=lambda future: dispatcher.post(lambda: deliver(future)))
@@ -2,6 +2,8 @@ import asyncio
 import aiohttp
 from typing import Optional
 
+from src.utils.http_session import get_http_service
+
 # Current application version
 CURRENT_VERSION = "2.0.0"
 
@@ -33,11 +35,10 @@ def is_newer(latest: str, current: str) -> bool:
 
 
 async def fetch_latest_version(session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
-    created = False
+    """Latest release tag; without a session it must run on the shared HTTP loop"""
     sess = session
     if sess is None:
-        sess = aiohttp.ClientSession()
-        created = True
+        sess = await get_http_service().session()
     try:
         async with sess.get(GITHUB_RELEASES_LATEST, headers={"Accept": "application/vnd.github+json"}) as resp:
             if resp.status != 200:
@@ -49,15 +50,11 @@ async def fetch_latest_version(session: Optional[aiohttp.ClientSession] = None)
             return None
     except Exception:
         return None
-    finally:
-        if created:
-            await sess.close()
 
 
-def get_latest_version_sync(timeout: float = 6.0) -> Optional[str]:
-    async def runner():
-        return await fetch_latest_version()
+async def get_latest_version(timeout: float = 6.0) -> Optional[str]:
+    """Latest release tag or None, never raises (run it on the shared HTTP loop)"""
     try:
-        return asyncio.run(asyncio.wait_for(runner(), timeout=timeout))
+        return await asyncio.wait_for(fetch_latest_version(), timeout=timeout)
     except Exception:
         return None
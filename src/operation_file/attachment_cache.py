@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+import aiohttp
+
+from src.utils.assets import get_asset_path
+
+CACHE_DIR = get_asset_path("attachment_cache")
+CHUNK_SIZE = 64 * 1024
+MAX_RETRIES = 3
+# Seconds between two writes of the index while downloading: a crash or a kill
+# loses at most this much of it (the files themselves stay on disk)
+SAVE_INTERVAL = 5.0
+_RETRY = object()  # result seen by the waiters of a cancelled download
+
+
+class AttachmentCache:
+    """Content-addressed disk cache of message attachments
+
+    Files are streamed to a spool file while they are hashed, then stored as
+    files/<sha256>: the same content is kept once whatever message it comes
+    from. An index maps Discord attachment IDs to hashes, so an attachment
+    seen in an earlier run (or in another channel) is never downloaded again.
+    Nothing is ever held in memory beyond one chunk.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or CACHE_DIR
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.index: Dict[str, str] = {}  # attachment ID -> sha256
+        self.downloaded = 0
+        self.reused = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._dirty = False
+        self._loaded = False
+        self._saved_at = time.monotonic()
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def save(self):
+        """Write the index (atomically) if new attachments were cached"""
+        if not self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.directory, "files", digest[:2], digest)
+
+    def cached_path(self, attachment_id: str) -> Optional[str]:
+        self.load()
+        digest = self.index.get(str(attachment_id))
+        if digest:
+            path = self.path_for(digest)
+            if os.path.exists(path):
+                return path
+        return None
+
+    async def fetch(self, session: aiohttp.ClientSession, attachment: dict) -> Optional[str]:
+        """Local path of an attachment, downloading it only if it is not cached yet
+
+        Concurrent requests for the same attachment share one download; if
+        its owner is cancelled the waiters start a new one.
+        """
+        attachment_id = str(attachment.get("id"))
+        while True:
+            path = self.cached_path(attachment_id)
+            if path:
+                self.reused += 1
+                return path
+            pending = self._pending.get(attachment_id)
+            if pending is None:
+                break
+            path = await asyncio.shield(pending)
+            if path is not _RETRY:
+                return path
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[attachment_id] = future
+        try:
+            digest = await self._download(session, attachment["url"])
+            self.index[attachment_id] = digest
+            self._dirty = True
+            self.downloaded += 1
+            future.set_result(self.path_for(digest))
+        except Exception as e:
+            future.set_exception(e)
+        except BaseException:
+            future.set_result(_RETRY)
+            raise
+        finally:
+            del self._pending[attachment_id]
+        if self._dirty and time.monotonic() - self._saved_at >= SAVE_INTERVAL:
+            try:
+                self.save()
+            except OSError:
+                pass  # riprova al prossimo download o a fine clone
+        return await future
+
+    async def _download(self, session: aiohttp.ClientSession, url: str) -> str:
+        spool_dir = os.path.join(self.directory, "spool")
+        os.makedirs(spool_dir, exist_ok=True)
+        attempt = 0
+        while True:
+            spool_path = os.path.join(spool_dir, uuid.uuid4().hex)
+            try:
+                digest = hashlib.sha256()
+                async with session.get(url) as resp:
+                    resp.raise_for_status()
+                    with open(spool_path, "wb") as f:
+                        async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                            digest.update(chunk)
+                            f.write(chunk)
+
+                digest = digest.hexdigest()
+                path = self.path_for(digest)
+                if not os.path.exists(path):  # otherwise the same content is already cached under another ID
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(spool_path, path)
+                return digest
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt > MAX_RETRIES or getattr(e, "status", 500) < 500:
+                    raise
+                await asyncio.sleep(0.5 * (2 ** attempt))
+            finally:
+                if os.path.exists(spool_path):
+                    os.remove(spool_path)
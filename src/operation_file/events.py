@@ -0,0 +1,243 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Events kept for consumers that poll late; older ones are dropped (and counted)
+BUFFER_SIZE = 4096
+# Seconds between two deliveries to the listeners of a bus
+BATCH_INTERVAL = 0.2
+
+
+class CloneEvent:
+    """Something that happened during a clone
+
+    Events are small slotted objects built where they happen and formatted
+    only by the consumers that need text, so emitting one costs an
+    allocation and a deque append.
+    """
+
+    __slots__ = ("seq", "time")
+    kind = "event"
+    level = "DEBUG"
+
+    def __init__(self):
+        self.seq = 0  # set by the bus
+        self.time = time.time()
+
+    def message(self) -> str:
+        return self.kind
+
+    def to_dict(self) -> dict:
+        data = {"kind": self.kind, "seq": self.seq, "time": self.time}
+        for cls in type(self).__mro__[:-2]:  # up to CloneEvent, excluded
+            for name in cls.__slots__:
+                data[name] = getattr(self, name)
+        return data
+
+
+class LogEvent(CloneEvent):
+    __slots__ = ("text", "level")
+    kind = "log"
+
+    def __init__(self, text: str, level: str = "INFO"):
+        super().__init__()
+        self.text = text
+        self.level = level
+
+    def message(self) -> str:
+        return self.text
+
+
+class OperationStarted(CloneEvent):
+    __slots__ = ("key",)
+    kind = "op_started"
+
+    def __init__(self, key: str):
+        super().__init__()
+        self.key = key
+
+    def message(self) -> str:
+        return f"Operation {self.key} started"
+
+
+class OperationFinished(CloneEvent):
+    __slots__ = ("key", "seconds", "error")
+    kind = "op_finished"
+
+    def __init__(self, key: str, seconds: float, error: Optional[str] = None):
+        super().__init__()
+        self.key = key
+        self.seconds = seconds
+        self.error = error
+
+    def message(self) -> str:
+        if self.error:
+            return f"Operation {self.key} failed after {self.seconds:.2f}s: {self.error}"
+        return f"Operation {self.key} finished in {self.seconds:.2f}s"
+
+
+class RateLimited(CloneEvent):
+    __slots__ = ("route", "retry_after", "is_global")
+    kind = "rate_limited"
+    level = "WARNING"
+
+    def __init__(self, route: str, retry_after: float, is_global: bool = False):
+        super().__init__()
+        self.route = route
+        self.retry_after = retry_after
+        self.is_global = is_global
+
+    def message(self) -> str:
+        scope = "Global rate limit" if self.is_global else "Rate limit"
+        return f"{scope} hit on {self.route}, retrying in {self.retry_after:.2f}s"
+
+
+class Retry(CloneEvent):
+    __slots__ = ("route", "attempt", "delay", "reason")
+    kind = "retry"
+    level = "WARNING"
+
+    def __init__(self, route: str, attempt: int, delay: float, reason: str):
+        super().__init__()
+        self.route = route
+        self.attempt = attempt
+        self.delay = delay
+        self.reason = reason
+
+    def message(self) -> str:
+        return f"{self.reason} on {self.route}, retrying in {self.delay:.1f}s (attempt {self.attempt})"
+
+
+class PhaseChanged(CloneEvent):
+    __slots__ = ("phase",)
+    kind = "phase"
+    level = "INFO"
+
+    def __init__(self, phase: str):
+        super().__init__()
+        self.phase = phase
+
+    def message(self) -> str:
+        return f"Phase: {self.phase}"
+
+
+class Counters(CloneEvent):
+    """Snapshot of Clone.get_stats()"""
+
+    __slots__ = ("stats",)
+    kind = "counters"
+
+    def __init__(self, stats: dict):
+        super().__init__()
+        self.stats = stats
+
+    def message(self) -> str:
+        return f"{self.stats.get('completed_operations', 0)}/{self.stats.get('total_operations', 0)} requests"
+
+
+class EventConsumer:
+    """Reads the events of a bus in batches, from any thread
+
+    Each consumer has its own position in the stream: a slow one only loses
+    the events that fell out of the ring buffer, counted in `dropped`.
+    """
+
+    def __init__(self, bus: "EventBus"):
+        self.bus = bus
+        self.position = bus.last_seq
+        self.dropped = 0
+
+    def poll(self) -> List[CloneEvent]:
+        """Events emitted since the previous poll, oldest first"""
+        buffered = list(self.bus.buffer)  # copied under the GIL, no lock against emit()
+        batch = []
+        for event in reversed(buffered):
+            if event.seq <= self.position:
+                break
+            batch.append(event)
+        if not batch:
+            return batch
+        batch.reverse()
+        self.dropped += max(0, batch[0].seq - self.position - 1)
+        self.position = batch[-1].seq
+        return batch
+
+
+class EventBus:
+    """Typed event stream of a clone, backed by a ring buffer
+
+    emit() never blocks and never formats anything: it stamps the event
+    and appends it to a bounded deque. Consumers read in batches, either by
+    polling an EventConsumer (the Tk thread does this on a timer) or as
+    listeners called on the event loop at most every `interval` seconds.
+    """
+
+    def __init__(self, capacity: int = BUFFER_SIZE, interval: float = BATCH_INTERVAL):
+        self.buffer = deque(maxlen=capacity)
+        self.interval = interval
+        self.last_seq = 0
+        self._sequence = itertools.count(1)
+        self._listeners: List[tuple] = []  # (consumer, callback)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def emit(self, event: CloneEvent):
+        event.seq = self.last_seq = next(self._sequence)
+        self.buffer.append(event)
+        if self._listeners and self._flush_handle is None:
+            try:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.interval, self.flush)
+            except RuntimeError:
+                # No loop in this thread: deliver right away
+                self.flush()
+
+    def log(self, text: str, level: str = "INFO"):
+        self.emit(LogEvent(text, level))
+
+    def consumer(self) -> EventConsumer:
+        return EventConsumer(self)
+
+    def listen(self, callback: Callable[[List[CloneEvent]], None]) -> EventConsumer:
+        """Call callback(batch) with the new events, in batches"""
+        consumer = EventConsumer(self)
+        self._listeners.append((consumer, callback))
+        return consumer
+
+    def flush(self):
+        """Deliver the pending events to the listeners now"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for consumer, callback in list(self._listeners):
+            batch = consumer.poll()
+            if batch:
+                try:
+                    callback(batch)
+                except Exception:
+                    pass
+
+
+class EventMetrics:
+    """Counters folded from the event stream (a bus listener)"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+        self.rate_limited_seconds = 0.0
+        self.failed_operations = 0
+
+    def update(self, batch: List[CloneEvent]):
+        for event in batch:
+            self.counts[event.kind] = self.counts.get(event.kind, 0) + 1
+            if isinstance(event, RateLimited):
+                self.rate_limited_seconds += event.retry_after
+            elif isinstance(event, OperationFinished) and event.error:
+                self.failed_operations += 1
+
+    def summary(self) -> dict:
+        return {
+            "rate_limited": self.counts.get(RateLimited.kind, 0),
+            "retries": self.counts.get(Retry.kind, 0),
+            "rate_limited_seconds": round(self.rate_limited_seconds, 2),
+            "failed_operations": self.failed_operations,
+        }
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.operation_file.rest_client import API_BASE
+from src.utils.http_session import auth_headers
+
+# Seconds a guild, its channels or its roles are served from memory
+DEFAULT_TTL = 60.0
+# Cached resources kept at most (least recently used ones are dropped)
+MAX_ENTRIES = 512
+
+GUILD = ""  # resource name of the guild object itself (GET /guilds/{id})
+
+_RETRY = object()  # result of an in-flight fetch that was cancelled: waiters fetch on their own
+
+
+class GuildCache:
+    """Guild metadata shared by every component, keyed by token, guild and resource
+
+    The explorer, the access checks of the UI, the planner and the clone
+    engine all read /guilds/{id}, /guilds/{id}/channels and
+    /guilds/{id}/roles through get(): a value younger than the TTL is served
+    from memory, and concurrent reads of the same key share one request.
+    Only successful answers are stored. Whoever changes a guild (a clone
+    writing to its destination) calls invalidate() for it.
+
+    Cached lists are copied on the way out, the dicts inside them are shared
+    and must be treated as read-only.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, str], Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._generation = 0  # bumped by every invalidation, answers fetched across one are not stored
+
+    @staticmethod
+    def key(token: Optional[str], guild_id, resource: str = GUILD) -> Tuple[str, str, str]:
+        return (token or "", str(guild_id), resource)
+
+    def peek(self, token: Optional[str], guild_id, resource: str = GUILD, max_age: Optional[float] = None):
+        """Cached value if fresh enough, without fetching"""
+        key = self.key(token, guild_id, resource)
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > (self.ttl if max_age is None else max_age):
+            return None
+        self._entries.move_to_end(key)
+        return _copy(entry[1])
+
+    async def get(self, token: Optional[str], guild_id, resource: str, fetch: Callable[[], Awaitable[Any]],
+                  max_age: Optional[float] = None):
+        """Cached value, or the result of fetch() (None when it failed, which is not stored)
+
+        :param resource: GUILD, "channels" or "roles"
+        :param max_age: accept cached values up to this age instead of the TTL (0 forces a fetch)
+        """
+        key = self.key(token, guild_id, resource)
+        while True:
+            value = self.peek(token, guild_id, resource, max_age)
+            if value is not None:
+                self.hits += 1
+                return value
+            loop = asyncio.get_running_loop()
+            inflight = self._inflight.get(key)
+            if inflight is None or inflight[0] is not loop:
+                break
+            # The same read is already running: wait for it instead of sending another request
+            value = await asyncio.shield(inflight[1])
+            if value is not _RETRY:
+                self.hits += 1
+                return _copy(value)
+
+        self.misses += 1
+        future = loop.create_future()
+        self._inflight[key] = (loop, future)
+        generation = self._generation
+        value = None
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.set_result(_RETRY)
+            raise
+        finally:
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+            if not future.done():
+                future.set_result(value)
+        if value is not None and generation == self._generation:
+            self._store(key, value)
+        return _copy(value)
+
+    def put(self, token: Optional[str], guild_id, resource: str, value):
+        """Store a value obtained elsewhere (e.g. the answer of a write)"""
+        if value is not None:
+            self._store(self.key(token, guild_id, resource), value)
+
+    def _store(self, key, value):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, guild_id, resource: Optional[str] = None):
+        """Forget a guild (or one of its resources) for every token"""
+        self._generation += 1
+        guild_id = str(guild_id)
+        for key in [k for k in self._entries if k[1] == guild_id and (resource is None or k[2] == resource)]:
+            del self._entries[key]
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+
+def _copy(value):
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+async def read_guild(session, token: str, guild_id, resource: str = GUILD, api_url: str = API_BASE,
+                     cache: Optional[GuildCache] = None) -> Tuple[Any, int]:
+    """(value, HTTP status) of GET /guilds/{id}[/{resource}] with a plain session, through the cache
+
+    For the UI components that do not use a DiscordRestClient. The status is
+    200 for cached values and 0 when a shared request failed.
+    """
+    status = None
+
+    async def fetch():
+        nonlocal status
+        url = f"{api_url}/guilds/{guild_id}" + (f"/{resource}" if resource else "")
+        async with session.get(url, headers=auth_headers(token)) as resp:
+            status = resp.status
+            if resp.status != 200:
+                return None
+            return await resp.json()
+
+    value = await (cache or get_guild_cache()).get(token, guild_id, resource, fetch)
+    if status is None:
+        status = 200 if value is not None else 0
+    return value, status
+
+
+_shared: Optional[GuildCache] = None
+
+
+def get_guild_cache() -> GuildCache:
+    """Cache shared by the whole application"""
+    global _shared
+    if _shared is None:
+        _shared = GuildCache()
+    return _shared
@@ -0,0 +1,224 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Fields compared between a source entity and its destination counterpart.
+# Positions are not among them: they are reconciled with one bulk PATCH
+ROLE_FIELDS = ("name", "permissions", "color", "hoist", "mentionable")
+CHANNEL_FIELDS = {
+    4: ("name",),
+    0: ("name", "topic", "nsfw", "rate_limit_per_user"),
+    2: ("name", "bitrate", "user_limit"),
+}
+# Values Discord reports when a field was never set
+FIELD_DEFAULTS = {
+    "topic": None,
+    "nsfw": False,
+    "rate_limit_per_user": 0,
+    "bitrate": 64000,
+    "user_limit": 0,
+}
+
+
+class EntityDiff:
+    """Structural difference of one kind of entity (roles or channels)
+
+    matched: source ID -> destination ID of every entity present on both sides
+    create: source entities missing in the destination
+    update: (source, destination, changed fields) of matched entities that differ
+    delete: destination entities with no source counterpart
+    """
+
+    def __init__(self):
+        self.matched: Dict[str, str] = {}
+        self.create: List[dict] = []
+        self.update: List[Tuple[dict, dict, List[str]]] = []
+        self.delete: List[dict] = []
+
+    def __len__(self):
+        return len(self.create) + len(self.update) + len(self.delete)
+
+    def summary(self) -> str:
+        return f"{len(self.create)} to create, {len(self.update)} to update, {len(self.delete)} to delete"
+
+
+def _value(entity: dict, field: str):
+    value = entity.get(field)
+    if value is None:
+        value = FIELD_DEFAULTS.get(field)
+    if field == "topic" and value == "":
+        value = None
+    if field == "permissions":
+        value = str(value)
+    return value
+
+
+def _take(candidates: List[dict], predicate) -> Optional[dict]:
+    for index, candidate in enumerate(candidates):
+        if predicate(candidate):
+            return candidates.pop(index)
+    return None
+
+
+def diff_roles(source_roles: List[dict], dest_roles: List[dict], known: Optional[Dict[str, str]] = None) -> EntityDiff:
+    """Compare the roles of two guilds
+
+    Roles are paired through known (source -> destination IDs from a previous
+    clone) first, so renames are detected; the rest are paired by name.
+    @everyone and managed roles (bots, boosts) are never touched.
+
+    :param known: source -> destination role IDs recorded by earlier jobs
+    """
+    diff = EntityDiff()
+    known = known or {}
+    candidates = [r for r in dest_roles if r.get("name") != "@everyone" and not r.get("managed")]
+    by_id = {r.get("id"): r for r in candidates}
+    pending = []
+
+    for role in source_roles:
+        if role.get("name") == "@everyone" or role.get("managed"):
+            continue
+        dest = by_id.get(known.get(role.get("id")))
+        if dest is not None:
+            candidates.remove(dest)
+            by_id.pop(dest.get("id"))
+            _pair_role(diff, role, dest)
+        else:
+            pending.append(role)
+
+    for role in pending:
+        dest = _take(candidates, lambda r: r.get("name") == role.get("name"))
+        if dest is None:
+            diff.create.append(role)
+        else:
+            _pair_role(diff, role, dest)
+
+    diff.delete.extend(candidates)
+    return diff
+
+
+def _pair_role(diff: EntityDiff, source: dict, dest: dict):
+    diff.matched[source.get("id")] = dest.get("id")
+    changed = [f for f in ROLE_FIELDS if _value(source, f) != _value(dest, f)]
+    if changed:
+        diff.update.append((source, dest, changed))
+
+
+def map_overwrites(overwrites, role_ids: Dict[str, str], source_guild_id, dest_guild_id) -> List[dict]:
+    """Translate source role overwrites to destination role IDs
+
+    @everyone has the guild ID as role ID. Member overwrites and roles without
+    a destination counterpart are dropped.
+    """
+    mapped = []
+    for overwrite in overwrites or []:
+        if overwrite.get("type") != 0:
+            continue
+        role_id = str(overwrite.get("id"))
+        if role_id == str(source_guild_id):
+            target_id = dest_guild_id
+        else:
+            target_id = role_ids.get(role_id)
+        if not target_id:
+            continue
+        mapped.append({
+            "id": str(target_id),
+            "type": 0,  # role overwrite
+            "allow": str(overwrite.get("allow", "0")),
+            "deny": str(overwrite.get("deny", "0"))
+        })
+    return mapped
+
+
+def _overwrite_set(overwrites) -> set:
+    return {(str(o.get("id")), int(o.get("type", 0)), str(o.get("allow", "0")), str(o.get("deny", "0")))
+            for o in overwrites or []}
+
+
+def diff_channels(source_channels: List[dict], dest_channels: List[dict], role_ids: Dict[str, str],
+                  source_guild_id, dest_guild_id, known: Optional[Dict[str, str]] = None,
+                  new_roles: Iterable[str] = (), compare_parent: bool = True) -> EntityDiff:
+    """Compare the categories, text and voice channels of two guilds
+
+    Channels are paired through known IDs first, then by type, name and
+    parent category, then by type and name alone (a channel moved to another
+    category). Only destination channels of the types present in
+    CHANNEL_FIELDS are considered for deletion.
+
+    :param role_ids: source -> destination role IDs, used to compare permission overwrites
+    :param known: source -> destination channel IDs recorded by earlier jobs
+    :param new_roles: source IDs of roles that will be created before the channels are updated
+    :param compare_parent: False when categories are not part of the sync
+    """
+    diff = EntityDiff()
+    known = known or {}
+    new_roles = {str(r) for r in new_roles}
+    candidates = [c for c in dest_channels if c.get("type") in CHANNEL_FIELDS]
+    by_id = {c.get("id"): c for c in candidates}
+    pairs = []
+
+    # Categories first: children are matched against the mapped parent
+    ordered = sorted((c for c in source_channels if c.get("type") in CHANNEL_FIELDS),
+                     key=lambda c: (c.get("type") != 4, c.get("position", 0)))
+    pending = []
+    for channel in ordered:
+        dest = by_id.get(known.get(channel.get("id")))
+        if dest is not None and dest.get("type") == channel.get("type"):
+            candidates.remove(dest)
+            by_id.pop(dest.get("id"))
+            diff.matched[channel.get("id")] = dest.get("id")
+            pairs.append((channel, dest))
+        else:
+            pending.append(channel)
+
+    unmatched = []
+    for channel in pending:
+        parent = diff.matched.get(channel.get("parent_id"))
+        dest = _take(candidates, lambda c: c.get("type") == channel.get("type") and
+                     c.get("name") == channel.get("name") and c.get("parent_id") == parent)
+        if dest is None:
+            unmatched.append(channel)
+        else:
+            diff.matched[channel.get("id")] = dest.get("id")
+            pairs.append((channel, dest))
+
+    for channel in unmatched:
+        dest = _take(candidates, lambda c: c.get("type") == channel.get("type") and c.get("name") == channel.get("name"))
+        if dest is None:
+            diff.create.append(channel)
+        else:
+            diff.matched[channel.get("id")] = dest.get("id")
+            pairs.append((channel, dest))
+
+    for source, dest in pairs:
+        changed = [f for f in CHANNEL_FIELDS[source.get("type")] if _value(source, f) != _value(dest, f)]
+        if compare_parent and source.get("type") != 4 and diff.matched.get(source.get("parent_id")) != dest.get("parent_id"):
+            changed.append("parent_id")
+        wanted = map_overwrites(source.get("permission_overwrites"), role_ids, source_guild_id, dest_guild_id)
+        # Overwrites of roles still to be created can only be compared once they exist
+        if _overwrite_set(wanted) != _overwrite_set(dest.get("permission_overwrites")) or \
+                any(str(o.get("id")) in new_roles for o in source.get("permission_overwrites") or []):
+            changed.append("permission_overwrites")
+        if changed:
+            diff.update.append((source, dest, changed))
+
+    diff.delete.extend(candidates)
+    return diff
+
+
+def role_hierarchy(source_roles: List[dict]) -> List[dict]:
+    """Source roles from the bottom of the hierarchy to the top, without @everyone and managed roles"""
+    roles = [r for r in source_roles if r.get("name") != "@everyone" and not r.get("managed")]
+    return sorted(roles, key=lambda r: (r.get("position", 0), int(r.get("id") or 0)))
+
+
+def role_order_changed(source_roles: List[dict], dest_roles: List[dict], matched: Dict[str, str]) -> bool:
+    """True if the matched destination roles are not stacked in the source order"""
+    wanted = [matched[r.get("id")] for r in role_hierarchy(source_roles) if r.get("id") in matched]
+    dest_ids = set(wanted)
+    current = [r.get("id") for r in sorted(dest_roles, key=lambda r: (r.get("position", 0), int(r.get("id") or 0)))
+               if r.get("id") in dest_ids]
+    return current != wanted
+
+
+def channel_positions(dest_channels: List[dict]) -> Dict[str, int]:
+    """Current position of every destination channel, by ID"""
+    return {c.get("id"): c.get("position", 0) for c in dest_channels}
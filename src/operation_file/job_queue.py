@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from src.operation_file.rest_client import API_BASE, CDN_BASE, RateLimitState
+from src.operation_file.serverclone import Clone
+from src.operation_file.guild_cache import GuildCache
+
+# Jobs cloning at the same time; the others wait in the queue
+MAX_RUNNING_JOBS = 3
+# Requests per second allowed to one token across all routes (Discord global limit, with some margin)
+GLOBAL_RATE = 45
+
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"
+CANCELLED = "cancelled"
+DONE = "done"
+FAILED = "failed"
+FINISHED_STATES = (CANCELLED, DONE, FAILED)
+
+
+class CloneJob:
+    """One clone of the queue: a source pushed into one destination"""
+
+    def __init__(self, job_id: int, guild_from: dict, guild_to: dict, options: dict, headers: dict, clone: Clone):
+        self.id = job_id
+        self.guild_from = guild_from
+        self.guild_to = guild_to
+        self.options = options
+        self.headers = headers
+        self.clone = clone
+        self.state = QUEUED
+        self.task: Optional[asyncio.Task] = None
+        self._resumed = asyncio.Event()  # cleared while a queued job is paused
+        self._resumed.set()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def snapshot(self) -> dict:
+        stats = self.clone.get_stats() if self.state != QUEUED else {}
+        return {
+            "id": self.id,
+            "source": self.guild_from.get("name"),
+            "destination": self.guild_to.get("name"),
+            "state": self.state,
+            "paused": self.clone.paused,
+            "progress": 1.0 if self.state == DONE else stats.get("progress", 0.0),
+            "eta": stats.get("eta"),
+            "errors": stats.get("errors", 0),
+        }
+
+
+class CloneJobQueue:
+    """Clone jobs sharing one event loop, one connection pool and the rate limits of their token
+
+    Up to `max_running` jobs run at the same time. Their clients share the
+    buckets of the token (and a client-side global rate), so parallel jobs
+    into different destinations fill the API limits together instead of
+    waiting for each other, while routes they have in common (the source
+    guild reads) stay paced as one. Jobs are paused, resumed and cancelled
+    independently.
+
+    Every method must be called on the loop the queue runs on (the shared
+    HTTP loop in the application).
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, max_running: int = MAX_RUNNING_JOBS,
+                 global_rate: Optional[int] = GLOBAL_RATE, global_window: float = 1.0,
+                 api_url: str = API_BASE, cdn_url: str = CDN_BASE, cache: Optional[GuildCache] = None):
+        self.session = session
+        self.global_rate = global_rate
+        self.global_window = global_window
+        self.api_url = api_url
+        self.cdn_url = cdn_url
+        self.cache = cache  # None: the application-wide guild cache
+        self.jobs: Dict[int, CloneJob] = {}
+        self._limits: Dict[str, RateLimitState] = {}  # token -> shared rate limit state
+        self._slots = asyncio.Semaphore(max_running)
+        self._ids = itertools.count(1)
+
+    def limits_for(self, headers: dict) -> RateLimitState:
+        token = (headers or {}).get("Authorization", "")
+        limits = self._limits.get(token)
+        if limits is None:
+            limits = self._limits[token] = RateLimitState(self.global_rate, self.global_window)
+        return limits
+
+    def submit(self, guild_from: dict, guild_to: dict, options: Optional[dict] = None,
+               headers: Optional[dict] = None) -> CloneJob:
+        """Queue a clone (same arguments as Clone.start_clone), it starts when a slot is free"""
+        headers = headers or {}
+        clone = Clone(api_url=self.api_url, cdn_url=self.cdn_url, limits=self.limits_for(headers), cache=self.cache)
+        job = CloneJob(next(self._ids), guild_from, guild_to, dict(options or {}), headers, clone)
+        self.jobs[job.id] = job
+        job.task = asyncio.ensure_future(self._run(job))
+        return job
+
+    async def _run(self, job: CloneJob):
+        try:
+            await job._resumed.wait()
+            async with self._slots:
+                job.state = PAUSED if job.clone.paused else RUNNING
+                success = await job.clone.start_clone(job.guild_from, job.guild_to, self.session,
+                                                      job.options, headers=job.headers)
+                job.state = DONE if success else FAILED
+        except asyncio.CancelledError:
+            job.state = CANCELLED
+            raise
+
+    def pause(self, job_id: int):
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        if job.state == QUEUED:
+            job._resumed.clear()  # keeps waiting without taking a slot
+        else:
+            job.state = PAUSED
+        job.clone.pause()
+
+    def resume(self, job_id: int):
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        job.clone.resume()
+        job._resumed.set()
+        if job.state == PAUSED:
+            job.state = RUNNING
+
+    def cancel(self, job_id: int):
+        """Stop a job; a cancelled clone can be resumed later from its journal"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        job.task.cancel()
+        if job.state == QUEUED:
+            job.state = CANCELLED
+
+    def remove_finished(self):
+        for job_id in [j.id for j in self.jobs.values() if j.finished]:
+            del self.jobs[job_id]
+
+    def snapshot(self) -> List[dict]:
+        """State and progress of every job, in submission order (safe to call from the UI thread)"""
+        return [job.snapshot() for job in list(self.jobs.values())]
+
+    async def join(self):
+        """Wait until every job submitted so far has finished"""
+        tasks = [job.task for job in self.jobs.values() if not job.finished]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from typing import Dict, Optional, Set
+
+from src.utils.assets import get_asset_path
+
+JOURNAL_DIR = get_asset_path("journals")
+
+# Journal map name -> Clone attribute holding the source -> destination IDs
+# (message_cursors: source channel -> last source message copied)
+MAPS = ("roles_map", "categories_map", "channels_map", "message_cursors")
+
+
+class CloneJournal:
+    """Append-only JSONL journal of one clone job (source -> destination)
+
+    Every finished operation is appended as one JSON line, together with the
+    source -> destination ID it produced. A job that died or was cancelled
+    can be resumed by replaying the file: finished operations are skipped and
+    the ID maps are restored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[str] = set()
+        self.maps: Dict[str, Dict[str, str]] = {name: {} for name in MAPS}
+        self.finished = False
+        self._file = None
+
+    @classmethod
+    def for_job(cls, source_id, dest_id, directory: Optional[str] = None) -> "CloneJournal":
+        directory = directory or JOURNAL_DIR
+        return cls(os.path.join(directory, f"clone_{source_id}_{dest_id}.jsonl"))
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> int:
+        """Replay the journal file, return the number of finished operations"""
+        self.completed.clear()
+        for mapping in self.maps.values():
+            mapping.clear()
+        self.finished = False
+        if not self.exists():
+            return 0
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut short by a crash: everything before it is still valid
+                    continue
+                op = entry.get("op")
+                if op == "finished":
+                    self.finished = True
+                elif op and op != "job":
+                    self.completed.add(op)
+                    map_name = entry.get("map")
+                    if map_name in self.maps:
+                        self.maps[map_name][str(entry.get("source"))] = str(entry.get("dest"))
+        return len(self.completed)
+
+    def start(self, header: dict, resume: bool = False):
+        """Open the journal for writing
+
+        :param header: job description written at the top of a new journal
+        :param resume: keep the existing entries instead of starting over
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if resume:
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.completed.clear()
+            for mapping in self.maps.values():
+                mapping.clear()
+            self.finished = False
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._write({"op": "job", "time": time.time(), **header})
+
+    def is_done(self, op: str) -> bool:
+        return op in self.completed
+
+    def record(self, op: str, map_name: Optional[str] = None, source=None, dest=None):
+        """Append a finished operation, optionally with the ID it produced"""
+        entry = {"op": op}
+        if map_name:
+            entry.update({"map": map_name, "source": str(source), "dest": str(dest)})
+            self.maps[map_name][str(source)] = str(dest)
+        self.completed.add(op)
+        self._write(entry)
+
+    def mark_finished(self):
+        self.finished = True
+        self._write({"op": "finished", "time": time.time()})
+
+    def close(self):
+        if self._file:
+            try:
+                self._file.close()
+            finally:
+                self._file = None
+
+    def _write(self, entry: dict):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        # Flush every line so a crash loses at most the operation in flight
+        self._file.flush()
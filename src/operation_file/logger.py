@@ -39,6 +39,19 @@ class Logger:
         if self.debug_callback:
             self.debug_callback(message, "WARNING")
     
+    def log(self, message: str, level: str = "INFO"):
+        """
+        Log a message at the given level (INFO, WARNING, ERROR)
+        :param message: Message to log
+        :param level: Level of the message
+        """
+        if level == "ERROR":
+            self.error(message)
+        elif level == "WARNING":
+            self.warning(message)
+        else:
+            self.add(message)
+
     def get_elapsed_time(self) -> float:
         """
         Get elapsed time since logger initialization
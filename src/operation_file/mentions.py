@@ -0,0 +1,69 @@
+import re
+from typing import Any, Dict, Optional
+
+# Role mention, channel mention or message/channel link, matched in one pass
+_REFERENCE = re.compile(
+    r"<@&(?P<role>\d+)>"
+    r"|<#(?P<channel>\d+)>"
+    r"|(?P<link>https?://(?:(?:ptb|canary)\.)?discord(?:app)?\.com/channels/)(?P<guild>\d+)/(?P<link_channel>\d+)(?:/(?P<message>\d+))?"
+)
+
+
+class ReferenceRewriter:
+    """Points mentions and links of copied messages at the destination guild
+
+    Every reference is found by a single compiled regex and translated with
+    dictionary lookups into the live ID maps of the clone, so entities
+    created while the copy runs are picked up too. References to anything
+    that was not cloned are left untouched.
+    """
+
+    def __init__(self, source_guild_id: str, dest_guild_id: str, roles_map: Dict[str, str],
+                 *channel_maps: Dict[str, str]):
+        self.source_guild_id = str(source_guild_id)
+        self.dest_guild_id = str(dest_guild_id)
+        self.roles_map = roles_map
+        self.channel_maps = channel_maps
+
+    def _channel(self, channel_id: str) -> Optional[str]:
+        for mapping in self.channel_maps:
+            dest = mapping.get(channel_id)
+            if dest:
+                return dest
+        return None
+
+    def _replace(self, match: re.Match) -> str:
+        role = match.group("role")
+        if role:
+            if role == self.source_guild_id:  # @everyone
+                return f"<@&{self.dest_guild_id}>"
+            dest = self.roles_map.get(role)
+            return f"<@&{dest}>" if dest else match.group(0)
+
+        channel = match.group("channel")
+        if channel:
+            dest = self._channel(channel)
+            return f"<#{dest}>" if dest else match.group(0)
+
+        if match.group("guild") != self.source_guild_id:
+            return match.group(0)
+        dest = self._channel(match.group("link_channel"))
+        if not dest:
+            return match.group(0)
+        # Copied messages get new IDs: the link points at the channel instead
+        return f"{match.group('link')}{self.dest_guild_id}/{dest}"
+
+    def text(self, text: str) -> str:
+        if not text or ("<" not in text and "/channels/" not in text):
+            return text
+        return _REFERENCE.sub(self._replace, text)
+
+    def value(self, value: Any) -> Any:
+        """Rewrite every string of an embed (or any JSON value)"""
+        if isinstance(value, str):
+            return self.text(value)
+        if isinstance(value, dict):
+            return {key: self.value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.value(item) for item in value]
+        return value
@@ -0,0 +1,352 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+
+from src.operation_file.attachment_cache import AttachmentCache
+from src.operation_file.mentions import ReferenceRewriter
+from src.operation_file.rest_client import DiscordRestClient
+
+# Messages Discord returns per history page
+PAGE_SIZE = 100
+# Message types carrying user content (default, reply); joins, pins, boosts... are skipped
+COPYABLE_TYPES = (0, 19)
+MAX_CONTENT = 2000
+# Consecutive messages of one author closer than this are merged when coalescing
+COALESCE_WINDOW = 7 * 60
+# Channels copied at the same time: one send per second per channel bucket keeps
+# this many channels well below the 50 requests/s global limit
+MAX_ACTIVE_CHANNELS = 10
+
+_END = object()  # end of the history stream
+
+
+class ChannelThroughput:
+    """Progress and speed of one channel copy"""
+
+    def __init__(self, channel_id: str, name: str = ""):
+        self.channel_id = channel_id
+        self.name = name
+        self.messages = 0
+        self.requests = 0  # history pages read plus sends
+        self.errors = 0  # failed reads and sends of this channel only
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self) -> float:
+        """Messages sent per second"""
+        elapsed = self.elapsed
+        return self.messages / elapsed if elapsed > 0 else 0.0
+
+
+class ChannelScheduler:
+    """Keeps at most N channels copying at once and refills a slot as soon as a channel ends
+
+    It is only a counting semaphore plus per channel statistics: there is no
+    rotation between the channels holding a slot. Their sends do not compete
+    much anyway, since each channel has one send in flight and its own rate
+    limit bucket. A long channel keeps its slot longer rather than slowing
+    the others. Waiting channels get free slots in the order asyncio wakes
+    them, which in practice is arrival order.
+    """
+
+    def __init__(self, slots: int = MAX_ACTIVE_CHANNELS):
+        self.slots = slots
+        self.channels: Dict[str, ChannelThroughput] = {}
+        self._slots = asyncio.Semaphore(slots)
+
+    @asynccontextmanager
+    async def slot(self, channel_id: str, name: str = ""):
+        async with self._slots:
+            stats = self.channels[channel_id] = ChannelThroughput(channel_id, name)
+            try:
+                yield stats
+            finally:
+                stats.finished = time.monotonic()
+
+    def report(self) -> List[dict]:
+        """Per channel throughput, slowest first"""
+        return [{"channel_id": s.channel_id, "name": s.name, "messages": s.messages,
+                 "seconds": round(s.elapsed, 2), "rate": round(s.rate, 2)}
+                for s in sorted(self.channels.values(), key=lambda s: s.rate)]
+
+
+class MessageCopier:
+    """Copies the recent history of source channels into their destination channels
+
+    For every channel a producer pages through the source history and feeds a
+    bounded queue while a sender posts the messages, oldest first, to the
+    mapped destination channel. Pacing is left to the REST client rate limit
+    buckets (message sends have one bucket per channel), the ChannelScheduler
+    decides which channels are copied at the same time.
+    """
+
+    def __init__(self, rest: DiscordRestClient, limit: int, max_channels: int = MAX_ACTIVE_CHANNELS,
+                 queue_size: int = PAGE_SIZE,
+                 cursors: Optional[Dict[str, str]] = None,
+                 attachments: Optional[AttachmentCache] = None, coalesce: bool = False,
+                 references: Optional[ReferenceRewriter] = None,
+                 on_copied: Optional[Callable[[str, str, int], None]] = None,
+                 log: Optional[Callable[[str, str], None]] = None):
+        """
+        :param limit: most recent messages to copy per channel
+        :param max_channels: channels copied at the same time
+        :param queue_size: messages buffered between producer and sender
+        :param cursors: source channel ID -> last source message already copied (resume/sync)
+        :param attachments: cache attachments are downloaded to and uploaded from
+        :param coalesce: merge consecutive short messages of the same author into one
+        :param references: rewriter pointing mentions and links at the destination guild
+        :param on_copied: callback(source channel ID, last source message ID, source messages) after every send
+        :param log: optional callback(message, level)
+        """
+        self.rest = rest
+        self.limit = limit
+        self.queue_size = queue_size
+        self.cursors = dict(cursors or {})
+        self.attachments = attachments or AttachmentCache()
+        self.coalesce = coalesce
+        self.references = references
+        self.on_copied = on_copied
+        self.log = log
+        self.messages_copied = 0
+        self.errors = 0
+        self.scheduler = ChannelScheduler(max_channels)
+
+    def _log(self, message: str, level: str = "INFO"):
+        if self.log:
+            self.log(message, level)
+
+    def _error(self, stats: ChannelThroughput):
+        """Count a failure in the total and in its channel (channels run concurrently)"""
+        self.errors += 1
+        stats.errors += 1
+
+    async def copy_channel(self, source_id: str, dest_id: str, name: str = "") -> int:
+        """Copy one channel, return the number of messages sent"""
+        async with self.scheduler.slot(source_id, name) as stats:
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            producer = asyncio.create_task(self._produce(source_id, queue, stats))
+            try:
+                await self._send_all(source_id, dest_id, queue, stats)
+            finally:
+                if not producer.done():
+                    producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+        self._log(f"Copied {stats.messages} messages to #{name or dest_id} ({stats.rate:.2f} msg/s)")
+        return stats.messages
+
+    async def _fetch_page(self, channel_id: str, stats: ChannelThroughput, limit: int = PAGE_SIZE,
+                          **params) -> Optional[List[dict]]:
+        stats.requests += 1
+        resp = await self.rest.get(f"/channels/{channel_id}/messages", params={"limit": limit, **params})
+        if resp.status != 200:
+            self._error(stats)
+            self._log(f"Error reading messages of channel {channel_id}: {resp.status}", "ERROR")
+            return None
+        return resp.data or []
+
+    async def _produce(self, channel_id: str, queue: asyncio.Queue, stats: ChannelThroughput):
+        """Stream the last `limit` messages of a channel into the queue, oldest first
+
+        Memory stays at one page plus the queue whatever the limit: the start
+        of the range is located first, then the history is read forward with
+        `after` and every page is queued as soon as it arrives.
+        """
+        try:
+            first_page, end_id = await self._locate(channel_id, self.cursors.get(channel_id), stats)
+            queued = 0
+            for message in first_page:
+                await queue.put(message)
+                queued += 1
+
+            after = first_page[-1]["id"] if first_page else None
+            while after and queued < self.limit and int(after) < int(end_id):
+                page = await self._fetch_page(channel_id, stats, after=after)
+                if not page:
+                    break
+                page.sort(key=lambda m: int(m["id"]))  # Discord answers newest first
+                for message in page:
+                    # Messages posted after the copy started are left to the next sync
+                    if int(message["id"]) > int(end_id) or queued >= self.limit:
+                        break
+                    await queue.put(message)
+                    queued += 1
+                after = page[-1]["id"]
+                if len(page) < PAGE_SIZE:
+                    break
+        finally:
+            await queue.put(_END)
+
+    async def _locate(self, channel_id: str, cursor: Optional[str], stats: ChannelThroughput):
+        """Find the oldest page to copy by paging backwards with `before`
+
+        Only the last page read is kept: it is exactly the start of the range
+        (the page size shrinks to what is left of the limit) and is sent as
+        is, the rest is read again forward. With a limit up to one page, or
+        few new messages since the cursor, this single request is all it takes.
+
+        :return: (oldest page in ascending order, ID of the newest message to copy)
+        """
+        oldest_page: List[dict] = []
+        end_id = None
+        remaining = self.limit
+        before = None
+        while remaining > 0:
+            params = {"before": before} if before else {}
+            requested = min(PAGE_SIZE, remaining)
+            page = await self._fetch_page(channel_id, stats, limit=requested, **params)
+            if not page:
+                break
+            if end_id is None:
+                end_id = page[0]["id"]
+            fresh = [m for m in page if not cursor or int(m["id"]) > int(cursor)]
+            if fresh:
+                oldest_page = fresh
+                remaining -= len(fresh)
+            if len(fresh) < len(page) or len(page) < requested:
+                # Reached the cursor or the beginning of the channel
+                break
+            before = page[-1]["id"]
+        oldest_page.sort(key=lambda m: int(m["id"]))
+        return oldest_page, end_id
+
+    async def _send_all(self, source_id: str, dest_id: str, queue: asyncio.Queue, stats: ChannelThroughput):
+        group: List[dict] = []
+        while True:
+            message = await queue.get()
+            if message is _END:
+                break
+            if message.get("type", 0) not in COPYABLE_TYPES or not has_payload(message):
+                continue
+            if self.references:
+                message["content"] = self.references.text(message.get("content"))
+                message["embeds"] = self.references.value(message.get("embeds") or [])
+            if group and not self._can_join(group, message):
+                await self._send_group(source_id, dest_id, group, stats)
+                group = []
+            group.append(message)
+            if not self.coalesce:
+                await self._send_group(source_id, dest_id, group, stats)
+                group = []
+        if group:
+            await self._send_group(source_id, dest_id, group, stats)
+
+    def _can_join(self, group: List[dict], message: dict) -> bool:
+        """Whether a message can be appended to the copy of the previous ones
+
+        Only text follows text: files and embeds go out with the last message
+        of a group, which must also stay within one message of 2000 characters.
+        """
+        last = group[-1]
+        if not self.coalesce or last.get("attachments") or rich_embeds(last):
+            return False
+        if (message.get("author") or {}).get("id") != (last.get("author") or {}).get("id"):
+            return False
+        if _seconds_between(last, message) > COALESCE_WINDOW:
+            return False
+        return len(render_content(group + [message])) <= MAX_CONTENT
+
+    async def _send_group(self, source_id: str, dest_id: str, group: List[dict], stats: ChannelThroughput):
+        stats.requests += 1
+        try:
+            if await self._send_message(dest_id, group, stats):
+                stats.messages += len(group)
+                self.messages_copied += len(group)
+                if self.on_copied:
+                    self.on_copied(source_id, group[-1]["id"], len(group))
+        except Exception as e:
+            self._error(stats)
+            self._log(f"Error copying message {group[-1].get('id')}: {str(e)}", "ERROR")
+
+    async def _send_message(self, dest_id: str, group: List[dict], stats: ChannelThroughput) -> bool:
+        """Post one message (or a coalesced run) as a single request with its files"""
+        last = group[-1]
+        payload = {"content": render_content(group), "allowed_mentions": {"parse": []}}
+        embeds = rich_embeds(last)
+        if embeds:
+            payload["embeds"] = embeds[:10]
+
+        files = await self._download_attachments(last.get("attachments") or [])
+        if files:
+            return await self._post(dest_id, stats, data=partial(build_form, payload, files))
+        return await self._post(dest_id, stats, json=payload)
+
+    async def _post(self, dest_id: str, stats: ChannelThroughput, **kwargs) -> bool:
+        resp = await self.rest.post(f"/channels/{dest_id}/messages", **kwargs)
+        if resp.status in (200, 201):
+            return True
+        self._error(stats)
+        self._log(f"Error sending message to channel {dest_id}: {resp.status}", "ERROR")
+        return False
+
+    async def _download_attachments(self, attachments: List[dict]) -> List[tuple]:
+        """(filename, local path) of the attachments, from the cache when possible"""
+        files = []
+        for attachment in attachments:
+            try:
+                path = await self.attachments.fetch(self.rest.session, attachment)
+                files.append((attachment.get("filename") or "file", path))
+            except Exception as e:
+                self._log(f"Error downloading attachment {attachment.get('filename')}: {str(e)}", "WARNING")
+        return files
+
+
+def has_payload(message: dict) -> bool:
+    """Messages with nothing to show (stickers, calls...) are not copied"""
+    return bool(message.get("content") or message.get("attachments") or rich_embeds(message))
+
+
+def rich_embeds(message: dict) -> List[dict]:
+    # Link previews are generated again by Discord from the content
+    return [e for e in message.get("embeds") or [] if e.get("type", "rich") == "rich"]
+
+
+def render_content(group: List[dict]) -> str:
+    """Header of the first message followed by the text of every message"""
+    lines = [format_header(group[0])]
+    lines += [m["content"] for m in group if m.get("content")]
+    content = "\n".join(lines)
+    if len(content) > MAX_CONTENT:
+        content = content[:MAX_CONTENT - 3] + "..."
+    return content
+
+
+def _seconds_between(first: dict, second: dict) -> float:
+    try:
+        return (datetime.fromisoformat(second["timestamp"]) - datetime.fromisoformat(first["timestamp"])).total_seconds()
+    except (KeyError, TypeError, ValueError):
+        return float("inf")
+
+
+def format_header(message: dict) -> str:
+    """Bold author name and timestamp heading every copied message"""
+    author = message.get("author") or {}
+    author_name = author.get("global_name") or author.get("username") or "Unknown"
+    timestamp = message.get("timestamp") or ""
+    try:
+        timestamp = datetime.fromisoformat(timestamp).strftime("%d/%m/%Y %H:%M")
+    except ValueError:
+        pass
+    return f"**{author_name}** *{timestamp}*"
+
+
+def build_form(payload: dict, files: List[tuple]) -> aiohttp.FormData:
+    """multipart/form-data body with payload_json and files[n], streamed from disk"""
+    form = aiohttp.FormData()
+    payload = dict(payload)
+    payload["attachments"] = [{"id": index, "filename": filename} for index, (filename, _) in enumerate(files)]
+    form.add_field("payload_json", json.dumps(payload), content_type="application/json")
+    for index, (filename, path) in enumerate(files):
+        # aiohttp reads the file in chunks while sending and closes it afterwards
+        form.add_field(f"files[{index}]", open(path, "rb"), filename=filename, content_type="application/octet-stream")
+    return form
@@ -0,0 +1,120 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from src.operation_file.message_copy import MAX_ACTIVE_CHANNELS, PAGE_SIZE
+
+# (requests, window seconds) per route bucket, roughly what Discord answers in practice
+ROUTE_LIMITS = {
+    "DELETE /guilds/{id}/roles/{id}": (10, 10.0),
+    "DELETE /channels/{id}": (5, 5.0),
+    "POST /guilds/{id}/roles": (10, 10.0),
+    "PATCH /guilds/{id}/roles/{id}": (10, 10.0),
+    "POST /guilds/{id}/channels": (5, 5.0),
+    "PATCH /channels/{id}": (5, 5.0),
+    "POST /channels/{id}/messages": (5, 5.0),
+    "GET /channels/{id}/messages": (50, 1.0),
+}
+DEFAULT_LIMIT = (5, 5.0)
+GLOBAL_LIMIT = 50  # requests per second across all routes
+
+# Clone phases, each one starts when the previous is done
+PHASES = ("fetch", "cleanup", "create", "layout", "messages")
+
+
+class ClonePlan:
+    """Operations a clone would send, with request count and duration estimates
+
+    Built by Clone.plan() from GET requests only. Every operation is counted
+    in the rate limit bucket it would use (route + major ID), so the estimate
+    follows the same windows the clone will be paced on.
+    """
+
+    def __init__(self, latency: float = 0.25, max_channels: int = MAX_ACTIVE_CHANNELS):
+        self.latency = latency  # measured seconds per request
+        self.max_channels = max_channels
+        self.operations: Dict[str, int] = {}  # kind -> count
+        self.messages = 0
+        self.attachment_bytes = 0
+        self._buckets: Dict[Tuple[str, str, str], int] = {}  # (phase, route, major) -> requests
+        self._channels: List[Tuple[int, int]] = []  # (reads, messages) per copied channel
+
+    def add(self, kind: str, phase: str, route: str, major: str = "", count: int = 1):
+        if count <= 0:
+            return
+        self.operations[kind] = self.operations.get(kind, 0) + count
+        key = (phase, route, major)
+        self._buckets[key] = self._buckets.get(key, 0) + count
+
+    def add_channel_messages(self, messages: int, attachments: int = 0, attachment_bytes: int = 0,
+                             pages: Optional[int] = None):
+        """Count the copy of one channel: history pages read, one send per message, attachment downloads"""
+        if pages is None:
+            pages = history_pages(messages)
+        for kind, count in (("read_messages", pages), ("send_messages", messages), ("download_attachments", attachments)):
+            if count:
+                self.operations[kind] = self.operations.get(kind, 0) + count
+        self.messages += messages
+        self.attachment_bytes += attachment_bytes
+        self._channels.append((pages + attachments, messages))
+
+    @property
+    def requests(self) -> int:
+        return sum(self.operations.values())
+
+    def _bucket_time(self, route: str, count: int) -> float:
+        limit, window = ROUTE_LIMITS.get(route, DEFAULT_LIMIT)
+        return ((count - 1) // limit) * window + self.latency
+
+    def _phase_time(self, phase: str) -> float:
+        buckets = [(route, count) for (p, route, _), count in self._buckets.items() if p == phase]
+        if not buckets:
+            return 0.0
+        slowest = max(self._bucket_time(route, count) for route, count in buckets)
+        return max(slowest, sum(count for _, count in buckets) / GLOBAL_LIMIT)
+
+    def _messages_time(self) -> float:
+        if not self._channels:
+            return 0.0
+        per_channel = [reads * self.latency + max(sent * self.latency, self._bucket_time("POST /channels/{id}/messages", sent))
+                       for reads, sent in self._channels]
+        # Slots are refilled as channels end: bounded by the longest channel and by the total over the slots
+        total = sum(per_channel) / self.max_channels
+        requests = sum(self.operations.get(kind, 0) for kind in ("read_messages", "send_messages"))
+        return max(max(per_channel), total, requests / GLOBAL_LIMIT)
+
+    @property
+    def seconds(self) -> float:
+        """Estimated wall time of the whole clone"""
+        return sum(self._phase_time(phase) for phase in PHASES if phase != "messages") + self._messages_time()
+
+    def summary(self) -> dict:
+        return {
+            "operations": dict(self.operations),
+            "requests": self.requests,
+            "messages": self.messages,
+            "attachment_bytes": self.attachment_bytes,
+            "latency": round(self.latency, 3),
+            "seconds": round(self.seconds, 1),
+        }
+
+
+def history_pages(messages: int) -> int:
+    """GET requests the copy makes to read `messages` messages (locate pass + forward pass)"""
+    if messages <= 0:
+        return 1
+    pages = math.ceil(messages / PAGE_SIZE)
+    return 2 * pages - 1
+
+
+def extrapolate(sample: List[dict], requested: int, limit: int) -> Tuple[int, int, int]:
+    """(messages, attachments, attachment bytes) of a channel copy from its newest page
+
+    A page shorter than requested is the whole history; otherwise the page is
+    taken as representative of the last `limit` messages.
+    """
+    attachments = [a for m in sample for a in m.get("attachments") or []]
+    size = sum(a.get("size", 0) for a in attachments)
+    if len(sample) < requested or not sample:
+        return len(sample), len(attachments), size
+    scale = limit / len(sample)
+    return limit, round(len(attachments) * scale), int(size * scale)
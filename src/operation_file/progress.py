@@ -0,0 +1,67 @@
+import time
+from typing import Optional
+
+# Seconds between two throughput samples and weight of the newest one
+SAMPLE_INTERVAL = 1.0
+SMOOTHING = 0.3
+
+
+class ProgressTracker:
+    """Completed vs planned operations of a clone, with a smoothed throughput
+
+    Every finished REST request counts as one operation. The throughput is an
+    exponentially weighted moving average sampled about once per second: it
+    follows the real pace of the current phase (fast creations, slow message
+    sends) and keeps decaying while nothing completes, so a stalled clone
+    shows a growing ETA and idle time instead of a frozen one.
+    """
+
+    def __init__(self, smoothing: float = SMOOTHING, interval: float = SAMPLE_INTERVAL):
+        self.smoothing = smoothing
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        now = time.monotonic()
+        self.total = 0
+        self.completed = 0
+        self.rate: Optional[float] = None  # operations per second
+        self.last_completed_at = now
+        self._sample_at = now
+        self._sample_completed = 0
+
+    def add_total(self, count: int):
+        """Grow (or shrink, with a negative count) the planned operations"""
+        self.total = max(self.completed, self.total + count)
+
+    def complete(self, count: int = 1):
+        self.completed += count
+        self.last_completed_at = time.monotonic()
+        self.sample()
+
+    def sample(self, now: Optional[float] = None):
+        """Fold the throughput since the previous sample into the average"""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._sample_at
+        if elapsed < self.interval:
+            return
+        current = (self.completed - self._sample_completed) / elapsed
+        self.rate = current if self.rate is None else self.smoothing * current + (1 - self.smoothing) * self.rate
+        self._sample_at = now
+        self._sample_completed = self.completed
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.completed / self.total) if self.total else 0.0
+
+    @property
+    def idle(self) -> float:
+        """Seconds since the last completed operation"""
+        return time.monotonic() - self.last_completed_at
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds left, None until the throughput is known"""
+        if not self.rate:
+            return None
+        return max(0, self.total - self.completed) / self.rate
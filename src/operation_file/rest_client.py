@@ -0,0 +1,402 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import aiohttp
+
+from src.operation_file.events import CloneEvent, EventBus, RateLimited, Retry
+
+API_BASE = "https://discord.com/api/v10"
+CDN_BASE = "https://cdn.discordapp.com"
+
+# Path segments whose following ID is a "major parameter": Discord keeps a
+# separate bucket instance for every distinct value of these IDs
+MAJOR_PARAMETERS = ("guilds", "channels", "webhooks")
+
+# Methods that can be sent again after a 5xx: a POST may have created its
+# entity before the error came back, retrying it could create a duplicate
+IDEMPOTENT_METHODS = ("GET", "DELETE", "PATCH", "PUT")
+
+
+class RestResponse:
+    """Result of a REST call: status code, decoded body and response headers"""
+
+    def __init__(self, status: int, data: Any, headers):
+        self.status = status
+        self.data = data
+        self.headers = headers
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class RateLimitBucket:
+    """Client side view of one Discord rate limit bucket
+
+    Until the first response comes back the bucket is unknown: a single request
+    is let through to probe it and the others wait for its headers. Afterwards
+    requests only wait when the bucket is empty and the reset has not passed.
+    """
+
+    def __init__(self):
+        self.known = False
+        self.limit: Optional[int] = None  # None once known means "no limit on this route"
+        self.remaining = 0
+        self.reset_at = 0.0
+        self.window = 1.0  # length of a bucket window, learned from Reset-After
+        self._probing = False
+        self._ready: Optional[asyncio.Event] = None
+
+    async def acquire(self) -> bool:
+        """Wait until a request may be sent on this bucket and reserve a slot
+
+        :return: True when the caller got the probe of an unknown bucket and must
+                 release() it if the request ends without a response
+        """
+        while True:
+            if not self.known:
+                if not self._probing:
+                    self._probing = True
+                    return True
+                if self._ready is None:
+                    self._ready = asyncio.Event()
+                await self._ready.wait()
+                continue
+
+            if self.limit is None:
+                return False
+
+            now = time.monotonic()
+            if self.remaining <= 0 and now >= self.reset_at:
+                # Start the next window locally, responses will refine it
+                self.remaining = self.limit
+                self.reset_at = now + self.window
+            if self.remaining > 0:
+                self.remaining -= 1
+                return False
+            await asyncio.sleep(self.reset_at - now)
+
+    def update(self, limit: Optional[int], remaining: Optional[int], reset_after: Optional[float]):
+        """Apply the X-RateLimit-* values of a response"""
+        if limit is None or remaining is None or reset_after is None:
+            if not self.known:
+                self.limit = None
+        else:
+            reset_at = time.monotonic() + reset_after
+            if not self.known or self.limit is None:
+                self.remaining = remaining
+                self.reset_at = reset_at
+            elif reset_at >= self.reset_at - self.window / 2:
+                # Requests sent after this one may still be in flight: keep the lowest count
+                self.remaining = min(self.remaining, remaining)
+                self.reset_at = reset_at
+            # else: late answer from a previous window, nothing to learn
+            self.limit = limit
+            self.window = max(self.window if self.known else 0.0, reset_after)
+        self.known = True
+        self._wake()
+
+    def exhaust(self, retry_after: float):
+        """Mark the bucket empty for retry_after seconds (after a 429)"""
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, time.monotonic() + retry_after)
+        if self.limit is None:
+            self.limit = 1
+        self.known = True
+        self._wake()
+
+    def release(self):
+        """Give back a probe that ended without a usable response (error, cancel, pause)"""
+        if not self.known:
+            self._wake()
+
+    def _wake(self):
+        self._probing = False
+        event, self._ready = self._ready, None
+        if event is not None:
+            event.set()
+
+
+class RateLimitState:
+    """Rate limit state of one token, shared by every client sending with it
+
+    Buckets, learned bucket hashes and the global reset belong to the token,
+    not to a job: clients built on the same state (e.g. the jobs of a queue)
+    pace each other instead of discovering the limits with 429s.
+    """
+
+    def __init__(self, global_rate: Optional[int] = None, global_window: float = 1.0):
+        """
+        :param global_rate: requests allowed per global window, None to only react to global 429s
+        :param global_window: length of the global window in seconds
+        """
+        self.route_hashes: Dict[str, str] = {}
+        self.buckets: Dict[str, RateLimitBucket] = {}
+        self.global_reset_at = 0.0
+        self.global_rate = global_rate
+        self.global_window = global_window
+        self._window_start = 0.0
+        self._window_count = 0
+
+    async def acquire_global(self):
+        """Wait for a global 429 to expire and, with a global rate, for room in the window"""
+        while True:
+            now = time.monotonic()
+            if self.global_reset_at > now:
+                await asyncio.sleep(self.global_reset_at - now)
+                continue
+            if self.global_rate is None:
+                return
+            if now - self._window_start >= self.global_window:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count < self.global_rate:
+                self._window_count += 1
+                return
+            await asyncio.sleep(self._window_start + self.global_window - now)
+
+
+class DiscordRestClient:
+    """Shared async client for the Discord REST API
+
+    Every request goes through the rate limit bucket of its route: requests
+    are sent back to back while a bucket has room and are queued only when it
+    is empty. 429 responses are retried transparently, 5xx ones only for
+    idempotent methods.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str = API_BASE,
+                 cdn_url: str = CDN_BASE, max_retries: int = 5,
+                 log: Optional[Callable[[str, str], None]] = None, headers: Optional[dict] = None,
+                 on_complete: Optional[Callable[[], None]] = None, events: Optional[EventBus] = None,
+                 limits: Optional[RateLimitState] = None):
+        """
+        :param session: aiohttp session, possibly shared with other clients
+        :param base_url: API root, relative paths are resolved against it
+        :param cdn_url: CDN root used for icons and attachments
+        :param max_retries: attempts for a request hitting 429/5xx before giving up (5xx: not for POST)
+        :param log: optional callback(message, level)
+        :param headers: headers sent with every API request (e.g. Authorization)
+        :param on_complete: optional callback() once per request, after its last attempt
+        :param events: bus receiving rate limit and retry events (instead of log lines)
+        :param limits: rate limit state shared with other clients of the same token
+        """
+        self.session = session
+        self.headers = dict(headers or {})
+        self.base_url = base_url.rstrip("/")
+        self.cdn_url = cdn_url.rstrip("/")
+        self.max_retries = max_retries
+        self.log = log
+        self.on_complete = on_complete
+        self.events = events
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.limits = limits or RateLimitState()
+        self._resumed: Optional[asyncio.Event] = None  # cleared while paused
+
+    def url(self, path: str) -> str:
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _route(self, method: str, url: str) -> Tuple[str, str]:
+        """Return (route key, major parameters) for a request"""
+        path = url.split("?", 1)[0]
+        if path.startswith(self.base_url):
+            path = path[len(self.base_url):]
+        template = []
+        major = []
+        previous = None
+        for part in path.strip("/").split("/"):
+            if part.isdigit():
+                if previous in MAJOR_PARAMETERS:
+                    major.append(part)
+                template.append("{id}")
+            else:
+                template.append(part)
+            previous = part
+        return f"{method} /{'/'.join(template)}", ":".join(major)
+
+    def _bucket_for(self, route_key: str, major: str) -> RateLimitBucket:
+        bucket_hash = self.limits.route_hashes.get(route_key)
+        key = f"{bucket_hash or route_key}:{major}"
+        bucket = self.limits.buckets.get(key)
+        if bucket is None:
+            bucket = self.limits.buckets[key] = RateLimitBucket()
+        return bucket
+
+    def _register_hash(self, route_key: str, major: str, bucket_hash: str, bucket: RateLimitBucket):
+        self.limits.route_hashes[route_key] = bucket_hash
+        self.limits.buckets.setdefault(f"{bucket_hash}:{major}", bucket)
+
+    def pause(self):
+        """Hold new requests (the ones in flight finish) until resume()"""
+        if self._resumed is None:
+            self._resumed = asyncio.Event()
+        self._resumed.clear()
+
+    def resume(self):
+        if self._resumed is not None:
+            self._resumed.set()
+
+    @property
+    def paused(self) -> bool:
+        return self._resumed is not None and not self._resumed.is_set()
+
+    def _report(self, event: CloneEvent):
+        if self.events is not None:
+            self.events.emit(event)
+        elif self.log:
+            try:
+                self.log(event.message(), event.level)
+            except Exception:
+                pass
+
+    async def request(self, method: str, path: str, *, json: Any = None, params: Optional[dict] = None,
+                      data: Any = None, headers: Optional[dict] = None, raw: bool = False) -> RestResponse:
+        """Send a request honouring rate limits
+
+        :param data: request body, or a callable building a fresh one for every attempt
+                     (a multipart form can only be sent once)
+        :param raw: return the body as bytes instead of decoding JSON/text
+        :return: RestResponse of the last attempt
+        :raises aiohttp.ClientError: when the connection keeps failing after all retries
+        """
+        try:
+            return await self._request(method, path, json=json, params=params, data=data, headers=headers, raw=raw)
+        finally:
+            if self.on_complete:
+                self.on_complete()
+
+    async def _request(self, method: str, path: str, *, json: Any, params: Optional[dict],
+                       data: Any, headers: Optional[dict], raw: bool) -> RestResponse:
+        method = method.upper()
+        url = self.url(path)
+        route_key, major = self._route(method, url)
+        if self.headers and url.startswith(self.base_url):
+            # The token never goes to the CDN
+            headers = {**self.headers, **(headers or {})}
+            if data is not None:
+                # The body sets its own Content-Type (multipart boundary)
+                headers.pop("Content-Type", None)
+        attempt = 0
+
+        while True:
+            if self.paused:
+                # A paused job must not hold a bucket (or its probe) while it waits
+                await self._resumed.wait()
+            await self.limits.acquire_global()
+            bucket = self._bucket_for(route_key, major)
+            probe = await bucket.acquire()
+            if self.paused:
+                # Paused while queued on the bucket: give the probe back and wait above
+                if probe:
+                    bucket.release()
+                continue
+            self.request_count += 1
+
+            try:
+                payload = data() if callable(data) else data
+                async with self.session.request(method, url, json=json, params=params,
+                                                data=payload, headers=headers) as resp:
+                    bucket_hash = resp.headers.get("X-RateLimit-Bucket")
+                    if bucket_hash:
+                        self._register_hash(route_key, major, bucket_hash, bucket)
+                    bucket.update(*_parse_rate_limit_headers(resp.headers))
+
+                    if resp.status == 429:
+                        body = await _read_body(resp, False)
+                        retry_after = _retry_after(resp.headers, body)
+                        self.rate_limited_count += 1
+                        is_global = bool(resp.headers.get("X-RateLimit-Global") or
+                                         (isinstance(body, dict) and body.get("global")))
+                        if is_global:
+                            self.limits.global_reset_at = time.monotonic() + retry_after
+                        else:
+                            bucket.exhaust(retry_after)
+                        attempt += 1
+                        if attempt > self.max_retries:
+                            return RestResponse(resp.status, body, resp.headers)
+                        self._report(RateLimited(route_key, retry_after, is_global))
+                        continue
+
+                    if resp.status >= 500 and method in IDEMPOTENT_METHODS and attempt < self.max_retries:
+                        attempt += 1
+                        delay = min(0.5 * (2 ** attempt), 8.0)
+                        self._report(Retry(route_key, attempt, delay, f"Server error {resp.status}"))
+                        await asyncio.sleep(delay)
+                        continue
+
+                    body = await _read_body(resp, raw)
+                    return RestResponse(resp.status, body, resp.headers)
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if probe:
+                    bucket.release()
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                if method not in IDEMPOTENT_METHODS and not isinstance(e, aiohttp.ClientConnectorError):
+                    # The request may have reached Discord: only a failed connect is safe to repeat
+                    raise
+                delay = min(0.5 * (2 ** attempt), 8.0)
+                self._report(Retry(route_key, attempt, delay, f"Connection error ({e})"))
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled (job cancel): the clients sharing this token must not wait on the probe forever
+                if probe:
+                    bucket.release()
+                raise
+
+    async def get(self, path: str, **kwargs) -> RestResponse:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> RestResponse:
+        return await self.request("POST", path, **kwargs)
+
+    async def patch(self, path: str, **kwargs) -> RestResponse:
+        return await self.request("PATCH", path, **kwargs)
+
+    async def put(self, path: str, **kwargs) -> RestResponse:
+        return await self.request("PUT", path, **kwargs)
+
+    async def delete(self, path: str, **kwargs) -> RestResponse:
+        return await self.request("DELETE", path, **kwargs)
+
+
+def _parse_rate_limit_headers(headers) -> Tuple[Optional[int], Optional[int], Optional[float]]:
+    try:
+        limit = headers.get("X-RateLimit-Limit")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+        if limit is None or remaining is None or reset_after is None:
+            return None, None, None
+        return int(limit), int(remaining), float(reset_after)
+    except (TypeError, ValueError):
+        return None, None, None
+
+
+def _retry_after(headers, body) -> float:
+    retry_after = None
+    if isinstance(body, dict):
+        retry_after = body.get("retry_after")
+    if retry_after is None:
+        retry_after = headers.get("Retry-After")
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+async def _read_body(resp: aiohttp.ClientResponse, raw: bool):
+    if raw:
+        return await resp.read()
+    if resp.status == 204:
+        return None
+    if "application/json" in resp.headers.get("Content-Type", ""):
+        try:
+            return await resp.json()
+        except (aiohttp.ContentTypeError, ValueError):
+            return None
+    return await resp.text()
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from src.operation_file.events import EventBus, OperationFinished, OperationStarted
+
+
+class Operation:
+    """One node of an operation graph: an async action plus the keys it waits for"""
+
+    def __init__(self, key: str, action: Optional[Callable[[], Awaitable]], deps: Iterable[str] = (), weight: int = 1):
+        self.key = key
+        self.action = action  # None for pure synchronisation points
+        self.deps = set(deps)
+        self.weight = weight  # requests the action is expected to send
+        self.dependents: List[str] = []
+        self.error: Optional[BaseException] = None
+        self.done = False
+
+
+class OperationGraph:
+    """Dependency graph of async operations
+
+    run() starts every operation whose dependencies have finished, so
+    independent branches (e.g. the channels of two different categories)
+    proceed at the same time. Throughput is then limited only by what the
+    operations themselves wait for, typically the REST client rate limits.
+    """
+
+    def __init__(self):
+        self.operations: Dict[str, Operation] = {}
+
+    def __len__(self):
+        return len(self.operations)
+
+    def __contains__(self, key: str):
+        return key in self.operations
+
+    @property
+    def weight(self) -> int:
+        """Requests expected from the operations that still have an action"""
+        return sum(op.weight for op in self.operations.values() if op.action is not None)
+
+    def add(self, key: str, action: Optional[Callable[[], Awaitable]] = None, deps: Iterable[str] = (),
+            weight: int = 1) -> Operation:
+        """Add an operation; dependencies on keys never added are ignored
+
+        :param weight: requests the action is expected to send, used for progress
+        """
+        if key in self.operations:
+            raise ValueError(f"Duplicate operation: {key}")
+        op = Operation(key, action, deps, weight)
+        self.operations[key] = op
+        return op
+
+    async def run(self, max_concurrency: Optional[int] = None,
+                  on_error: Optional[Callable[[Operation, BaseException], None]] = None,
+                  events: Optional[EventBus] = None):
+        """Execute the graph
+
+        A failed operation does not block its dependents: the failure is
+        reported through on_error and the dependents run with whatever state
+        is available, as the sequential clone used to do.
+
+        :param max_concurrency: optional cap on operations running at once
+        :param events: bus receiving a started/finished event for every operation with an action
+        :raises ValueError: if the graph contains a cycle
+        """
+        pending_deps: Dict[str, int] = {}
+        for op in self.operations.values():
+            op.deps = {d for d in op.deps if d in self.operations}
+            op.dependents = []
+        for op in self.operations.values():
+            for dep in op.deps:
+                self.operations[dep].dependents.append(op.key)
+            pending_deps[op.key] = len(op.deps)
+
+        ready = [key for key, count in pending_deps.items() if count == 0]
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        running: Dict[asyncio.Task, Operation] = {}
+        finished = 0
+
+        async def execute(op: Operation):
+            if op.action is None:
+                return
+            if semaphore is None:
+                await run_action(op)
+            else:
+                async with semaphore:
+                    await run_action(op)
+
+        async def run_action(op: Operation):
+            if events is None:
+                await op.action()
+                return
+            events.emit(OperationStarted(op.key))
+            started = time.monotonic()
+            try:
+                await op.action()
+            except Exception as e:
+                events.emit(OperationFinished(op.key, time.monotonic() - started, str(e)))
+                raise
+            events.emit(OperationFinished(op.key, time.monotonic() - started))
+
+        try:
+            while ready or running:
+                for key in ready:
+                    op = self.operations[key]
+                    running[asyncio.ensure_future(execute(op))] = op
+                ready = []
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    op = running.pop(task)
+                    op.done = True
+                    finished += 1
+                    if not task.cancelled() and task.exception() is not None:
+                        op.error = task.exception()
+                        if on_error:
+                            on_error(op, op.error)
+                    for dependent in op.dependents:
+                        pending_deps[dependent] -= 1
+                        if pending_deps[dependent] == 0:
+                            ready.append(dependent)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+        if finished < len(self.operations):
+            stuck = [key for key, op in self.operations.items() if not op.done]
+            raise ValueError(f"Operation graph has a cycle: {', '.join(stuck[:5])}")
@@ -1,18 +1,32 @@
-import discord
 from src.operation_file.logger import Logger
+from src.operation_file.events import EventBus, EventMetrics, LogEvent, PhaseChanged, Counters
+from src.operation_file.rest_client import DiscordRestClient, RateLimitState, API_BASE, CDN_BASE
+from src.operation_file.scheduler import OperationGraph
+from src.operation_file.journal import CloneJournal
+from src.operation_file.guild_diff import diff_roles, diff_channels, map_overwrites, role_hierarchy, \
+    role_order_changed, channel_positions
+from src.operation_file.snapshot import read_snapshot, write_snapshot
+from src.operation_file.message_copy import MessageCopier, MAX_ACTIVE_CHANNELS, PAGE_SIZE
+from src.operation_file.planner import ClonePlan, extrapolate, history_pages
+from src.operation_file.progress import ProgressTracker
+from src.operation_file.attachment_cache import AttachmentCache
+from src.operation_file.mentions import ReferenceRewriter
+from src.operation_file.guild_cache import GuildCache, get_guild_cache
 from typing import Optional, Callable
 import asyncio
+import statistics
 import time
-import io
-import aiohttp
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import json
-import re
-from datetime import datetime
 import base64
 import os
 
 
+# Channels Discord creates with a new guild (two categories, #general, General)
+FRESH_GUILD_CHANNELS = 4
+MAX_GUILD_CHANNELS = 500
+
+
 def load_or_create_config(file_path="config.json"):
     # Default settings
     defaults = {
@@ -40,8 +54,20 @@ def load_or_create_config(file_path="config.json"):
 
     return config
 class Clone:
-    def __init__(self, debug_callback=None):
+    def __init__(self, debug_callback=None, api_url=API_BASE, cdn_url=CDN_BASE, limits: Optional[RateLimitState] = None,
+                 cache: Optional[GuildCache] = None):
         self.logger = Logger(debug_callback)
+        # Everything the engine reports goes through the event bus; console/debug output is one listener
+        self.events = EventBus()
+        self.metrics = EventMetrics()
+        self.events.listen(self.metrics.update)
+        self.events.listen(self._print_events)
+        self._counters_at = 0.0
+        self.api_url = api_url  # overridable to run against a local mock server
+        self.cdn_url = cdn_url
+        self.limits = limits  # rate limit state shared with other jobs of the same token
+        self.cache = cache if cache is not None else get_guild_cache()  # guild metadata shared with the UI
+        self.paused = False
         self.total_roles = 0
         self.total_channels = 0
         self.total_messages = 0
@@ -51,26 +77,40 @@ class Clone:
         self.errors = 0
         self.start_time = None
         self.channel_map = {}  # Map to track old->new channels
-        self.executor = ThreadPoolExecutor(max_workers=3)  # For async file operations
         self.progress_callback = None  # Callback per l'aggiornamento della barra di progresso
-        self.stats = {
-            "roles_created": 0,
-            "categories_created": 0,
-            "text_channels_created": 0,
-            "voice_channels_created": 0,
-            "messages_cloned": 0,
-            "errors": 0,
-            "start_time": None,
-            "elapsed_time": 0
-        }
-        self.total_operations = 0
-        self.completed_operations = 0
+        self.progress = ProgressTracker()  # requests done vs planned, with throughput and ETA
         self.roles_map = {}
         self.categories_map = {}
         self.channels_map = {}
+        self.rest = None  # DiscordRestClient shared by all REST helpers during a clone
+        self.journal = None  # CloneJournal of the running job
+        self.snapshot = None  # GuildSnapshot used instead of the live source guild
+        self.copier = None  # MessageCopier of the running job
+        self.message_cursors = {}  # source channel -> last source message copied
+        self.message_weight = 0  # requests planned for the copy of one channel
+
+    @property
+    def total_operations(self) -> int:
+        return self.progress.total
 
+    @property
+    def completed_operations(self) -> int:
+        return self.progress.completed
 
 
+    def pause(self):
+        """Stop sending requests (the ones in flight complete) until resume()"""
+        self.paused = True
+        if self.rest:
+            self.rest.pause()
+        self._safe_log("Clone paused")
+
+    def resume(self):
+        self.paused = False
+        if self.rest:
+            self.rest.resume()
+        self._safe_log("Clone resumed")
+
     def set_progress_callback(self, callback: Callable[[float], None]):
         """Imposta una callback per aggiornare l'UI con il progresso
         La callback riceve un valore da 0.0 a 1.0 che rappresenta la percentuale di completamento
@@ -84,13 +124,14 @@ class Clone:
             progress = max(0.0, min(1.0, progress))
             self.progress_callback(progress)
 
-    async def start_clone(self, guild_from, guild_to, session, options=None) -> bool:
+    async def start_clone(self, guild_from, guild_to, session, options=None, headers=None) -> bool:
         """Start the cloning process with options using REST API
         
         Args:
-            guild_from: JSON data of source guild
+            guild_from: JSON data of source guild (may be None with snapshot_path)
             guild_to: JSON data of destination guild
-            session: aiohttp ClientSession with appropriate headers
+            session: aiohttp ClientSession (the shared one from src.utils.http_session)
+            headers: API headers (Authorization) when the session does not carry them
             options: Dictionary of options to customize the cloning process:
                 - clone_roles: Whether to clone roles
                 - clone_categories: Whether to clone categories
@@ -98,27 +139,34 @@ class Clone:
                 - clone_voice_channels: Whether to clone voice channels
                 - clone_messages: Whether to clone messages
                 - messages_limit: Maximum number of messages to clone per channel
+                - message_channels: channels whose messages are copied at the same time
+                - coalesce_messages: merge consecutive short messages of the same author
+                - attachment_cache_dir: where downloaded attachments are kept (default: ./attachment_cache)
                 - clone_name_icon: clones the name and icon of the destined server
+                - resume: continue an interrupted clone from its journal instead of starting over
+                - sync_mode: only send the changes needed to make the destination match the source
+                - journal_dir: where clone journals are kept (default: ./journals)
+                - snapshot_path: clone from a snapshot file instead of the live source guild
         """
         try:
             self.start_time = time.time()
             
             # Reset statistics
-            self.stats = {
-                "roles_created": 0,
-                "categories_created": 0,
-                "text_channels_created": 0,
-                "voice_channels_created": 0,
-                "messages_cloned": 0,
-                "errors": 0,
-                "start_time": time.time(),
-                "elapsed_time": 0
-            }
+            self.roles_created = 0
+            self.channels_created = 0
+            self.errors = 0
+            self.total_roles = 0
+            self.total_channels = 0
+            self.total_messages = 0
+            self.progress.reset()
             
             # Reset entity maps
             self.roles_map = {}
             self.categories_map = {}
             self.channels_map = {}
+            self.message_cursors = {}
+            self.messages_copied = 0
+            self.copier = None
             
             # Default options if none provided
             if options is None:
@@ -131,165 +179,666 @@ class Clone:
                     "messages_limit": 0,
                     "clone_name_icon": False
                 }
-         
-            # Calculate total operations for progress tracking
-            self.total_operations = 0
-            self.completed_operations = 0
-            
+
+            # The source structure comes from the snapshot file, never from the API
+            self.snapshot = None
+            if options.get("snapshot_path"):
+                self.snapshot = read_snapshot(options["snapshot_path"])
+                guild_from = self.snapshot.guild
+                self._safe_log(f"Loaded snapshot of {guild_from.get('name')}: "
+                               f"{len(self.snapshot.roles)} roles, {len(self.snapshot.channels)} channels")
+
             source_id = guild_from.get("id")
             dest_id = guild_to.get("id")
+
+            # Single client for the whole job: rate limit state is shared by every helper
+            self.rest = DiscordRestClient(session, base_url=self.api_url, cdn_url=self.cdn_url,
+                                          log=self._safe_log, headers=headers, on_complete=self._on_request_complete,
+                                          events=self.events, limits=self.limits)
+            if self.paused:
+                self.rest.pause()
             
             self._safe_log(f"Starting cloning process from {guild_from.get('name')} to {guild_to.get('name')}")
-            # Ensure env is loaded/created
+            self.events.emit(PhaseChanged("fetch"))
 
-            
-            # Fetch all data from the source server
+            # Journal of finished operations, used to resume an interrupted clone
+            self.journal = CloneJournal.for_job(source_id, dest_id, options.get("journal_dir"))
+            sync_mode = options.get("sync_mode", False)
+            resume = False
+            known_maps = {}
+            if sync_mode and self.journal.exists():
+                # IDs recorded by earlier jobs let the diff recognise renamed roles and channels
+                self.journal.load()
+                known_maps = {name: dict(mapping) for name, mapping in self.journal.maps.items()}
+                self.message_cursors = known_maps.get("message_cursors", {})
+            elif options.get("resume", False) and self.journal.exists():
+                done = self.journal.load()
+                resume = done > 0 and not self.journal.finished
+                if resume:
+                    self.roles_map = dict(self.journal.maps["roles_map"])
+                    self.categories_map = dict(self.journal.maps["categories_map"])
+                    self.channels_map = dict(self.journal.maps["channels_map"])
+                    self.message_cursors = dict(self.journal.maps["message_cursors"])
+                    self.roles_created = len(self.roles_map)
+                    self.channels_created = len(self.categories_map) + len(self.channels_map)
+                    self._safe_log(f"Resuming previous clone: {done} operations already done")
+            self.journal.start({"source": source_id, "dest": dest_id, "options": options}, resume=resume)
+            if sync_mode:
+                # A sync starts a new journal: keep the cursors so only newer messages are copied
+                for channel_id, message_id in self.message_cursors.items():
+                    self.journal.record(f"cursor:{channel_id}", "message_cursors", channel_id, message_id)
+
+            clone_channels = options.get("clone_categories", True) or \
+                options.get("clone_text_channels", True) or \
+                options.get("clone_voice_channels", True)
+
+            # Fetch source and destination data in parallel
+            fetches = {"source_channels": self._fetch_source_resource(source_id, "channels")}
+            if options.get("clone_roles", True) or (sync_mode and clone_channels):
+                # A sync needs the role mapping to compare permission overwrites
+                fetches["source_roles"] = self._fetch_source_resource(source_id, "roles")
+                fetches["dest_roles"] = self._fetch_guild_resource(dest_id, "roles")
+            if clone_channels:
+                fetches["dest_channels"] = self._fetch_guild_resource(dest_id, "channels")
+            fetched = dict(zip(fetches.keys(), await asyncio.gather(*fetches.values())))
             
             # Roles
-            roles_url = f"https://discord.com/api/v10/guilds/{source_id}/roles"
             roles_data = []
-            
-            if options.get("clone_roles", True):
-                async with session.get(roles_url) as roles_response:
-                    if roles_response.status == 200:
-                        roles_data = await roles_response.json()
-                        # Filtriamo il ruolo everyone che non possiamo clonare
-                        roles_data = [r for r in roles_data if r.get("name") != "@everyone"]
-                        self.total_roles = len(roles_data)
-                        self._safe_log(f"Found {self.total_roles} roles to clone")
-                    else:
-                        self._safe_log(f"Error fetching roles: {roles_response.status}", "ERROR")
-                        self.errors += 1
+            if fetched.get("source_roles") is not None:
+                # Filtriamo il ruolo everyone che non possiamo clonare
+                roles_data = [r for r in fetched["source_roles"] if r.get("name") != "@everyone"]
+                self.total_roles = len(roles_data)
+                self._safe_log(f"Found {self.total_roles} roles to clone")
             
             # Canali
-            channels_url = f"https://discord.com/api/v10/guilds/{source_id}/channels"
             categories_data = []
             text_channels_data = []
             voice_channels_data = []
             
-            async with session.get(channels_url) as channels_response:
-                if channels_response.status == 200:
-                    all_channels = await channels_response.json()
-                    
-                    # Dividiamo i canali per tipo
-                    categories_data = [c for c in all_channels if c.get("type") == 4]
-                    text_channels_data = [c for c in all_channels if c.get("type") == 0]
-                    voice_channels_data = [c for c in all_channels if c.get("type") == 2]
-                    
-                    total_channels = 0
-                    if options.get("clone_categories", True):
-                        total_channels += len(categories_data)
-                    if options.get("clone_text_channels", True):
-                        total_channels += len(text_channels_data)
-                    if options.get("clone_voice_channels", True):
-                        total_channels += len(voice_channels_data)
-                    
-                    self.total_channels = total_channels
-                    self._safe_log(f"Found {self.total_channels} channels to clone")
-                else:
-                    self._safe_log(f"Error fetching channels: {channels_response.status}", "ERROR")
-                    self.errors += 1
+            if fetched.get("source_channels") is not None:
+                all_channels = fetched["source_channels"]
+                
+                # Dividiamo i canali per tipo
+                categories_data = [c for c in all_channels if c.get("type") == 4]
+                text_channels_data = [c for c in all_channels if c.get("type") == 0]
+                voice_channels_data = [c for c in all_channels if c.get("type") == 2]
+                
+                total_channels = 0
+                if options.get("clone_categories", True):
+                    total_channels += len(categories_data)
+                if options.get("clone_text_channels", True):
+                    total_channels += len(text_channels_data)
+                if options.get("clone_voice_channels", True):
+                    total_channels += len(voice_channels_data)
+                
+                self.total_channels = total_channels
+                self._safe_log(f"Found {self.total_channels} channels to clone")
             
-            # Inizializziamo il progresso
             self._update_progress(0.0)
-            
-            # Customize progress percentages based on selected options
-            progress_steps = []
-            current_progress = 0.0
-            
-            # Basic server settings always come first
-            progress_steps.append(("edit_guild", 0.05))
-            current_progress += 0.05
-            
-            # Calculate progress percentages for each step
-            # We allocate percentages based on whether an option is enabled
-            
-            if options.get("clone_roles", True):
-                progress_steps.append(("delete_roles", current_progress + 0.10))
-                current_progress += 0.10
-                progress_steps.append(("create_roles", current_progress + 0.15))
-                current_progress += 0.15
-            
-            if options.get("clone_categories", True) or options.get("clone_text_channels", True) or options.get("clone_voice_channels", True):
-                progress_steps.append(("delete_channels", current_progress + 0.10))
-                current_progress += 0.10
-            
-            if options.get("clone_categories", True):
-                progress_steps.append(("create_categories", current_progress + 0.10))
-                current_progress += 0.10
-            
-            channel_progress = 0.0
-            if options.get("clone_text_channels", True) or options.get("clone_voice_channels", True):
-                channel_progress = 0.20
-                progress_steps.append(("create_channels", current_progress + channel_progress))
-                current_progress += channel_progress
-            
-            if options.get("clone_messages", True):
-                progress_steps.append(("copy_messages", 1.0))  # Messages always go to 100%
-            else:
-                # If we don't clone messages, we need to ensure we reach 100%
-                self._update_progress(1.0)
-            
-            # Store progress steps for reference
-            self.progress_steps = dict(progress_steps)
+            clone_messages = options.get("clone_messages", True) and (options.get("messages_limit") or 0) > 0
 
-            # Cloning sequence with options
-
-            # Basic server settings (name, icon)
-            
-            await self._edit_guild_rest(guild_to, guild_from, session, options=options)
-            self._update_progress(self.progress_steps.get("edit_guild", 0.05))
-
-            if options.get("clone_roles", True) and roles_data:
-                await self._delete_existing_roles_rest(guild_to, session)
-                self._update_progress(self.progress_steps.get("delete_roles", 0.15))
-                
-                await self._create_roles_rest(guild_to, roles_data, session)
-                self._update_progress(self.progress_steps.get("create_roles", 0.30))
-            
-            # Channels
-            channel_types_to_clone = []
+            channels_data = []
             if options.get("clone_categories", True):
-                channel_types_to_clone.append("categories")
+                channels_data += categories_data
             if options.get("clone_text_channels", True):
-                channel_types_to_clone.append("text")
+                channels_data += text_channels_data
             if options.get("clone_voice_channels", True):
-                channel_types_to_clone.append("voice")
-            
-            if channel_types_to_clone:
-                await self._delete_existing_channels_rest(guild_to, session)
-                self._update_progress(self.progress_steps.get("delete_channels", 0.40))
-            
-            # Use the combined create function
-            if (options.get("clone_categories", True) and categories_data) or \
-            (options.get("clone_text_channels", True) and text_channels_data) or \
-            (options.get("clone_voice_channels", True) and voice_channels_data):
+                channels_data += voice_channels_data
 
-                await self._create_categories_and_channels_rest(
+            if resume:
+                self._adopt_unrecorded(roles_data, fetched.get("dest_roles"), channels_data, fetched.get("dest_channels"))
+
+            # Every operation runs as soon as what it depends on is done
+            if sync_mode:
+                graph = self._build_sync_graph(
+                    guild_from,
                     guild_to,
-                    categories_data if options.get("clone_categories", True) else [],
-                    text_channels_data if options.get("clone_text_channels", True) else [],
-                    voice_channels_data if options.get("clone_voice_channels", True) else [],
-                    session
+                    options,
+                    fetched.get("source_roles"),
+                    fetched.get("dest_roles"),
+                    channels_data if fetched.get("source_channels") is not None else None,
+                    fetched.get("dest_channels") if clone_channels else None,
+                    known_maps
                 )
-                # Update progress in one go (or split if you want finer progress tracking)
-                self._update_progress(self.progress_steps.get("create_channels", 0.70))
-
-            
-            # We skip messages for now as they would need a completely different approach with the REST API
-            # You would need to fetch messages from each channel and then post them to the destination
-            # This can be added as a separate feature later
+            else:
+                graph = self._build_clone_graph(
+                    guild_from,
+                    guild_to,
+                    options,
+                    roles_data,
+                    fetched.get("dest_roles"),
+                    channels_data,
+                    fetched.get("dest_channels") if clone_channels else None
+                )
+            if clone_messages:
+                references = ReferenceRewriter(source_id, dest_id, self.roles_map, self.channels_map, self.categories_map)
+                self._add_message_nodes(graph, text_channels_data, options.get("messages_limit"),
+                                        options.get("message_channels") or MAX_ACTIVE_CHANNELS,
+                                        AttachmentCache(options.get("attachment_cache_dir")),
+                                        options.get("coalesce_messages", False), references)
+            # Progress counts requests: the ones already sent (fetches) plus what the graph will send
+            self.progress.add_total(self.progress.completed + graph.weight)
+            self._safe_log(f"Planned {self.progress.total} requests")
+            self.events.emit(PhaseChanged("clone"))
+            await graph.run(on_error=self._on_operation_error, events=self.events)
+            self.journal.mark_finished()
+            self._update_progress(1.0)
+            self.events.emit(PhaseChanged("finished"))
+            if clone_messages and self.copier.scheduler.channels:
+                report = self.copier.scheduler.report()
+                slowest = report[0]
+                self._safe_log(f"Copied {self.messages_copied} messages, slowest channel "
+                               f"#{slowest['name']} at {slowest['rate']} msg/s")
+                for channel in report:
+                    self._safe_log(f"#{channel['name']}: {channel['messages']} messages in {channel['seconds']}s "
+                                   f"({channel['rate']} msg/s)", "DEBUG")
 
             elapsed = time.time() - self.start_time
-            self.logger.add(f"Cloning completed in {elapsed:.2f} seconds")
+            self._safe_log(f"Cloning completed in {elapsed:.2f} seconds")
             return True
 
         except Exception as e:
-            self.logger.error(f"Critical error during cloning: {str(e)}")
+            self._safe_log(f"Critical error during cloning: {str(e)}", "ERROR")
             return False
+        finally:
+            # The destination has changed: nobody may reuse what was read before the clone
+            if guild_to:
+                self.cache.invalidate(guild_to.get("id"))
+            self.events.emit(Counters(self.get_stats()))
+            self.events.flush()
+            if self.journal:
+                self.journal.close()
+            if self.copier:
+                self.copier.attachments.save()
+
+    def _build_clone_graph(self, guild_from, guild_to, options, roles_data, dest_roles, channels_data, dest_channels) -> OperationGraph:
+        """Build the dependency graph of the clone
+
+        Role creation waits for the role cleanup, channels wait for the channel
+        cleanup, their parent category and every role referenced by their
+        permission overwrites. Everything else is free to run concurrently.
+        """
+        graph = OperationGraph()
+        # In a fresh guild there is nothing to make room for: creations do not wait for the cleanup.
+        # The default channels are still deleted (in parallel), or they would be left next to the clone
+        cleanup = [] if self._is_fresh_guild(dest_roles, dest_channels, channels_data) else ["delete_roles"]
+
+        # Basic server settings (name, icon)
+        graph.add("edit_guild", self._journaled("edit_guild", partial(self._edit_guild_rest, guild_to, guild_from, options=options)),
+                  weight=self._edit_guild_weight(guild_from, options))
+
+        if options.get("clone_roles", True) and roles_data:
+            graph.add("delete_roles", self._journaled("delete_roles", partial(self._delete_existing_roles_rest, guild_to, dest_roles)),
+                      weight=len([r for r in dest_roles or [] if r.get("name") != "@everyone" and not r.get("managed")]))
+
+            role_keys = []
+            for role in roles_data:
+                key = f"role:{role.get('id')}"
+                graph.add(key, self._journaled(key, partial(self._create_role_rest, guild_to, role), record=False),
+                          deps=cleanup)
+                role_keys.append(key)
+            # Roles are created in any order, the hierarchy is fixed once at the end
+            graph.add("role_positions", self._journaled("role_positions", partial(self._reorder_roles_rest, guild_to, roles_data)),
+                      deps=role_keys)
+
+        if dest_channels is not None or channels_data:
+            graph.add("delete_channels", self._journaled("delete_channels", partial(self._delete_existing_channels_rest, guild_to, dest_channels)),
+                      weight=len(dest_channels or []))
+
+        category_keys = []
+        channel_keys = []
+        for channel in channels_data:
+            deps = ["delete_channels"] if cleanup else []
+            parent_id = channel.get("parent_id")
+            if parent_id:
+                deps.append(f"channel:{parent_id}")
+            for overwrite in channel.get("permission_overwrites") or []:
+                if overwrite.get("type") == 0:
+                    deps.append(f"role:{overwrite.get('id')}")
+
+            key = f"channel:{channel.get('id')}"
+            graph.add(key, self._journaled(key, partial(self._create_channel_rest, guild_to, guild_from, channel), record=False),
+                      deps=deps)
+            (category_keys if channel.get("type") == 4 else channel_keys).append(key)
+
+        if category_keys or channel_keys:
+            graph.add("channel_positions", self._journaled("channel_positions", partial(self._reorder_channels_rest, guild_to, channels_data)),
+                      deps=category_keys + channel_keys)
+
+        return graph
+
+    def _build_sync_graph(self, guild_from, guild_to, options, source_roles, dest_roles, channels_data, dest_channels, known_maps) -> OperationGraph:
+        """Build the dependency graph of an incremental sync
+
+        Both guilds are diffed and only the POST/PATCH/DELETE calls for what
+        actually changed are scheduled, so refreshing a mirror costs requests
+        proportional to the changes instead of the size of the guild.
+        """
+        graph = OperationGraph()
+        source_guild_id = guild_from.get("id")
+        dest_guild_id = guild_to.get("id")
 
-    async def _edit_guild_rest(self, guild_to, guild_from, session, options=None):
+        graph.add("edit_guild", partial(self._edit_guild_rest, guild_to, guild_from, options=options),
+                  weight=self._edit_guild_weight(guild_from, options))
+
+        role_diff = None
+        if source_roles is not None and dest_roles is not None:
+            role_diff = diff_roles(source_roles, dest_roles, known_maps.get("roles_map"))
+            for source_id, dest_id in role_diff.matched.items():
+                self.roles_map[source_id] = dest_id
+                self.journal.record(f"role:{source_id}", "roles_map", source_id, dest_id)
+
+        if options.get("clone_roles", True) and role_diff is not None:
+            self._safe_log(f"Roles: {role_diff.summary()}")
+            delete_keys = []
+            for role in role_diff.delete:
+                key = f"delete_role:{role.get('id')}"
+                graph.add(key, partial(self._delete_role_rest, guild_to, role))
+                delete_keys.append(key)
+
+            role_keys = []
+            for role in role_diff.create:
+                key = f"role:{role.get('id')}"
+                graph.add(key, partial(self._create_role_rest, guild_to, role))
+                role_keys.append(key)
+            for role, dest, fields in role_diff.update:
+                key = f"role:{role.get('id')}"
+                graph.add(key, partial(self._update_role_rest, guild_to, role, dest, fields))
+                role_keys.append(key)
+            if role_diff.create or role_order_changed(source_roles, dest_roles, role_diff.matched):
+                graph.add("role_positions", partial(self._reorder_roles_rest, guild_to, source_roles),
+                          deps=role_keys + delete_keys)
+                role_keys.append("role_positions")
+
+        if channels_data is None or dest_channels is None:
+            return graph
+
+        types = {c.get("type") for c in channels_data} | self._channel_types(options)
+        known_channels = dict(known_maps.get("categories_map", {}))
+        known_channels.update(known_maps.get("channels_map", {}))
+        channel_diff = diff_channels(
+            channels_data,
+            [c for c in dest_channels if c.get("type") in types],
+            self.roles_map,
+            source_guild_id,
+            dest_guild_id,
+            known=known_channels,
+            new_roles=[r.get("id") for r in role_diff.create] if role_diff and options.get("clone_roles", True) else (),
+            compare_parent=4 in types
+        )
+        self._safe_log(f"Channels: {channel_diff.summary()}")
+
+        source_types = {c.get("id"): c.get("type") for c in channels_data}
+        for source_id, dest_id in channel_diff.matched.items():
+            map_name = "categories_map" if source_types.get(source_id) == 4 else "channels_map"
+            getattr(self, map_name)[source_id] = dest_id
+            self.journal.record(f"channel:{source_id}", map_name, source_id, dest_id)
+
+        delete_keys = []
+        for channel in channel_diff.delete:
+            key = f"delete_channel:{channel.get('id')}"
+            graph.add(key, partial(self._delete_channel_rest, channel))
+            delete_keys.append(key)
+
+        category_keys = []
+        channel_keys = []
+        updates = {source.get("id"): (dest, fields) for source, dest, fields in channel_diff.update}
+        for channel in channel_diff.create + [source for source, _, _ in channel_diff.update]:
+            deps = []
+            if channel.get("parent_id"):
+                deps.append(f"channel:{channel.get('parent_id')}")
+            for overwrite in channel.get("permission_overwrites") or []:
+                if overwrite.get("type") == 0:
+                    deps.append(f"role:{overwrite.get('id')}")
+
+            key = f"channel:{channel.get('id')}"
+            if channel.get("id") in updates:
+                dest, fields = updates[channel.get("id")]
+                action = partial(self._update_channel_rest, guild_to, guild_from, channel, dest, fields)
+            else:
+                action = partial(self._create_channel_rest, guild_to, guild_from, channel)
+            graph.add(key, action, deps=deps)
+            (category_keys if channel.get("type") == 4 else channel_keys).append(key)
+
+        # Only channels whose position differs (or that do not exist yet) are sent
+        graph.add("channel_positions",
+                  partial(self._reorder_channels_rest, guild_to, channels_data, channel_positions(dest_channels)),
+                  deps=category_keys + channel_keys)
+        return graph
+
+    def _is_fresh_guild(self, dest_roles, dest_channels, channels_data) -> bool:
+        """Whether the destination is a just created guild (effectively empty)
+
+        Only @everyone, at most Discord's default channels and no message in
+        them: deleting those few channels can overlap with the clone as long
+        as the channel limit is not reached in the meantime. They are not
+        skipped, the source does not have them.
+        """
+        if dest_roles is None or dest_channels is None:
+            return False
+        if any(r.get("name") != "@everyone" and not r.get("managed") for r in dest_roles):
+            return False
+        if len(dest_channels) > FRESH_GUILD_CHANNELS or any(c.get("last_message_id") for c in dest_channels):
+            return False
+        return len(dest_channels) + len(channels_data) <= MAX_GUILD_CHANNELS
+
+    def _adopt_unrecorded(self, roles_data, dest_roles, channels_data, dest_channels):
+        """Map entities created by requests that were in flight when the previous run stopped
+
+        Once the cleanup phase is journaled every unmapped role/channel left in
+        the destination was created by this job: match it by name (and type)
+        instead of creating a duplicate.
+        """
+        adopted = 0
+        if self.journal.is_done("delete_roles") and dest_roles:
+            free = [r for r in dest_roles if r.get("name") != "@everyone" and r.get("id") not in set(self.roles_map.values())]
+            for role in roles_data:
+                if role.get("id") in self.roles_map:
+                    continue
+                match = next((r for r in free if r.get("name") == role.get("name")), None)
+                if match:
+                    free.remove(match)
+                    self.roles_map[role.get("id")] = match.get("id")
+                    self.journal.record(f"role:{role.get('id')}", "roles_map", role.get("id"), match.get("id"))
+                    adopted += 1
+
+        if self.journal.is_done("delete_channels") and dest_channels:
+            mapped = set(self.categories_map.values()) | set(self.channels_map.values())
+            free = [c for c in dest_channels if c.get("id") not in mapped]
+            for channel in channels_data:
+                map_name = "categories_map" if channel.get("type") == 4 else "channels_map"
+                channel_map = getattr(self, map_name)
+                if channel.get("id") in channel_map:
+                    continue
+                match = next((c for c in free if c.get("name") == channel.get("name") and c.get("type") == channel.get("type")), None)
+                if match:
+                    free.remove(match)
+                    channel_map[channel.get("id")] = match.get("id")
+                    self.journal.record(f"channel:{channel.get('id')}", map_name, channel.get("id"), match.get("id"))
+                    adopted += 1
+
+        if adopted:
+            self._safe_log(f"Recovered {adopted} entities created before the interruption")
+
+    def _add_message_nodes(self, graph, text_channels, limit, max_channels=MAX_ACTIVE_CHANNELS, attachments=None,
+                           coalesce=False, references=None):
+        """Add one message copy per text channel, once the channel exists and is in place
+
+        Copies read the destination channel from channels_map when they run,
+        so they work the same for created, matched and resumed channels.
+        """
+        self.copier = MessageCopier(self.rest, limit, max_channels=max_channels, cursors=self.message_cursors,
+                                    attachments=attachments, coalesce=coalesce, references=references,
+                                    on_copied=self._on_message_copied, log=self._safe_log)
+        self.total_messages = len(text_channels) * limit
+        # Upper bound (full history, one send per message), corrected when each channel ends
+        self.message_weight = history_pages(limit) + limit
+        for channel in text_channels:
+            key = f"messages:{channel.get('id')}"
+            graph.add(key, self._journaled(key, partial(self._copy_channel_messages_rest, channel)),
+                      deps=[f"channel:{channel.get('id')}", "channel_positions"], weight=self.message_weight)
+
+    async def _copy_channel_messages_rest(self, channel):
+        dest_id = self.channels_map.get(channel.get("id"))
+        if not dest_id:
+            self._safe_log(f"Skipping messages of #{channel.get('name')}: channel not cloned", "WARNING")
+            self.progress.add_total(-self.message_weight)
+            return
+        if not self.copier.scheduler.channels and not self.copier.messages_copied:
+            self.events.emit(PhaseChanged("messages"))
+        try:
+            await self.copier.copy_channel(channel.get("id"), dest_id, channel.get("name"))
+        finally:
+            stats = self.copier.scheduler.channels.get(channel.get("id"))
+            self.progress.add_total((stats.requests if stats else 0) - self.message_weight)
+            self._update_progress(self.progress.fraction)
+            # Only this channel's failures: the copier total also grows with the channels running alongside
+            self.errors += stats.errors if stats else 0
+
+    def _on_message_copied(self, source_channel_id, message_id, count=1):
+        self.messages_copied += count
+        self.message_cursors[source_channel_id] = message_id
+        self.journal.record(f"cursor:{source_channel_id}", "message_cursors", source_channel_id, message_id)
+
+    def _on_request_complete(self):
+        self.progress.complete()
+        self._update_progress(self.progress.fraction)
+        now = time.monotonic()
+        if now - self._counters_at >= self.events.interval:
+            self._counters_at = now
+            self.events.emit(Counters(self.get_stats()))
+
+    def _edit_guild_weight(self, guild_from, options) -> int:
+        """Requests of edit_guild: the guild PATCH plus the icon download"""
+        if not options.get("clone_name_icon", False):
+            return 0
+        return 2 if self.snapshot is None and guild_from.get("icon") else 1
+
+    def _journaled(self, key, action, record=True):
+        """Skip an operation already finished in the journal, otherwise record it when done
+
+        :param record: False for operations that record themselves (with their ID mapping)
+        """
+        if self.journal and self.journal.is_done(key):
+            return None
+
+        async def run():
+            await action()
+            if record and self.journal:
+                self.journal.record(key)
+        return run
+
+    async def _fetch_guild_resource(self, guild_id, resource):
+        """GET /guilds/{id}/{resource} through the guild cache, returns the decoded list or None on failure"""
+        async def fetch():
+            try:
+                resp = await self.rest.get(f"/guilds/{guild_id}/{resource}")
+                if resp.status == 200:
+                    return resp.data
+                self._safe_log(f"Error fetching {resource}: {resp.status}", "ERROR")
+            except Exception as e:
+                self._safe_log(f"Error fetching {resource}: {str(e)}", "ERROR")
+            self.errors += 1
+            return None
+        return await self.cache.get(self.rest.headers.get("Authorization"), guild_id, resource, fetch)
+
+    async def _fetch_source_resource(self, guild_id, resource):
+        """Roles/channels of the source guild, from the snapshot when cloning from one"""
+        if self.snapshot is not None:
+            return list(getattr(self.snapshot, resource))
+        return await self._fetch_guild_resource(guild_id, resource)
+
+    async def export_snapshot(self, guild_from, session, path, headers=None) -> bool:
+        """Save the structure of a guild to a snapshot file
+
+        Args:
+            guild_from: JSON data of the guild to export
+            session: aiohttp ClientSession
+            path: destination file, gzip compressed when it ends with .gz
+            headers: API headers (Authorization) when the session does not carry them
+        """
+        try:
+            self.rest = DiscordRestClient(session, base_url=self.api_url, cdn_url=self.cdn_url,
+                                          log=self._safe_log, headers=headers, events=self.events,
+                                          limits=self.limits)
+            guild_id = guild_from.get("id")
+            self._safe_log(f"Exporting snapshot of {guild_from.get('name')}...")
+
+            roles, channels, icon = await asyncio.gather(
+                self._fetch_guild_resource(guild_id, "roles"),
+                self._fetch_guild_resource(guild_id, "channels"),
+                self._fetch_icon(guild_from)
+            )
+            if roles is None or channels is None:
+                return False
+
+            write_snapshot(path, guild_from, roles, channels, icon=icon)
+            self._safe_log(f"Snapshot saved to {path}: {len(roles)} roles, {len(channels)} channels")
+            return True
+        except Exception as e:
+            self._safe_log(f"Error exporting snapshot: {str(e)}", "ERROR")
+            return False
+        finally:
+            self.events.flush()
+
+    async def plan(self, guild_from, guild_to, session, options=None, headers=None) -> Optional[ClonePlan]:
+        """Dry run of start_clone: what it would send and how long it would take
+
+        Both guilds (and a page of history per text channel when messages are
+        copied) are read, no mutating request is sent. Takes the same
+        arguments as start_clone.
+        """
         try:
+            options = options or {}
+            self.snapshot = read_snapshot(options["snapshot_path"]) if options.get("snapshot_path") else None
+            if self.snapshot is not None:
+                guild_from = self.snapshot.guild
+            self.rest = DiscordRestClient(session, base_url=self.api_url, cdn_url=self.cdn_url,
+                                          log=self._safe_log, headers=headers, events=self.events,
+                                          limits=self.limits)
+            source_id = guild_from.get("id")
+            dest_id = guild_to.get("id")
+            self._safe_log(f"Planning clone from {guild_from.get('name')} to {guild_to.get('name')}...")
+
+            timings = []
+
+            async def timed(coro):
+                started = time.perf_counter()
+                result = await coro
+                timings.append(time.perf_counter() - started)
+                return result
+
+            source_roles, source_channels, dest_roles, dest_channels = await asyncio.gather(
+                self._fetch_source_resource(source_id, "roles"),
+                self._fetch_source_resource(source_id, "channels"),
+                timed(self._fetch_guild_resource(dest_id, "roles")),
+                timed(self._fetch_guild_resource(dest_id, "channels"))
+            )
+            if None in (source_roles, source_channels, dest_roles, dest_channels):
+                return None
+
+            # Journal maps of earlier jobs, read only
+            journal = CloneJournal.for_job(source_id, dest_id, options.get("journal_dir"))
+            if journal.exists() and (options.get("sync_mode") or options.get("resume")):
+                journal.load()
+            known_maps = journal.maps
+
+            channel_types = self._channel_types(options)
+            channels_data = [c for c in source_channels if c.get("type") in channel_types]
+            roles_data = [r for r in source_roles if r.get("name") != "@everyone"]
+            clone_roles = options.get("clone_roles", True)
+
+            plan = ClonePlan(statistics.median(timings), options.get("message_channels") or MAX_ACTIVE_CHANNELS)
+            plan.add("fetch", "fetch", "GET /guilds/{id}/roles", dest_id, 2 if self.snapshot is not None else 4)
+            if options.get("clone_name_icon", False):
+                if self.snapshot is None and guild_from.get("icon"):
+                    plan.add("fetch", "create", "GET icon")
+                plan.add("edit_guild", "create", "PATCH /guilds/{id}", dest_id)
+
+            if options.get("sync_mode", False):
+                role_diff = diff_roles(source_roles, dest_roles, known_maps.get("roles_map"))
+                if clone_roles:
+                    plan.add("delete_roles", "cleanup", "DELETE /guilds/{id}/roles/{id}", dest_id, len(role_diff.delete))
+                    plan.add("create_roles", "create", "POST /guilds/{id}/roles", dest_id, len(role_diff.create))
+                    plan.add("update_roles", "create", "PATCH /guilds/{id}/roles/{id}", dest_id, len(role_diff.update))
+                    if role_diff.create or role_order_changed(source_roles, dest_roles, role_diff.matched):
+                        plan.add("role_positions", "layout", "PATCH /guilds/{id}/roles", dest_id)
+                if channel_types:
+                    known_channels = dict(known_maps.get("categories_map", {}))
+                    known_channels.update(known_maps.get("channels_map", {}))
+                    channel_diff = diff_channels(
+                        channels_data, [c for c in dest_channels if c.get("type") in channel_types],
+                        role_diff.matched, source_id, dest_id, known=known_channels,
+                        new_roles=[r.get("id") for r in role_diff.create] if clone_roles else (),
+                        compare_parent=4 in channel_types
+                    )
+                    for channel in channel_diff.delete:
+                        plan.add("delete_channels", "cleanup", "DELETE /channels/{id}", channel.get("id"))
+                    plan.add("create_channels", "create", "POST /guilds/{id}/channels", dest_id, len(channel_diff.create))
+                    for _, dest, _ in channel_diff.update:
+                        plan.add("update_channels", "create", "PATCH /channels/{id}", dest.get("id"))
+                    current = channel_positions(dest_channels)
+                    moved = any(current.get(channel_diff.matched.get(c.get("id"))) != c.get("position", 0)
+                                for c in channels_data)
+                    if moved:
+                        plan.add("channel_positions", "layout", "PATCH /guilds/{id}/channels", dest_id)
+            else:
+                # In a fresh guild the cleanup overlaps with the creations
+                cleanup = "create" if self._is_fresh_guild(dest_roles, dest_channels, channels_data) else "cleanup"
+                if clone_roles and roles_data:
+                    deletable = [r for r in dest_roles if r.get("name") != "@everyone" and not r.get("managed")]
+                    plan.add("delete_roles", cleanup, "DELETE /guilds/{id}/roles/{id}", dest_id, len(deletable))
+                    plan.add("create_roles", "create", "POST /guilds/{id}/roles", dest_id, len(roles_data))
+                    plan.add("role_positions", "layout", "PATCH /guilds/{id}/roles", dest_id)
+                if channel_types:
+                    for channel in dest_channels:
+                        plan.add("delete_channels", cleanup, "DELETE /channels/{id}", channel.get("id"))
+                if channels_data:
+                    plan.add("create_channels", "create", "POST /guilds/{id}/channels", dest_id, len(channels_data))
+                    plan.add("channel_positions", "layout", "PATCH /guilds/{id}/channels", dest_id)
+
+            limit = options.get("messages_limit") or 0
+            if options.get("clone_messages", True) and limit > 0:
+                cursors = known_maps.get("message_cursors", {})
+                text_channels = [c for c in channels_data if c.get("type") == 0]
+                requested = min(PAGE_SIZE, limit)
+                samples = await asyncio.gather(*(
+                    timed(self._sample_history(c.get("id"), requested, cursors.get(c.get("id"))))
+                    for c in text_channels
+                ))
+                plan.latency = statistics.median(timings)
+                for sample in samples:
+                    plan.add_channel_messages(*extrapolate(sample, requested, limit))
+
+            summary = plan.summary()
+            self._safe_log(f"Plan: {summary['requests']} requests, about {summary['seconds']:.0f}s "
+                           f"({summary['operations']})")
+            return plan
+        except Exception as e:
+            self._safe_log(f"Error planning clone: {str(e)}", "ERROR")
+            return None
+        finally:
+            self.events.flush()
+
+    async def _sample_history(self, channel_id, limit, cursor=None):
+        """Newest page of messages a copy would send (after the cursor on a sync)"""
+        params = {"limit": limit}
+        if cursor:
+            params["after"] = cursor
+        resp = await self.rest.get(f"/channels/{channel_id}/messages", params=params)
+        return resp.data if resp.status == 200 else []
+
+    def _channel_types(self, options):
+        """Channel types selected in the options"""
+        types = set()
+        if options.get("clone_categories", True):
+            types.add(4)
+        if options.get("clone_text_channels", True):
+            types.add(0)
+        if options.get("clone_voice_channels", True):
+            types.add(2)
+        return types
+
+    async def _fetch_icon(self, guild):
+        """Icon of a guild as PNG bytes, None if it has none or the download fails"""
+        if self.snapshot is not None:
+            return self.snapshot.icon
+        icon_hash = guild.get("icon")
+        if not icon_hash:
+            return None
+        icon_url = f"{self.rest.cdn_url}/icons/{guild.get('id')}/{icon_hash}.png"
+        resp = await self.rest.get(icon_url, raw=True)
+        if resp.status == 200:
+            return resp.data
+        return None
+
+    def _on_operation_error(self, operation, error):
+        self.errors += 1
+        self._safe_log(f"Operation {operation.key} failed: {str(error)}", "ERROR")
+
+    async def _edit_guild_rest(self, guild_to, guild_from, options=None):
+        try:
+            clone_name_icon = False
             if options is not None:
                 clone_name_icon = options.get("clone_name_icon", False)
 
@@ -300,449 +849,288 @@ class Clone:
             payload = {"name": guild_from.get("name")}
 
             # Copy the icon if present
-            icon_hash = guild_from.get("icon")
-            if icon_hash:
-                icon_url = f"https://cdn.discordapp.com/icons/{guild_from.get('id')}/{icon_hash}.png"
-                async with session.get(icon_url) as resp:
-                    if resp.status == 200:
-                        icon_bytes = await resp.read()
-                        payload["icon"] = f"data:image/png;base64,{base64.b64encode(icon_bytes).decode()}"
-
-            async with session.patch(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}", json=payload) as resp:
-                if resp.status in [200, 201]:
-                    self._safe_log("Guild name/icon updated successfully")
-                else:
-                    self._safe_log(f"Failed updating guild: {resp.status}", "ERROR")
+            icon = await self._fetch_icon(guild_from)
+            if icon:
+                payload["icon"] = f"data:image/png;base64,{base64.b64encode(icon).decode()}"
+
+            resp = await self.rest.patch(f"/guilds/{guild_to.get('id')}", json=payload)
+            if resp.status in [200, 201]:
+                self._safe_log("Guild name/icon updated successfully")
+            else:
+                self._safe_log(f"Failed updating guild: {resp.status}", "ERROR")
 
         except Exception as e:
             self._safe_log(f"Error updating guild: {str(e)}", "ERROR")
 
-    async def _delete_existing_roles_rest(self, guild_to, session):
-        """Delete all existing roles except @everyone using REST API"""
+    async def _delete_existing_roles_rest(self, guild_to, roles_data):
+        """Delete all existing roles except @everyone using REST API
+
+        Deletes are sent together: the REST client paces them on the route
+        bucket and retries the ones answered with 429.
+        """
         self._safe_log("Deleting existing roles...")
+        if roles_data is None:
+            # Fetch already failed and was reported
+            return
         try:
-            roles_url = f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/roles"
-            async with session.get(roles_url) as resp:
-                if resp.status == 200:
-                    roles_data = await resp.json()
-                    for role in roles_data:
-                        if role.get("name") == "@everyone":
-                            continue
-                        try:
-                            async with session.delete(f"{roles_url}/{role.get('id')}") as del_resp:
-                                if del_resp.status in (200, 204):
-                                    self._safe_log(f"Deleted role: {role.get('name')}")
-                                elif del_resp.status == 429:
-                                    rate_limit_data = await del_resp.json()
-                                    retry_after = rate_limit_data.get("retry_after", 5)
-                                    self._safe_log(f"Rate limit hit deleting role {role.get('name')}, waiting {retry_after}s", "ERROR")
-                                    await asyncio.sleep(retry_after)
-                                    continue
-                                else:
-                                    self.errors += 1
-                                    self._safe_log(f"Error deleting role {role.get('name')}: {del_resp.status}", "ERROR")
-                            await asyncio.sleep(1.0)
-                        except Exception as e:
-                            self.errors += 1
-                            self._safe_log(f"Exception deleting role {role.get('name')}: {str(e)}", "ERROR")
-                            await asyncio.sleep(2.0)
-                else:
-                    self.errors += 1
-                    self._safe_log(f"Failed to fetch roles for deletion: {resp.status}", "ERROR")
+            # Never delete what a previous run of this job already created
+            cloned_ids = set(self.roles_map.values())
+            await asyncio.gather(*(
+                self._delete_role_rest(guild_to, role) for role in roles_data
+                if role.get("name") != "@everyone" and not role.get("managed") and role.get("id") not in cloned_ids
+            ))
         except Exception as e:
             self.errors += 1
             self._safe_log(f"Critical error deleting roles: {str(e)}", "ERROR")
 
+    async def _delete_role_rest(self, guild_to, role):
+        """Delete one role of the destination guild"""
+        try:
+            del_resp = await self.rest.delete(f"/guilds/{guild_to.get('id')}/roles/{role.get('id')}")
+            if del_resp.status in (200, 204):
+                self._safe_log(f"Deleted role: {role.get('name')}")
+            else:
+                self.errors += 1
+                self._safe_log(f"Error deleting role {role.get('name')}: {del_resp.status}", "ERROR")
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Exception deleting role {role.get('name')}: {str(e)}", "ERROR")
+
+
+    async def _delete_existing_channels_rest(self, guild_to, channels):
+        """Delete all existing channels using REST API (properly by ID)
 
-    async def _delete_existing_channels_rest(self, guild_to, session):
-        """Delete all existing channels using REST API (properly by ID)"""
+        Every channel has its own delete bucket, so they are all sent at once;
+        a category deleted before its children is not a problem since the
+        children go too.
+        """
         self._safe_log("Deleting existing channels...")
+        if channels is None:
+            # Fetch already failed and was reported
+            return
 
         try:
-            # Fetch all channels from the target guild
-            async with session.get(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels") as resp:
-                if resp.status != 200:
-                    self.errors += 1
-                    self._safe_log(f"Failed to fetch channels for deletion: {resp.status}", "ERROR")
-                    return
-                
-                channels = await resp.json()
-
-            # Sort categories first, then other channels
-            # This ensures that text/voice channels under categories get deleted properly
-            categories = [c for c in channels if c.get("type") == 4]
-            other_channels = [c for c in channels if c.get("type") != 4]
-
-            all_channels_sorted = other_channels + categories  # Delete child channels first, then categories
-
-            for channel in all_channels_sorted:
-                channel_id = channel.get("id")
-                channel_name = channel.get("name", "Unknown")
-
-                try:
-                    async with session.delete(f"https://discord.com/api/v10/channels/{channel_id}") as del_resp:
-                        if del_resp.status in (200, 204):
-                            self._safe_log(f"Deleted channel: {channel_name}")
-                        elif del_resp.status == 429:  # Rate limit
-                            rate_limit_data = await del_resp.json()
-                            retry_after = rate_limit_data.get("retry_after", 5)
-                            self._safe_log(f"Rate limit hit deleting channel {channel_name}, waiting {retry_after}s", "ERROR")
-                            await asyncio.sleep(retry_after)
-                            # Retry deletion
-                            continue
-                        else:
-                            self.errors += 1
-                            self._safe_log(f"Error deleting channel {channel_name}: {del_resp.status}", "ERROR")
-                except Exception as e:
-                    self.errors += 1
-                    self._safe_log(f"Exception deleting channel {channel_name}: {str(e)}", "ERROR")
-                
-                # Small delay to avoid hitting rate limits
-                await asyncio.sleep(1.0)
-        
+            # Never delete what a previous run of this job already created
+            cloned_ids = set(self.categories_map.values()) | set(self.channels_map.values())
+            await asyncio.gather(*(
+                self._delete_channel_rest(channel) for channel in channels if channel.get("id") not in cloned_ids
+            ))
         except Exception as e:
             self.errors += 1
             self._safe_log(f"Critical error deleting channels: {str(e)}", "ERROR")
 
-    def _safe_log(self, message: str, level: str = "INFO"):
-        """Thread-safe logging wrapper"""
+    async def _delete_channel_rest(self, channel):
+        """Delete one channel or category of the destination guild"""
+        channel_name = channel.get("name", "Unknown")
         try:
-            if level == "ERROR":
-                self.logger.error(message)
+            del_resp = await self.rest.delete(f"/channels/{channel.get('id')}")
+            if del_resp.status in (200, 204):
+                self._safe_log(f"Deleted channel: {channel_name}")
             else:
-                self.logger.add(message)
-        except Exception:
-            pass
-
-    async def _create_roles_rest(self, guild_to, roles_data, session):
-        """Create new roles using REST API (POST, aggiorna mappa ID)"""
-        self._safe_log("Creating new roles...")
-        for role in roles_data:
-            try:
-                payload = {
-                    "name": role.get('name'),
-                    "permissions": role.get('permissions'),
-                    "color": role.get('color'),
-                    "hoist": role.get('hoist'),
-                    "mentionable": role.get('mentionable')
-                }
-                async with session.post(f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/roles", json=payload) as resp:
-                    if resp.status == 200 or resp.status == 201:
-                        created = await resp.json()
-                        self.roles_map[role.get('id')] = created.get('id')
-                        self.roles_created += 1
-                        self._safe_log(f"Role created ({self.roles_created}/{self.total_roles}): {role.get('name')}")
-                    elif resp.status == 429:  # Rate limit
-                        # Estraiamo le informazioni sul rate limit
-                        rate_limit_data = await resp.json()
-                        retry_after = rate_limit_data.get('retry_after', 5)  # Default 5 secondi
-                        self._safe_log(f"Rate limit hit when creating role {role.get('name')}. Waiting {retry_after} seconds...", "ERROR")
-                        await asyncio.sleep(retry_after)
-                        # Riprova la creazione del ruolo (decrementiamo l'indice del loop)
-                        continue
-                    else:
-                        self.errors += 1
-                        self._safe_log(f"Error creating role {role.get('name')}: {resp.status}", "ERROR")
-                
-                # Aggiungiamo un piccolo delay per evitare rate limits
-                await asyncio.sleep(0.5)
-            except Exception as e:
                 self.errors += 1
-                self._safe_log(f"Error creating role {role.get('name')}: {str(e)}", "ERROR")
-                # In caso di errore, aspettiamo un po' di più
-                await asyncio.sleep(1.0)
-                
-    async def _create_categories_and_channels_rest(self, guild_to, categories_data, text_channels_data, voice_channels_data, session):
-        """Create categories and channels preserving their layout and parent relationships"""
-        
-        # ---------------- CREATE CATEGORIES ----------------
-        self._safe_log("Creating categories...")
-        categories_data = sorted(categories_data, key=lambda c: c.get("position", 0))
-        
-        for category in categories_data:
-            try:
-                overwrites_to = []
-                for role_id, perms in category.get("overwrites", {}).items():
-                    overwrites_to.append({
-                        "id": str(role_id),
-                        "type": 0,  # role overwrite
-                        "allow": perms.get("allow", "0"),
-                        "deny": perms.get("deny", "0")
-                    })
-
-                payload = {
-                    "name": category.get("name"),
-                    "type": 4,  # 4 = category
-                    "permission_overwrites": overwrites_to,
-                    "position": category.get("position", 0)
-                }
+                self._safe_log(f"Error deleting channel {channel_name}: {del_resp.status}", "ERROR")
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Exception deleting channel {channel_name}: {str(e)}", "ERROR")
 
-                async with session.post(
-                    f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels",
-                    json=payload
-                ) as response:
-                    if response.status in (200, 201):
-                        created = await response.json()
-                        self.categories_map[category.get("id")] = created.get("id")
-                        self._safe_log(f"Category created: {category.get('name')}")
-                    elif response.status == 429:
-                        rate_limit_data = await response.json()
-                        retry_after = rate_limit_data.get("retry_after", 5)
-                        self._safe_log(f"Rate limit hit creating category {category.get('name')}, waiting {retry_after}s", "ERROR")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    else:
-                        self.errors += 1
-                        self._safe_log(f"Error creating category {category.get('name')}: {response.status}", "ERROR")
-
-                await asyncio.sleep(1.5)
+    def _safe_log(self, message: str, level: str = "INFO"):
+        """Log a message as an event: printing happens later, in batches"""
+        self.events.emit(LogEvent(message, level))
 
-            except Exception as e:
+    def _print_events(self, batch):
+        """Bus listener writing the non-debug events to the console/debug callback"""
+        for event in batch:
+            if event.level != "DEBUG":
+                self.logger.log(event.message(), event.level)
+
+    async def _create_role_rest(self, guild_to, role):
+        """Create one role using REST API (POST, aggiorna mappa ID)"""
+        try:
+            payload = self._role_payload(role)
+            resp = await self.rest.post(f"/guilds/{guild_to.get('id')}/roles", json=payload)
+            if resp.status == 200 or resp.status == 201:
+                created = resp.data
+                self.roles_map[role.get('id')] = created.get('id')
+                if self.journal:
+                    self.journal.record(f"role:{role.get('id')}", "roles_map", role.get('id'), created.get('id'))
+                self.roles_created += 1
+                self._safe_log(f"Role created ({self.roles_created}/{self.total_roles}): {role.get('name')}")
+            else:
+                self.errors += 1
+                self._safe_log(f"Error creating role {role.get('name')}: {resp.status}", "ERROR")
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Error creating role {role.get('name')}: {str(e)}", "ERROR")
+
+    async def _update_role_rest(self, guild_to, role, dest_role, fields):
+        """PATCH the changed fields of an existing destination role"""
+        try:
+            payload = self._role_payload(role)
+            payload = {field: payload.get(field) for field in fields}
+            resp = await self.rest.patch(f"/guilds/{guild_to.get('id')}/roles/{dest_role.get('id')}", json=payload)
+            if resp.status == 200:
+                self._safe_log(f"Role updated ({', '.join(fields)}): {role.get('name')}")
+            else:
                 self.errors += 1
-                self._safe_log(f"Exception creating category {category.get('name')}: {str(e)}", "ERROR")
-                await asyncio.sleep(3.0)
+                self._safe_log(f"Error updating role {role.get('name')}: {resp.status}", "ERROR")
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Error updating role {role.get('name')}: {str(e)}", "ERROR")
 
-        # ---------------- CREATE TEXT CHANNELS ----------------
-        self._safe_log("Creating text channels...")
-        text_channels_data = sorted(text_channels_data, key=lambda c: c.get("position", 0))
-        
-        for channel in text_channels_data:
-            try:
-                payload = {
-                    "name": channel.get("name"),
-                    "type": 0,  # text
-                    "topic": channel.get("topic"),
-                    "position": channel.get("position", 0),
-                    "nsfw": channel.get("nsfw", False),
-                    "rate_limit_per_user": channel.get("slowmode_delay", 0)
-                }
+    async def _reorder_roles_rest(self, guild_to, roles_data):
+        """Apply the source role hierarchy with a single bulk PATCH /guilds/{id}/roles"""
+        positions = []
+        for rank, role in enumerate(role_hierarchy(roles_data), start=1):
+            dest_id = self.roles_map.get(role.get("id"))
+            if dest_id:
+                positions.append({"id": str(dest_id), "position": rank})
+        if not positions:
+            return
+        try:
+            resp = await self.rest.patch(f"/guilds/{guild_to.get('id')}/roles", json=positions)
+            if resp.status == 200:
+                self._safe_log(f"Role hierarchy applied ({len(positions)} roles)")
+            else:
+                self.errors += 1
+                self._safe_log(f"Error ordering roles: {resp.status}", "ERROR")
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Error ordering roles: {str(e)}", "ERROR")
 
-                # Map parent category
-                old_cat_id = channel.get("category_id") or channel.get("parent_id")
-                if old_cat_id and old_cat_id in self.categories_map:
-                    payload["parent_id"] = str(self.categories_map[old_cat_id])
-
-                # Permission overwrites
-                overwrites_to = []
-                for role_id, perms in channel.get("overwrites", {}).items():
-                    overwrites_to.append({
-                        "id": str(role_id),
-                        "type": 0,
-                        "allow": perms.get("allow", "0"),
-                        "deny": perms.get("deny", "0")
-                    })
-                if overwrites_to:
-                    payload["permission_overwrites"] = overwrites_to
-
-                self._safe_log(f"Creating text channel {channel.get('name')} under category {payload.get('parent_id')}")
-                
-                async with session.post(
-                    f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels",
-                    json=payload
-                ) as resp:
-                    if resp.status in (200, 201):
-                        created = await resp.json()
-                        self.channels_map[channel.get("id")] = created.get("id")
-                        self._safe_log(f"Text channel created: {channel.get('name')}")
-                    elif resp.status == 429:
-                        rate_limit_data = await resp.json()
-                        retry_after = rate_limit_data.get("retry_after", 5)
-                        self._safe_log(f"Rate limit hit creating text channel {channel.get('name')}, waiting {retry_after}s", "ERROR")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    else:
-                        self.errors += 1
-                        self._safe_log(f"Error creating text channel {channel.get('name')}: {resp.status}", "ERROR")
-
-                await asyncio.sleep(1.5)
+    async def _reorder_channels_rest(self, guild_to, channels_data, current=None):
+        """Apply the source channel layout with a single bulk PATCH /guilds/{id}/channels
 
-            except Exception as e:
+        :param current: destination positions by ID; channels already in place are left out
+        """
+        positions = []
+        for channel in channels_data:
+            channel_map = self.categories_map if channel.get("type") == 4 else self.channels_map
+            dest_id = channel_map.get(channel.get("id"))
+            if not dest_id:
+                continue
+            position = channel.get("position", 0)
+            if current is not None and current.get(dest_id) == position:
+                continue
+            positions.append({"id": str(dest_id), "position": position})
+        if not positions:
+            return
+        try:
+            resp = await self.rest.patch(f"/guilds/{guild_to.get('id')}/channels", json=positions)
+            if resp.status in (200, 204):
+                self._safe_log(f"Channel layout applied ({len(positions)} channels)")
+            else:
                 self.errors += 1
-                self._safe_log(f"Exception creating text channel {channel.get('name')}: {str(e)}", "ERROR")
-                await asyncio.sleep(3.0)
+                self._safe_log(f"Error ordering channels: {resp.status}", "ERROR")
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Error ordering channels: {str(e)}", "ERROR")
 
-        # ---------------- CREATE VOICE CHANNELS ----------------
-        self._safe_log("Creating voice channels...")
-        voice_channels_data = sorted(voice_channels_data, key=lambda c: c.get("position", 0))
-        
-        for channel in voice_channels_data:
-            try:
-                payload = {
-                    "name": channel.get("name"),
-                    "type": 2,  # voice
-                    "position": channel.get("position", 0),
-                    "bitrate": channel.get("bitrate", 64000),
-                    "user_limit": channel.get("user_limit", 0)
-                }
+    def _role_payload(self, role):
+        return {
+            "name": role.get('name'),
+            "permissions": role.get('permissions'),
+            "color": role.get('color'),
+            "hoist": role.get('hoist'),
+            "mentionable": role.get('mentionable')
+        }
 
-                old_cat_id = channel.get("category_id") or channel.get("parent_id")
-                if old_cat_id and old_cat_id in self.categories_map:
-                    payload["parent_id"] = str(self.categories_map[old_cat_id])
-
-                overwrites_to = []
-                for role_id, perms in channel.get("overwrites", {}).items():
-                    overwrites_to.append({
-                        "id": str(role_id),
-                        "type": 0,
-                        "allow": perms.get("allow", "0"),
-                        "deny": perms.get("deny", "0")
-                    })
-                if overwrites_to:
-                    payload["permission_overwrites"] = overwrites_to
-
-                self._safe_log(f"Creating voice channel {channel.get('name')} under category {payload.get('parent_id')}")
-                
-                async with session.post(
-                    f"https://discord.com/api/v10/guilds/{guild_to.get('id')}/channels",
-                    json=payload
-                ) as resp:
-                    if resp.status in (200, 201):
-                        created = await resp.json()
-                        self.channels_map[channel.get("id")] = created.get("id")
-                        self._safe_log(f"Voice channel created: {channel.get('name')}")
-                    elif resp.status == 429:
-                        rate_limit_data = await resp.json()
-                        retry_after = rate_limit_data.get("retry_after", 5)
-                        self._safe_log(f"Rate limit hit creating voice channel {channel.get('name')}, waiting {retry_after}s", "ERROR")
-                        await asyncio.sleep(retry_after)
-                        continue
-                    else:
-                        self.errors += 1
-                        self._safe_log(f"Error creating voice channel {channel.get('name')}: {resp.status}", "ERROR")
-
-                await asyncio.sleep(1.5)
+    def _map_overwrites(self, overwrites, guild_from, guild_to):
+        """Translate source permission overwrites to destination role IDs"""
+        return map_overwrites(overwrites, self.roles_map, guild_from.get("id"), guild_to.get("id"))
 
-            except Exception as e:
-                self.errors += 1
-                self._safe_log(f"Exception creating voice channel {channel.get('name')}: {str(e)}", "ERROR")
-                await asyncio.sleep(3.0)
+    def _channel_payload(self, guild_from, guild_to, channel):
+        """Destination payload of a channel with parent and overwrites mapped to destination IDs"""
+        channel_type = channel.get("type")
+        # No position: the final layout is applied at the end with one bulk PATCH
+        payload = {
+            "name": channel.get("name"),
+            "type": channel_type
+        }
+        if channel_type == 0:
+            payload.update({
+                "topic": channel.get("topic"),
+                "nsfw": channel.get("nsfw", False),
+                "rate_limit_per_user": channel.get("rate_limit_per_user", 0)
+            })
+        elif channel_type == 2:
+            payload.update({
+                "bitrate": channel.get("bitrate", 64000),
+                "user_limit": channel.get("user_limit", 0)
+            })
 
+        # Map parent category
+        old_cat_id = channel.get("parent_id")
+        if channel_type != 4 and old_cat_id and old_cat_id in self.categories_map:
+            payload["parent_id"] = str(self.categories_map[old_cat_id])
 
-           
-    async def _copy_messages(self, guild_from: discord.Guild, guild_to: discord.Guild, message_limit=100):
-        """Copy messages from source server channels with a limit"""
-        self._safe_log("Starting message copy...")
-        
-        # Conteggio totale dei messaggi da copiare (approssimativo)
-        # Per ogni canale di testo, utilizziamo il limite specificato
-        self.total_messages = len(guild_from.text_channels) * message_limit
-        
-        copy_tasks = []
-        for channel_from in guild_from.text_channels:
-            channel_to = discord.utils.get(guild_to.text_channels, name=channel_from.name)
-            if channel_to:
-                copy_tasks.append(self._copy_channel_messages(channel_from, channel_to, message_limit))
-        
-        # Execute message copying concurrently in batches, using smaller batches
-        batch_size = 2  # Ridotto da 3 a 2 per evitare rate limit
-        for i in range(0, len(copy_tasks), batch_size):
-            batch = copy_tasks[i:i + batch_size]
-            await asyncio.gather(*batch, return_exceptions=True)
-            
-            # Aspettiamo un po' tra i batch per evitare rate limit
-            await asyncio.sleep(1.0)
+        overwrites_to = self._map_overwrites(channel.get("permission_overwrites"), guild_from, guild_to)
+        if overwrites_to:
+            payload["permission_overwrites"] = overwrites_to
+        return payload
 
-    async def _copy_channel_messages(self, channel_from, channel_to, message_limit=100):
-        """Helper method for copying messages from one channel with a limit"""
+    async def _update_channel_rest(self, guild_to, guild_from, channel, dest_channel, fields):
+        """PATCH the changed fields (name, settings, parent, overwrites) of an existing channel"""
         try:
-            # Iniziamo con un piccolo delay tra i messaggi per evitare rate limit
-            rate_limit_delay = 0.7
-            consecutive_errors = 0
-            message_count = 0
-            
-            # Recuperiamo i messaggi in ordine cronologico inverso (dal più recente)
-            messages = []
-            async for message in channel_from.history(limit=message_limit):
-                messages.append(message)
-            
-            # Invertiamo per inviarli in ordine cronologico (dal più vecchio)
-            messages.reverse()
-            
-            for message in messages:
-                # Se abbiamo troppi errori consecutivi, aumentiamo molto il delay
-                if consecutive_errors >= 3:
-                    rate_limit_delay = min(5.0, rate_limit_delay * 1.5)
-                    consecutive_errors = 0
-                
-                try:
-                    # Prepariamo il contenuto del messaggio
-                    author_name = message.author.display_name
-                    timestamp = message.created_at.strftime("%d/%m/%Y %H:%M")
-                    
-                    # Gestione degli embed e del contenuto
-                    content = f"**{author_name}** *{timestamp}*"
-                    if message.content:
-                        content += f"\n{message.content}"
-                    
-                    # Formattiamo il contenuto
-                    if len(content) > 2000:
-                        # Se il messaggio è troppo lungo, lo tronchiamo
-                        content = content[:1997] + "..."
-                    
-                    # Inviamo il messaggio
-                    if content and content != f"**{author_name}**:":
-                        await channel_to.send(content=content)
-                        self.messages_copied += 1
-                        message_count += 1
-                        
-                    # Gestione degli allegati
-                    if message.attachments:
-                        files = []
-                        
-                        # Utilizziamo una sessione sicura per scaricare gli allegati
-                        connector = aiohttp.TCPConnector(force_close=True)
-                        async with aiohttp.ClientSession(connector=connector) as session:
-                            for attachment in message.attachments:
-                                try:
-                                    # Scarichiamo direttamente dall'URL dell'allegato
-                                    async with session.get(attachment.url) as response:
-                                        if response.status == 200:
-                                            file_data = await response.read()
-                                            files.append(discord.File(io.BytesIO(file_data), filename=attachment.filename))
-                                except Exception:
-                                    continue
-                        
-                        # Se abbiamo scaricato file, li inviamo
-                        if files:
-                            # Inviamo il messaggio con gli allegati, includendo il nome dell'autore se non già inviato
-                            if not content or content == f"**{author_name}**:":
-                                await channel_to.send(content=f"**{author_name}** *{timestamp}*", files=files)
-                            else:
-                                await channel_to.send(files=files)
-                            
-                            self.messages_copied += 1
-                            message_count += 1
-                    
-                    # Aspettiamo tra un messaggio e l'altro per evitare rate limit
-                    await asyncio.sleep(rate_limit_delay)
-                    
-                    # Se tutto va bene, riduciamo gradualmente il delay
-                    rate_limit_delay = max(0.5, rate_limit_delay * 0.95)
-                    # Reset del contatore errori in caso di successo
-                    consecutive_errors = 0
-                except discord.errors.HTTPException as e:
-                    if e.status == 429:  # Rate limit
-                        consecutive_errors += 1
-                        self._safe_log(f"Rate limit reached, waiting longer ({round(rate_limit_delay, 1)}s)")
-                        await asyncio.sleep(rate_limit_delay)
-                    else:
-                        consecutive_errors += 1
-                        self._safe_log(f"HTTP error while sending message: {e}")
-                        await asyncio.sleep(rate_limit_delay)
-                except Exception as e:
-                    consecutive_errors += 1
-                    self._safe_log(f"Error copying message: {str(e)}")
-                    await asyncio.sleep(rate_limit_delay)
-            
-            self._safe_log(f"Copied {message_count} messages to {channel_to.name}")
-            return message_count
+            payload = self._channel_payload(guild_from, guild_to, channel)
+            patch = {field: payload.get(field) for field in fields}
+            if "permission_overwrites" in patch:
+                patch["permission_overwrites"] = payload.get("permission_overwrites", [])
+            # parent_id None moves the channel out of its category
+            resp = await self.rest.patch(f"/channels/{dest_channel.get('id')}", json=patch)
+            if resp.status == 200:
+                self._safe_log(f"Channel updated ({', '.join(fields)}): {channel.get('name')}")
+            else:
+                self.errors += 1
+                self._safe_log(f"Error updating channel {channel.get('name')}: {resp.status}", "ERROR")
         except Exception as e:
-            self._safe_log(f"Error during message copying: {str(e)}")
-            return 0
+            self.errors += 1
+            self._safe_log(f"Error updating channel {channel.get('name')}: {str(e)}", "ERROR")
+
+    async def _create_channel_rest(self, guild_to, guild_from, channel):
+        """Create one category, text or voice channel preserving parent and overwrites"""
+        channel_type = channel.get("type")
+        kind = {4: "category", 0: "text channel", 2: "voice channel"}.get(channel_type, "channel")
+        try:
+            payload = self._channel_payload(guild_from, guild_to, channel)
 
+            if channel_type != 4:
+                self._safe_log(f"Creating {kind} {channel.get('name')} under category {payload.get('parent_id')}")
+
+            resp = await self.rest.post(f"/guilds/{guild_to.get('id')}/channels", json=payload)
+            if resp.status in (200, 201):
+                created = resp.data
+                map_name = "categories_map" if channel_type == 4 else "channels_map"
+                getattr(self, map_name)[channel.get("id")] = created.get("id")
+                if self.journal:
+                    self.journal.record(f"channel:{channel.get('id')}", map_name, channel.get("id"), created.get("id"))
+                self.channels_created += 1
+                self._safe_log(f"{kind.capitalize()} created: {channel.get('name')}")
+            else:
+                self.errors += 1
+                self._safe_log(f"Error creating {kind} {channel.get('name')}: {resp.status}", "ERROR")
+
+        except Exception as e:
+            self.errors += 1
+            self._safe_log(f"Exception creating {kind} {channel.get('name')}: {str(e)}", "ERROR")
+
+
+           
     def get_stats(self) -> dict:
-        """Return cloning statistics"""
-        # Update elapsed time if started
-        if self.stats["start_time"]:
-            self.stats["elapsed_time"] = time.time() - self.stats["start_time"]
-        return self.stats
\ No newline at end of file
+        """Return cloning statistics, in the keys GuildInput.update_stats reads"""
+        self.progress.sample()
+        return {
+            "roles_created": self.roles_created,
+            "total_roles": self.total_roles,
+            "channels_created": self.channels_created,
+            "total_channels": self.total_channels,
+            "messages_copied": self.messages_copied,
+            "errors": self.errors,
+            "elapsed_time": time.time() - self.start_time if self.start_time else 0,
+            "completed_operations": self.progress.completed,
+            "total_operations": self.progress.total,
+            "progress": self.progress.fraction,
+            "rate": self.progress.rate or 0.0,
+            "eta": self.progress.eta,
+            "idle": self.progress.idle,
+            **self.metrics.summary(),
+        }
\ No newline at end of file
@@ -0,0 +1,121 @@
+import base64
+import gzip
+import json
+import os
+import time
+from typing import Iterator, List, Optional, Tuple
+
+SNAPSHOT_FORMAT = "guild-snapshot"
+SNAPSHOT_VERSION = 1
+
+# Only what a clone reads is kept, everything else Discord returns is dropped
+GUILD_FIELDS = ("id", "name", "icon")
+ROLE_FIELDS = ("id", "name", "permissions", "color", "hoist", "mentionable", "position", "managed")
+CHANNEL_FIELDS = ("id", "type", "name", "position", "parent_id", "topic", "nsfw",
+                  "rate_limit_per_user", "bitrate", "user_limit", "permission_overwrites")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class GuildSnapshot:
+    """Structure of a guild as stored in a snapshot file"""
+
+    def __init__(self, guild: dict, roles: List[dict], channels: List[dict], icon: Optional[bytes] = None,
+                 created: Optional[float] = None):
+        self.guild = guild
+        self.roles = roles
+        self.channels = channels
+        self.icon = icon  # raw icon image, so a clone never needs the source CDN
+        self.created = created
+
+
+def _compact(entity: dict, fields) -> dict:
+    return {field: entity[field] for field in fields if entity.get(field) is not None}
+
+
+def write_snapshot(path: str, guild: dict, roles: List[dict], channels: List[dict],
+                   icon: Optional[bytes] = None, compress: Optional[bool] = None):
+    """Write a snapshot file
+
+    The file is JSON lines: a header with the format version and the guild,
+    then one line per role and per channel. It is written to a temporary file
+    first so an interrupted export never leaves a truncated snapshot behind.
+
+    :param compress: gzip the file, by default when the path ends with .gz
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    header = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created": time.time(),
+        "guild": _compact(guild, GUILD_FIELDS),
+        "roles": len(roles),
+        "channels": len(channels),
+    }
+    if icon:
+        header["icon_data"] = base64.b64encode(icon).decode()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    opener = gzip.open if compress else open
+    with opener(tmp_path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps(header, separators=(",", ":")) + "\n")
+        for role in roles:
+            f.write(json.dumps({"kind": "role", **_compact(role, ROLE_FIELDS)}, separators=(",", ":")) + "\n")
+        for channel in channels:
+            f.write(json.dumps({"kind": "channel", **_compact(channel, CHANNEL_FIELDS)}, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _open(path: str):
+    with open(path, "rb") as f:
+        compressed = f.read(2) == _GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_snapshot(path: str) -> Iterator[Tuple[str, dict]]:
+    """Stream the records of a snapshot as (kind, record) pairs
+
+    The first pair is ("header", header). Compression is detected from the
+    file content, not from its name.
+
+    :raises ValueError: if the file is not a snapshot or was written by a newer version
+    """
+    with _open(path) as f:
+        first = f.readline()
+        try:
+            header = json.loads(first)
+        except ValueError:
+            raise ValueError(f"{path} is not a guild snapshot")
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a guild snapshot")
+        if header.get("version", 0) > SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {header.get('version')} is not supported (max {SNAPSHOT_VERSION})")
+        yield "header", header
+
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield record.pop("kind", None), record
+
+
+def read_snapshot(path: str) -> GuildSnapshot:
+    """Load a whole snapshot file"""
+    header = {}
+    roles = []
+    channels = []
+    for kind, record in iter_snapshot(path):
+        if kind == "header":
+            header = record
+        elif kind == "role":
+            roles.append(record)
+        elif kind == "channel":
+            channels.append(record)
+
+    icon = base64.b64decode(header["icon_data"]) if header.get("icon_data") else None
+    return GuildSnapshot(header.get("guild", {}), roles, channels, icon=icon, created=header.get("created"))
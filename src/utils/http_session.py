@@ -0,0 +1,146 @@
+import asyncio
+import concurrent.futures
+import ssl
+import threading
+from typing import Any, Callable, Coroutine, Optional, TypeVar
+
+import aiohttp
+import certifi
+
+T = TypeVar("T")
+
+_ssl_context: Optional[ssl.SSLContext] = None
+_ssl_lock = threading.Lock()
+
+
+def get_ssl_context() -> ssl.SSLContext:
+    """Default SSL context with certifi's CA bundle, built once per process"""
+    global _ssl_context
+    if _ssl_context is None:
+        with _ssl_lock:
+            if _ssl_context is None:
+                _ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return _ssl_context
+
+
+def create_connector() -> aiohttp.TCPConnector:
+    """Pooled connector: keep-alive connections, cached DNS, shared SSL context"""
+    return aiohttp.TCPConnector(
+        ssl=get_ssl_context(),
+        limit=100,
+        limit_per_host=50,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+    )
+
+
+def auth_headers(token: str) -> dict:
+    """Per-request headers for the Discord API (the shared session carries no token)"""
+    return {
+        "Authorization": token,
+        "Content-Type": "application/json"
+    }
+
+
+class HttpSessionService:
+    """Application-wide aiohttp session living on its own background event loop
+
+    An aiohttp session is bound to the loop that created it, so the service
+    owns a long-lived loop thread: every component runs its network
+    coroutines there through run()/submit() and reuses the same connection
+    pool instead of paying a TCP and TLS handshake on every action.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._loop = None
+                    instance._thread = None
+                    instance._session = None
+                    instance._start_lock = threading.Lock()
+                    cls._instance = instance
+        return cls._instance
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The service loop, started on first use"""
+        if self._loop is None or self._loop.is_closed():
+            with self._start_lock:
+                if self._loop is None or self._loop.is_closed():
+                    ready = threading.Event()
+
+                    def run_loop():
+                        self._loop = asyncio.new_event_loop()
+                        asyncio.set_event_loop(self._loop)
+                        ready.set()
+                        self._loop.run_forever()
+
+                    self._thread = threading.Thread(target=run_loop, name="http-session-loop", daemon=True)
+                    self._thread.start()
+                    ready.wait()
+        return self._loop
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Shared session; must be awaited from a coroutine running on the service loop"""
+        if asyncio.get_running_loop() is not self._loop:
+            raise RuntimeError("The shared HTTP session is only usable on the service loop (use run/submit)")
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=create_connector(),
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=60)
+            )
+        return self._session
+
+    def submit(self, coro: Coroutine[Any, Any, T],
+               callback: Optional[Callable[["concurrent.futures.Future[T]"], None]] = None
+               ) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the service loop; cancelling the future cancels it
+
+        :param callback: called with the future once it is done, on the loop thread
+                         (use src.interface.utils.tk_async.run_async to get back to Tk)
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def call_soon(self, callback: Callable[..., Any], *args):
+        """Run a plain callable on the service loop (objects living there are not thread-safe)"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the service loop and wait for its result (not from the loop itself)"""
+        loop = self.loop
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("run() would deadlock on the service loop, await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def close(self):
+        """Close the session and stop the loop (application shutdown)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        async def shutdown():
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(5)
+        self._loop = None
+        self._thread = None
+
+
+def get_http_service() -> HttpSessionService:
+    return HttpSessionService()
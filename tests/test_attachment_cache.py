@@ -0,0 +1,50 @@
+import asyncio
+import tempfile
+import unittest
+
+from src.operation_file.attachment_cache import AttachmentCache
+
+
+class SlowCache(AttachmentCache):
+    """Cache whose downloads take a while and never touch the network"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.started = 0
+
+    async def _download(self, session, url):
+        self.started += 1
+        await asyncio.sleep(0.1)
+        return "ab" + "0" * 62
+
+
+class AttachmentCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_waiters_download_again_when_the_owner_is_cancelled(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SlowCache(directory)
+            attachment = {"id": "1", "url": "http://cdn/1"}
+            owner = asyncio.create_task(cache.fetch(None, attachment))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.create_task(cache.fetch(None, attachment))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+
+            path = await asyncio.wait_for(waiter, 2)
+            self.assertEqual(path, cache.path_for("ab" + "0" * 62))
+            self.assertEqual(cache.started, 2)
+            self.assertEqual(cache._pending, {})
+
+    async def test_index_is_saved_while_downloading(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SlowCache(directory)
+            cache._saved_at -= 60  # the last save is older than the interval
+            await cache.fetch(None, {"id": "1", "url": "http://cdn/1"})
+
+            reloaded = AttachmentCache(directory)
+            reloaded.load()
+            self.assertIn("1", reloaded.index)
+
+
+if __name__ == "__main__":
+    unittest.main()
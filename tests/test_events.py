@@ -0,0 +1,40 @@
+import unittest
+
+from src.operation_file.events import EventBus, LogEvent
+
+
+class EventBusTest(unittest.TestCase):
+
+    def test_consumers_read_in_order_from_their_own_position(self):
+        bus = EventBus()
+        first = bus.consumer()
+        bus.log("one")
+        second = bus.consumer()
+        bus.log("two")
+
+        self.assertEqual([e.message() for e in first.poll()], ["one", "two"])
+        self.assertEqual([e.message() for e in second.poll()], ["two"])
+        self.assertEqual(first.poll(), [])
+
+    def test_slow_consumer_counts_what_fell_out_of_the_buffer(self):
+        bus = EventBus(capacity=3)
+        consumer = bus.consumer()
+        for index in range(5):
+            bus.emit(LogEvent(str(index)))
+
+        self.assertEqual([e.message() for e in consumer.poll()], ["2", "3", "4"])
+        self.assertEqual(consumer.dropped, 2)
+
+    def test_listeners_get_batches(self):
+        bus = EventBus()
+        batches = []
+        bus.listen(batches.append)  # no running loop: delivered on emit
+        bus.log("one")
+        bus.log("two", "ERROR")
+
+        self.assertEqual([[e.message() for e in batch] for batch in batches], [["one"], ["two"]])
+        self.assertEqual(batches[1][0].level, "ERROR")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+
+from src.operation_file.guild_cache import GuildCache
+
+
+class GuildCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    def fetcher(self, value, delay=0.05):
+        self.calls = 0
+
+        async def fetch():
+            self.calls += 1
+            await asyncio.sleep(delay)
+            return value
+        return fetch
+
+    async def test_concurrent_reads_share_one_fetch(self):
+        cache = GuildCache()
+        fetch = self.fetcher([{"id": "1"}])
+        results = await asyncio.gather(*(cache.get("token", 5, "channels", fetch) for _ in range(5)))
+
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result == [{"id": "1"}] for result in results))
+        self.assertEqual((cache.hits, cache.misses), (4, 1))
+
+    async def test_values_expire_after_the_ttl(self):
+        cache = GuildCache(ttl=0.05)
+        fetch = self.fetcher({"id": "5"}, delay=0)
+        await cache.get("token", 5, "", fetch)
+        await cache.get("token", 5, "", fetch)
+        self.assertEqual(self.calls, 1)
+
+        await asyncio.sleep(0.06)
+        await cache.get("token", 5, "", fetch)
+        self.assertEqual(self.calls, 2)
+
+    async def test_answer_fetched_across_an_invalidation_is_not_stored(self):
+        cache = GuildCache()
+        read = asyncio.create_task(cache.get("token", 5, "roles", self.fetcher(["stale"])))
+        await asyncio.sleep(0.01)
+        cache.invalidate(5)
+
+        self.assertEqual(await read, ["stale"])
+        self.assertIsNone(cache.peek("token", 5, "roles"))
+
+    async def test_waiters_fetch_again_when_the_owner_is_cancelled(self):
+        cache = GuildCache()
+        fetch = self.fetcher(["fresh"])
+        owner = asyncio.create_task(cache.get("token", 5, "roles", fetch))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.get("token", 5, "roles", fetch))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+
+        self.assertEqual(await asyncio.wait_for(waiter, 1), ["fresh"])
+        self.assertEqual(self.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
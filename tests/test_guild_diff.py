@@ -0,0 +1,53 @@
+import unittest
+
+from src.operation_file.guild_diff import diff_channels, diff_roles
+
+
+class DiffRolesTest(unittest.TestCase):
+
+    def test_roles_are_paired_by_known_id_then_by_name(self):
+        source = [
+            {"id": "1", "name": "@everyone"},
+            {"id": "10", "name": "Renamed", "permissions": "8"},
+            {"id": "11", "name": "Mods", "permissions": "8", "color": 5},
+            {"id": "12", "name": "New"},
+        ]
+        dest = [
+            {"id": "2", "name": "@everyone"},
+            {"id": "20", "name": "Old name", "permissions": "8"},
+            {"id": "21", "name": "Mods", "permissions": 8, "color": 5},
+            {"id": "22", "name": "Extra"},
+            {"id": "23", "name": "Bot", "managed": True},
+        ]
+        diff = diff_roles(source, dest, known={"10": "20"})
+
+        self.assertEqual(diff.matched, {"10": "20", "11": "21"})
+        self.assertEqual([(s["id"], changed) for s, _, changed in diff.update], [("10", ["name"])])
+        self.assertEqual([r["id"] for r in diff.create], ["12"])
+        self.assertEqual([r["id"] for r in diff.delete], ["22"])  # managed roles are never deleted
+
+
+class DiffChannelsTest(unittest.TestCase):
+
+    def test_moved_channel_keeps_its_pair(self):
+        source = [
+            {"id": "1", "type": 4, "name": "A", "position": 0},
+            {"id": "2", "type": 4, "name": "B", "position": 1},
+            {"id": "3", "type": 0, "name": "chat", "parent_id": "2"},
+        ]
+        dest = [
+            {"id": "10", "type": 4, "name": "A"},
+            {"id": "20", "type": 4, "name": "B"},
+            {"id": "30", "type": 0, "name": "chat", "parent_id": "10"},
+            {"id": "40", "type": 2, "name": "voice"},
+        ]
+        diff = diff_channels(source, dest, {}, "100", "200")
+
+        self.assertEqual(diff.matched, {"1": "10", "2": "20", "3": "30"})
+        self.assertEqual([(s["id"], changed) for s, _, changed in diff.update], [("3", ["parent_id"])])
+        self.assertEqual(diff.create, [])
+        self.assertEqual([c["id"] for c in diff.delete], ["40"])
+
+
+if __name__ == "__main__":
+    unittest.main()
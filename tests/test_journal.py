@@ -0,0 +1,56 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from src.operation_file.journal import CloneJournal
+from src.operation_file.serverclone import Clone
+
+
+class CloneJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "clone_1_2.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replay_restores_operations_and_maps(self):
+        journal = CloneJournal(self.path)
+        journal.start({"source": "1", "dest": "2"})
+        journal.record("delete_roles")
+        journal.record("role:10", "roles_map", 10, 20)
+        journal.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"op":"channel:3')  # line cut short by a crash
+
+        replayed = CloneJournal(self.path)
+        self.assertEqual(replayed.load(), 2)
+        self.assertTrue(replayed.is_done("delete_roles"))
+        self.assertFalse(replayed.is_done("channel:3"))
+        self.assertEqual(replayed.maps["roles_map"], {"10": "20"})
+        self.assertFalse(replayed.finished)
+
+    def test_resume_skips_journaled_operations(self):
+        journal = CloneJournal(self.path)
+        journal.start({})
+        journal.record("delete_roles")
+
+        clone = Clone()
+        clone.journal = journal
+        ran = []
+
+        async def action():
+            ran.append(True)
+
+        self.assertIsNone(clone._journaled("delete_roles", action))
+        asyncio.run(clone._journaled("delete_channels", action)())
+        journal.close()
+
+        self.assertEqual(ran, [True])
+        self.assertTrue(journal.is_done("delete_channels"))
+
+
+if __name__ == "__main__":
+    unittest.main()
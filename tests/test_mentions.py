@@ -0,0 +1,32 @@
+import unittest
+
+from src.operation_file.mentions import ReferenceRewriter
+
+
+class ReferenceRewriterTest(unittest.TestCase):
+
+    def setUp(self):
+        # Destination IDs that are also source IDs: a second pass would rewrite them again
+        self.rewriter = ReferenceRewriter("100", "200", {"1": "2", "2": "3"}, {"5": "6"}, {"6": "7"})
+
+    def test_every_reference_is_rewritten_once(self):
+        text = "<@&1> <@&2> <#5> <#6> <@&100> <@&9>"
+        self.assertEqual(self.rewriter.text(text), "<@&2> <@&3> <#6> <#7> <@&200> <@&9>")
+
+    def test_links_point_at_the_destination_channel(self):
+        text = ("https://discord.com/channels/100/5/123 "
+                "https://canary.discord.com/channels/100/5 "
+                "https://discord.com/channels/999/5/123")
+        self.assertEqual(self.rewriter.text(text),
+                         "https://discord.com/channels/200/6 "
+                         "https://canary.discord.com/channels/200/6 "
+                         "https://discord.com/channels/999/5/123")
+
+    def test_embeds_are_rewritten_recursively(self):
+        embed = {"title": "<#5>", "fields": [{"value": "<@&1>", "inline": True}], "color": 1}
+        self.assertEqual(self.rewriter.value(embed),
+                         {"title": "<#6>", "fields": [{"value": "<@&2>", "inline": True}], "color": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
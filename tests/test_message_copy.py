@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from benchmarks.mock_discord import MockDiscord
+from src.operation_file.rest_client import DiscordRestClient
+from src.operation_file.scheduler import OperationGraph
+from src.operation_file.serverclone import Clone
+
+
+class ChannelErrorsTest(unittest.IsolatedAsyncioTestCase):
+    """Channels copied at the same time count only their own failures"""
+
+    async def asyncSetUp(self):
+        self.mock = MockDiscord(latency=0.01)
+        await self.mock.start()
+        guild_id = self.mock.add_guild("Source", channels=3, messages=5)  # one category, two text channels
+        self.channels = [c for c in self.mock.guilds[guild_id]["channels"] if c["type"] == 0]
+        self.session = aiohttp.ClientSession()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.mock.stop()
+
+    async def test_concurrent_failures_are_counted_once(self):
+        clone = Clone(api_url=self.mock.api_url)
+        clone.rest = DiscordRestClient(self.session, base_url=self.mock.api_url, headers={"Authorization": "token"})
+        clone._add_message_nodes(OperationGraph(), self.channels, limit=5)
+        # Destinations that do not exist: every send fails with 404
+        for index, channel in enumerate(self.channels):
+            clone.channels_map[channel["id"]] = str(900 + index)
+
+        await asyncio.gather(*(clone._copy_channel_messages_rest(c) for c in self.channels))
+
+        self.assertEqual(len(self.channels), 2)
+        self.assertEqual(clone.copier.errors, 10)
+        self.assertEqual(clone.errors, 10)
+        self.assertEqual([s.errors for s in clone.copier.scheduler.channels.values()], [5, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
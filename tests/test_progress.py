@@ -0,0 +1,33 @@
+import unittest
+
+from src.operation_file.progress import ProgressTracker
+
+
+class ProgressTrackerTest(unittest.TestCase):
+
+    def test_total_never_drops_below_completed(self):
+        progress = ProgressTracker()
+        progress.add_total(10)
+        progress.complete(4)
+        progress.add_total(-8)
+
+        self.assertEqual(progress.total, 4)
+        self.assertEqual(progress.fraction, 1.0)
+
+    def test_eta_follows_the_smoothed_rate(self):
+        progress = ProgressTracker(smoothing=0.5, interval=1.0)
+        progress.add_total(100)
+        self.assertIsNone(progress.eta)
+
+        start = progress._sample_at
+        progress.completed = 10
+        progress.sample(start + 1.0)  # 10 ops/s
+        self.assertAlmostEqual(progress.eta, 9.0)
+
+        progress.sample(start + 2.0)  # nothing completed: the rate halves
+        self.assertAlmostEqual(progress.rate, 5.0)
+        self.assertAlmostEqual(progress.eta, 18.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+
+import aiohttp
+
+from benchmarks.mock_discord import MockDiscord
+from src.operation_file.rest_client import DiscordRestClient, RateLimitBucket, RateLimitState
+
+
+class ProbeReleaseTest(unittest.IsolatedAsyncioTestCase):
+    """The probe of an unknown bucket must never be lost by a cancelled or paused job"""
+
+    async def asyncSetUp(self):
+        self.mock = MockDiscord(latency=0.3)
+        await self.mock.start()
+        self.guild_id = self.mock.add_guild("Probe", roles=1)
+        self.session = aiohttp.ClientSession()
+        self.limits = RateLimitState()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.mock.stop()
+
+    def client(self):
+        return DiscordRestClient(self.session, base_url=self.mock.api_url, limits=self.limits,
+                                 headers={"Authorization": "token"})
+
+    async def test_cancelled_probe_lets_other_clients_through(self):
+        probe = asyncio.create_task(self.client().get(f"guilds/{self.guild_id}/roles"))
+        await asyncio.sleep(0.05)  # the probe is on the wire, the bucket is still unknown
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        response = await asyncio.wait_for(self.client().get(f"guilds/{self.guild_id}/roles"), 5)
+        self.assertEqual(response.status, 200)
+
+    async def test_cancelled_probe_wakes_waiting_clients(self):
+        probe = asyncio.create_task(self.client().get(f"guilds/{self.guild_id}/roles"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(self.client().get(f"guilds/{self.guild_id}/roles"))
+        await asyncio.sleep(0.05)  # queued behind the probe
+        probe.cancel()
+
+        response = await asyncio.wait_for(waiter, 5)
+        self.assertEqual(response.status, 200)
+
+    async def test_paused_client_does_not_hold_the_probe(self):
+        paused = self.client()
+        paused.pause()
+        held = asyncio.create_task(paused.get(f"guilds/{self.guild_id}/roles"))
+
+        response = await asyncio.wait_for(self.client().get(f"guilds/{self.guild_id}/roles"), 5)
+        self.assertEqual(response.status, 200)
+        self.assertFalse(held.done())
+
+        paused.resume()
+        self.assertEqual((await asyncio.wait_for(held, 5)).status, 200)
+
+
+class ServerErrorRetryTest(unittest.IsolatedAsyncioTestCase):
+    """5xx answers are retried only when sending the request again is harmless"""
+
+    async def asyncSetUp(self):
+        self.mock = MockDiscord(latency=0.0, error_rate=1.0)
+        await self.mock.start()
+        self.guild_id = self.mock.add_guild("Errors")
+        self.session = aiohttp.ClientSession()
+        self.client = DiscordRestClient(self.session, base_url=self.mock.api_url, max_retries=2,
+                                        headers={"Authorization": "token"})
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.mock.stop()
+
+    async def test_post_is_not_retried(self):
+        response = await self.client.post(f"guilds/{self.guild_id}/roles", json={"name": "role"})
+        self.assertEqual(response.status, 502)
+        self.assertEqual(self.client.request_count, 1)
+
+    async def test_get_is_retried(self):
+        response = await self.client.get(f"guilds/{self.guild_id}/roles")
+        self.assertEqual(response.status, 502)
+        self.assertEqual(self.client.request_count, 3)
+
+
+class BucketTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_only_the_probe_owner_releases(self):
+        bucket = RateLimitBucket()
+        self.assertTrue(await bucket.acquire())
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        bucket.release()
+        self.assertTrue(await asyncio.wait_for(waiter, 1))  # the waiter becomes the new probe
+
+
+if __name__ == "__main__":
+    unittest.main()
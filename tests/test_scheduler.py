@@ -0,0 +1,59 @@
+import asyncio
+import unittest
+
+from src.operation_file.scheduler import OperationGraph
+
+
+class OperationGraphTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_dependencies_run_first_and_branches_overlap(self):
+        graph = OperationGraph()
+        log = []
+
+        def step(name, delay=0.01):
+            async def action():
+                log.append(f"start {name}")
+                await asyncio.sleep(delay)
+                log.append(f"end {name}")
+            return action
+
+        graph.add("a", step("a"))
+        graph.add("b", step("b"), deps=["a"])
+        graph.add("c", step("c"), deps=["b", "missing"])  # unknown keys are ignored
+        graph.add("d", step("d", 0.05))
+        await graph.run()
+
+        self.assertLess(log.index("end a"), log.index("start b"))
+        self.assertLess(log.index("end b"), log.index("start c"))
+        # d has no dependencies: it runs alongside the a -> b -> c chain
+        self.assertLess(log.index("start d"), log.index("end a"))
+
+    async def test_failure_is_reported_and_dependents_still_run(self):
+        graph = OperationGraph()
+        ran = []
+        errors = []
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def dependent():
+            ran.append("dependent")
+
+        graph.add("fail", fail)
+        graph.add("dependent", dependent, deps=["fail"])
+        await graph.run(on_error=lambda op, error: errors.append((op.key, str(error))))
+
+        self.assertEqual(errors, [("fail", "boom")])
+        self.assertEqual(ran, ["dependent"])
+        self.assertIsInstance(graph.operations["fail"].error, RuntimeError)
+
+    async def test_cycle_is_rejected(self):
+        graph = OperationGraph()
+        graph.add("a", None, deps=["b"])
+        graph.add("b", None, deps=["a"])
+        with self.assertRaises(ValueError):
+            await graph.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.operation_file.snapshot import SNAPSHOT_VERSION, read_snapshot, write_snapshot
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_keeps_only_clone_fields(self):
+        guild = {"id": "1", "name": "Guild", "icon": "abc", "features": ["COMMUNITY"]}
+        roles = [{"id": "2", "name": "Mods", "permissions": "8", "tags": {"bot_id": "9"}}]
+        channels = [{"id": "3", "type": 0, "name": "chat", "topic": None, "last_message_id": "99"}]
+        for name in ("guild.jsonl", "guild.jsonl.gz"):
+            path = os.path.join(self.directory.name, name)
+            write_snapshot(path, guild, roles, channels, icon=b"\x89PNG")
+            snapshot = read_snapshot(path)
+
+            self.assertEqual(snapshot.guild, {"id": "1", "name": "Guild", "icon": "abc"})
+            self.assertEqual(snapshot.roles, [{"id": "2", "name": "Mods", "permissions": "8"}])
+            self.assertEqual(snapshot.channels, [{"id": "3", "type": 0, "name": "chat"}])
+            self.assertEqual(snapshot.icon, b"\x89PNG")
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+
+    def test_foreign_and_newer_files_are_rejected(self):
+        path = os.path.join(self.directory.name, "other.jsonl")
+        with open(path, "w") as f:
+            f.write('{"hello": "world"}\n')
+        with self.assertRaises(ValueError):
+            read_snapshot(path)
+
+        with open(path, "w") as f:
+            f.write(json.dumps({"format": "guild-snapshot", "version": SNAPSHOT_VERSION + 1}) + "\n")
+        with self.assertRaises(ValueError):
+            read_snapshot(path)
+
+
+if __name__ == "__main__":
+    unittest.main()